@@ -0,0 +1,60 @@
+-- Migration Script: PayrollMailStatus (직원별 최근 메일 발송 상태 요약)
+-- (ClientId, Ym, DocType, EmployeeId)마다 PayrollMailLog의 최근 1건 + 마지막 성공 발송 시각만 보관
+-- /logs/mail, /logs/mail/bulk, /mail/send 가 로그 INSERT와 같은 트랜잭션에서 갱신
+-- 다시 채우기: POST /admin/mail-status/rebuild  또는  python server.py --rebuild-mail-status
+
+USE [기본정보]
+GO
+
+IF OBJECT_ID('dbo.PayrollMailStatus', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.PayrollMailStatus (
+        ClientId     INT            NOT NULL,
+        Ym           NVARCHAR(7)    NOT NULL,
+        DocType      NVARCHAR(30)   NOT NULL,
+        EmployeeId   INT            NOT NULL,
+        Status       NVARCHAR(30)   NOT NULL,
+        ErrorMessage NVARCHAR(1000) NULL,
+        SentAt       DATETIME2(7)   NOT NULL,
+        LastLogId    INT            NOT NULL,
+        LastSentOkAt DATETIME2(7)   NULL,            -- Status='sent'였던 가장 최근 SentAt (한 번이라도 발송 성공했는지)
+        UpdatedAt    DATETIME2(7)   NOT NULL DEFAULT (SYSUTCDATETIME()),
+        CONSTRAINT PK_PayrollMailStatus PRIMARY KEY CLUSTERED (ClientId, Ym, DocType, EmployeeId)
+    );
+    PRINT '+ PayrollMailStatus 테이블 생성';
+END
+ELSE
+    PRINT '✓ PayrollMailStatus 이미 존재';
+GO
+
+-- 오늘 발송대상(/payroll/today/clients): 연월/문서별 발송완료 인원 집계용
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('dbo.PayrollMailStatus') AND name = 'IX_PayrollMailStatus_YmDoc')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_PayrollMailStatus_YmDoc
+        ON dbo.PayrollMailStatus (Ym, DocType)
+        INCLUDE (ClientId, LastSentOkAt);
+    PRINT '+ IX_PayrollMailStatus_YmDoc 생성';
+END
+GO
+
+-- 기존 로그로 채우기 (직원 x 연월 x 문서별 SentAt, Id 기준 최근 1건)
+BEGIN TRANSACTION;
+
+DELETE FROM dbo.PayrollMailStatus;
+
+INSERT INTO dbo.PayrollMailStatus (ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, LastLogId, LastSentOkAt)
+SELECT ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, Id, LastSentOkAt
+FROM (
+    SELECT m.ClientId, m.Ym, m.DocType, m.EmployeeId, m.Status, m.ErrorMessage, m.SentAt, m.Id,
+           MAX(CASE WHEN m.Status = 'sent' THEN m.SentAt END)
+               OVER (PARTITION BY m.ClientId, m.Ym, m.DocType, m.EmployeeId) AS LastSentOkAt,
+           ROW_NUMBER() OVER (PARTITION BY m.ClientId, m.Ym, m.DocType, m.EmployeeId ORDER BY m.SentAt DESC, m.Id DESC) AS rn
+    FROM dbo.PayrollMailLog m
+    WHERE m.EmployeeId IS NOT NULL
+) x
+WHERE rn = 1;
+
+PRINT '+ PayrollMailStatus 채우기: ' + CAST(@@ROWCOUNT AS NVARCHAR(20)) + '건';
+
+COMMIT TRANSACTION;
+GO
@@ -0,0 +1,58 @@
+"""
+근로소득 간이세액표 컴파일
+국세청 조견표(엑셀) 또는 tax_table_full.json → nts_tax_table.bin (mmap 로드용 바이너리)
+
+사용법:
+    python build_tax_table.py                                   # tax_table_full.json → nts_tax_table.bin
+    python build_tax_table.py 근로소득_간이세액표(조견표).xlsx      # 엑셀에서 빌드
+    python build_tax_table.py tax_table_full.json out.bin --effective 20240229
+"""
+import argparse
+import time
+
+from perfect_hybrid_calculator import (
+    CompiledTaxTable,
+    DEFAULT_TAX_TABLE_PATH,
+    PerfectHybridDuranCalculator,
+    load_tax_table,
+)
+
+# 2024-02-29 개정 간이세액표
+DEFAULT_EFFECTIVE_DATE = "20240229"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="근로소득 간이세액표 바이너리 컴파일")
+    parser.add_argument("source", nargs="?", default="tax_table_full.json", help="조견표 엑셀(.xlsx) 또는 JSON")
+    parser.add_argument("output", nargs="?", default=DEFAULT_TAX_TABLE_PATH, help="출력 바이너리 경로")
+    parser.add_argument("--effective", default=DEFAULT_EFFECTIVE_DATE, help="시행일 (YYYYMMDD)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    table = load_tax_table(args.source)
+    table.save(args.output, args.effective)
+    build_sec = time.perf_counter() - started
+
+    # 검증: 다시 로드해서 원본과 같은지 확인
+    started = time.perf_counter()
+    loaded = CompiledTaxTable.load(args.output)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    same = (
+        loaded.rows == table.rows
+        and list(loaded.lows) == list(table.lows)
+        and list(loaded.highs) == list(table.highs)
+        and list(loaded.taxes) == list(table.taxes)
+    )
+    if not same:
+        raise SystemExit(f"❌ 검증 실패: {args.output}")
+
+    calc = PerfectHybridDuranCalculator(args.output)
+    print(f"✅ {args.source} → {args.output}")
+    print(f"   구간 {loaded.rows}개, 시행일 {loaded.effective_date}, 원본 {loaded.source}")
+    print(f"   빌드 {build_sec:.2f}s, 로드 {load_ms:.2f}ms")
+    print(f"   1,000만원 기준점: {calc.get_baseline_info()}")
+
+
+if __name__ == "__main__":
+    main()
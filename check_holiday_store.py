@@ -0,0 +1,87 @@
+"""
+공휴일 저장소 검증
+API 장애(12개월 전체 실패 / 일부 실패 / 서비스키 없음) 때 이미 받아 둔 연도가
+메모리와 SQLite에서 지워지지 않는지 확인 (외부 API 호출 없음)
+
+실행:
+    python check_holiday_store.py
+"""
+import os
+import sys
+import tempfile
+from datetime import date
+
+import server
+
+YEAR = 2030
+GOOD = {date(YEAR, 1, 1), date(YEAR, 5, 5), date(YEAR, 12, 25)}
+
+
+def _ok_month(year, month):
+    return {d for d in GOOD if d.month == month}
+
+
+def _fail_month(year, month):
+    raise RuntimeError(f"{month:02d}월: API 장애")
+
+
+def _fail_may(year, month):
+    if month == 5:
+        raise RuntimeError("05월: API 장애")
+    return set()
+
+
+def _run(store, fetch):
+    server._fetch_holiday_month = fetch
+    store._inflight.add(YEAR)
+    store._fetch_year(YEAR)
+
+
+def _check(name, cond):
+    print(f"[{'OK' if cond else 'FAIL'}] {name}")
+    return bool(cond)
+
+
+def main() -> int:
+    db_path = os.path.join(tempfile.mkdtemp(), "holidays.sqlite3")
+    original = server._fetch_holiday_month
+    results = []
+    try:
+        store = server.HolidayStore(db_path)
+        _run(store, _ok_month)
+        results.append(_check("정상 수신", store.get(YEAR) == GOOD and store.stats()["years"][YEAR]["status"] == "ok"))
+
+        _run(store, _fail_month)
+        reloaded = server.HolidayStore(db_path, offline=True)
+        results.append(_check("전체 실패 후 메모리 유지", store.get(YEAR) == GOOD))
+        results.append(_check("전체 실패 후 SQLite 유지", reloaded.get(YEAR) == GOOD))
+        results.append(_check("전체 실패 상태 기록", store.stats()["years"][YEAR]["status"] == "error"))
+
+        # 이전 상태가 error 여도 일부 실패는 이전 값과 합침
+        _run(store, _fail_may)
+        results.append(_check("일부 실패 후 5월 공휴일 유지", date(YEAR, 5, 5) in store.get(YEAR)))
+        results.append(_check("일부 실패 상태 기록", store.stats()["years"][YEAR]["status"] == "partial"))
+
+        # 재기동 직후(메모리 비어 있음)에도 SQLite 값을 지우지 않음
+        fresh = server.HolidayStore(db_path)
+        _run(fresh, _fail_month)
+        results.append(_check("재기동 후 전체 실패에도 SQLite 유지", server.HolidayStore(db_path, offline=True).get(YEAR) == GOOD))
+
+        key = server.HOLIDAY_SERVICE_KEY
+        server.HOLIDAY_SERVICE_KEY = ""
+        try:
+            _run(store, _ok_month)
+        finally:
+            server.HOLIDAY_SERVICE_KEY = key
+        results.append(_check("서비스키 없음에도 유지", store.get(YEAR) == GOOD))
+        store.close()
+        fresh.close()
+    finally:
+        server._fetch_holiday_month = original
+
+    print(f"\n{sum(results)}/{len(results)} 통과")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+메일 발송 대기열(MailOutbox) 로컬 점검
+aiosmtpd로 띄운 가짜 SMTP 서버에 발송해 세션 재사용/호스트별 동시 세션 제한/재시도/영구 실패를 확인
+(DB 없이 실행: 결과 기록은 PayrollMailLog 대신 메모리 목록에 남김)
+
+실행:
+    pip install aiosmtpd
+    python check_mail_outbox.py            # 기본 200통
+    python check_mail_outbox.py 1000 3     # 메일 수, 호스트별 세션 수
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+
+SMTP_PORT = 8025
+WORKDIR = tempfile.mkdtemp(prefix="outbox_")
+
+# server import 전에 설정 (가짜 SMTP, 평문, 짧은 백오프)
+os.environ.update({
+    "SMTP_HOST": "127.0.0.1",
+    "SMTP_PORT": str(SMTP_PORT),
+    "SMTP_STARTTLS": "0",
+    "SMTP_SSL": "0",
+    "SMTP_USER": "",
+    "MAIL_FROM": "payroll@localhost",
+    "MAIL_OUTBOX_PATH": os.path.join(WORKDIR, "mail_outbox.sqlite3"),
+    "MAIL_OUTBOX_BACKOFF": "0.2",
+    "MAIL_OUTBOX_MAX_ATTEMPTS": "3",
+    "HOLIDAY_OFFLINE": "1",
+    "HOLIDAY_DB_PATH": os.path.join(WORKDIR, "holidays.sqlite3"),
+})
+
+import server  # noqa: E402
+
+
+class FakeSmtpHandler:
+    """bad*@ 주소는 550(영구 거부), retry*@ 주소는 첫 시도만 451(일시 오류)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.delivered = []
+        self.sessions = set()
+        self.active = 0
+        self.max_active = 0
+        self.deferred = set()
+
+    async def handle_RCPT(self, srv, session, envelope, address, rcpt_options):
+        if address.startswith("bad"):
+            return "550 no such user"
+        if address.startswith("retry") and address not in self.deferred:
+            self.deferred.add(address)
+            return "451 try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, srv, session, envelope):
+        with self.lock:
+            self.sessions.add(id(session))
+            self.delivered.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_host = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    handler = FakeSmtpHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=SMTP_PORT)
+    controller.start()
+
+    results = []
+    pool = server.SmtpSessionPool(per_host, idle_timeout=60)
+    outbox = server.MailOutbox(
+        server.MAIL_OUTBOX_PATH, pool, workers=4, max_attempts=3, backoff=0.2, backoff_max=1,
+        on_result=lambda item, status, error: results.append((item["toEmail"], status, error)),
+    )
+    outbox.start()
+
+    def mail(to):
+        return server.MailSendIn(clientId=1, ym="2026-01", docType="slip", toEmail=to,
+                                 subject="테스트", bodyText="본문", employeeId=1)
+
+    started = time.perf_counter()
+    for i in range(count):
+        outbox.enqueue(mail(f"user{i}@localhost"))
+    outbox.enqueue(mail("bad@localhost"))
+    outbox.enqueue(mail("retry@localhost"))
+    enqueue_sec = time.perf_counter() - started
+
+    total = count + 2
+    while len(results) < total and time.perf_counter() - started < 60:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    outbox.stop()
+    controller.stop()
+
+    by_status = {}
+    for to, status, _ in results:
+        by_status[status] = by_status.get(status, 0) + 1
+    stats = pool.stats()
+
+    print(f"메일 {total}통: 적재 {enqueue_sec * 1000:.0f}ms, 전체 {elapsed:.2f}s ({total / elapsed:.0f}통/s)")
+    print(f"결과: {by_status}")
+    print(f"SMTP 연결 {stats['connects']}회 (호스트별 최대 {per_host}), 서버가 본 세션 {len(handler.sessions)}개")
+
+    ok = (
+        by_status.get("sent") == count + 1
+        and by_status.get("failed") == 1
+        and ("bad@localhost", "failed") in [(t, s) for t, s, _ in results]
+        and stats["connects"] <= per_host + stats["reconnects"]
+    )
+    print("✅ 정상" if ok else "❌ 확인 필요")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,273 @@
-import pandas as pd
+import json
 import math
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from numbers import Integral
+
+_np = None
+
+
+def _numpy():
+    """numpy는 일괄 계산에서만 사용 (없으면 None → 순수 파이썬 경로)"""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+
+FAMILY_COLUMNS = 11  # 조견표 가족 수 컬럼 (1~11명)
+
+# ============================================================================
+# 컴파일된 조견표 바이너리 (build_tax_table.py로 생성)
+#
+#   [헤더 64바이트, little-endian]
+#     magic(8) 'NTSTAX\0\1' | 포맷 버전 u16 | 가족 컬럼 수 u16 | 행 수 u32
+#     시행일 'YYYYMMDD'(8) | payload crc32 u32 | 예약 u32 | 원본 파일명(24, utf-8) | 0 패딩
+#   [payload]
+#     lows  float64[행 수]  (천원, 오름차순)
+#     highs float64[행 수]
+#     taxes int32[행 수 x 11] (행 우선)
+#
+# 로드는 mmap + memoryview.cast로 파싱 없이 바로 사용 (프로세스 간 페이지 공유)
+# ============================================================================
+TAX_TABLE_MAGIC = b"NTSTAX\x00\x01"
+TAX_TABLE_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHI8sII24s")
+_HEADER_SIZE = 64
+DEFAULT_TAX_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nts_tax_table.bin")
+
+
+class CompiledTaxTable:
+    """
+    간이세액표 컴파일 결과
+    - lows / highs: 구간 경계 (천원, low 오름차순, 연속 배열)
+    - taxes: 세액 행렬 (int32, 행 우선, 행당 가족 1~11명 11칸)
+
+    조회는 bisect로 O(log n), 일괄 조회는 numpy searchsorted
+    """
+
+    def __init__(self, lows, highs, taxes, effective_date=None, source=None):
+        self.lows = lows
+        self.highs = highs
+        self.taxes = taxes
+        self.effective_date = effective_date
+        self.source = source
+        self.rows = len(lows)
+        self._mmap = None
+        if len(highs) != self.rows or len(taxes) != self.rows * FAMILY_COLUMNS:
+            raise ValueError("조견표 배열 크기가 맞지 않습니다.")
+        # bisect는 파이썬 리스트에서 가장 빠름 (배열 버퍼는 그대로 유지)
+        self._lows_list = list(lows)
+        self._np = None
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        (low, high, [가족1..11 세액]) 행 목록으로 컴파일
+        - 세액 NaN/None은 0 (조견표 빈 칸)
+        - low 기준 정렬, 구간이 겹치면 ValueError
+        """
+        parsed = []
+        for low, high, taxes in rows:
+            values = []
+            for v in taxes:
+                if v is None or (isinstance(v, float) and math.isnan(v)):
+                    values.append(0)
+                else:
+                    values.append(int(v))
+            if len(values) != FAMILY_COLUMNS:
+                raise ValueError(f"가족 수 컬럼은 {FAMILY_COLUMNS}개여야 합니다: {low}~{high}")
+            parsed.append((low, high, values))
+
+        parsed.sort(key=lambda r: r[0])
+        for prev, cur in zip(parsed, parsed[1:]):
+            if cur[0] < prev[1]:
+                raise ValueError(f"조견표 구간이 겹칩니다: {prev[0]}~{prev[1]} / {cur[0]}~{cur[1]}")
+
+        lows = array('d', (r[0] for r in parsed))
+        highs = array('d', (r[1] for r in parsed))
+        taxes = array('i', (v for r in parsed for v in r[2]))
+        return cls(lows, highs, taxes)
+
+    @classmethod
+    def from_json(cls, file_path):
+        """tax_table_full.json ([{low, high, taxes: {"1".."11"}}]) 로드"""
+        with open(file_path, encoding="utf-8") as f:
+            data = json.load(f)
+        family_keys = [str(i) for i in range(1, FAMILY_COLUMNS + 1)]
+        table = cls.from_rows((r["low"], r["high"], [r["taxes"].get(k) for k in family_keys]) for r in data)
+        table.source = os.path.basename(file_path)
+        return table
+
+    @classmethod
+    def from_excel(cls, file_path):
+        """국세청 조견표 엑셀 로드 (pandas/openpyxl 필요)"""
+        table = cls.from_rows(_excel_rows(_read_official_excel(file_path)))
+        table.source = os.path.basename(file_path)
+        return table
+
+    @classmethod
+    def load(cls, file_path, verify=True):
+        """
+        컴파일된 바이너리 로드 (mmap, 복사/파싱 없음)
+        
+        Args:
+            verify: payload crc32 검사 여부
+        """
+        with open(file_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(mm) < _HEADER_SIZE:
+                raise ValueError(f"조견표 파일이 너무 작습니다: {file_path}")
+            magic, version, families, rows, effective, crc, _reserved, source = _HEADER.unpack_from(mm, 0)
+            if magic != TAX_TABLE_MAGIC:
+                raise ValueError(f"조견표 바이너리 형식이 아닙니다: {file_path}")
+            if version != TAX_TABLE_FORMAT_VERSION or families != FAMILY_COLUMNS:
+                raise ValueError(f"지원하지 않는 조견표 버전입니다: v{version}, 가족 컬럼 {families}")
+
+            payload_size = rows * 8 * 2 + rows * FAMILY_COLUMNS * 4
+            if len(mm) != _HEADER_SIZE + payload_size:
+                raise ValueError(f"조견표 파일 크기가 맞지 않습니다: {file_path}")
+            view = memoryview(mm)
+            payload = view[_HEADER_SIZE:]
+            if verify and zlib.crc32(payload) != crc:
+                raise ValueError(f"조견표 체크섬이 맞지 않습니다: {file_path}")
+
+            lows_end = rows * 8
+            highs_end = lows_end * 2
+            if sys.byteorder == "little":
+                lows = payload[:lows_end].cast("d")
+                highs = payload[lows_end:highs_end].cast("d")
+                taxes = payload[highs_end:].cast("i")
+            else:
+                lows, highs, taxes = array("d"), array("d"), array("i")
+                lows.frombytes(payload[:lows_end])
+                highs.frombytes(payload[lows_end:highs_end])
+                taxes.frombytes(payload[highs_end:])
+                for a in (lows, highs, taxes):
+                    a.byteswap()
+        except Exception:
+            mm.close()
+            raise
+
+        table = cls(
+            lows, highs, taxes,
+            effective_date=effective.decode("ascii"),
+            source=source.rstrip(b"\x00").decode("utf-8", errors="replace"),
+        )
+        table._mmap = mm  # memoryview가 참조하는 동안 매핑 유지
+        return table
+
+    def save(self, file_path, effective_date):
+        """컴파일된 바이너리로 저장 (effective_date: 'YYYYMMDD')"""
+        if len(effective_date) != 8 or not effective_date.isdigit():
+            raise ValueError("effective_date must be YYYYMMDD")
+
+        lows, highs, taxes = array("d", self.lows), array("d", self.highs), array("i", self.taxes)
+        if sys.byteorder != "little":
+            for a in (lows, highs, taxes):
+                a.byteswap()
+        payload = lows.tobytes() + highs.tobytes() + taxes.tobytes()
+
+        # 원본 파일명은 24바이트까지 (utf-8 글자 중간에서 자르지 않음)
+        source = (self.source or "").encode("utf-8")[:24].decode("utf-8", errors="ignore").encode("utf-8")
+        header = _HEADER.pack(
+            TAX_TABLE_MAGIC, TAX_TABLE_FORMAT_VERSION, FAMILY_COLUMNS, self.rows,
+            effective_date.encode("ascii"), zlib.crc32(payload), 0, source,
+        ).ljust(_HEADER_SIZE, b"\x00")
+
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, file_path)
+
+    def find(self, income_thousand):
+        """low <= 급여 < high 인 행 번호 (없으면 -1)"""
+        i = bisect_right(self._lows_list, income_thousand) - 1
+        if i >= 0 and income_thousand < self.highs[i]:
+            return i
+        return -1
+
+    def tax(self, row, family):
+        """행 번호 + 가족 수(1~11) → 세액"""
+        return self.taxes[row * FAMILY_COLUMNS + family - 1]
+
+    def last_row_taxes(self):
+        """마지막 구간 (9,980~10,000천원) 가족 1~11명 세액"""
+        start = (self.rows - 1) * FAMILY_COLUMNS
+        return list(self.taxes[start:start + FAMILY_COLUMNS])
+
+    def as_numpy(self):
+        """(lows, highs, taxes[rows, 11]) numpy 뷰 (복사 없음)"""
+        np = _numpy()
+        if self._np is None:
+            self._np = (
+                np.frombuffer(self.lows, dtype=np.float64),
+                np.frombuffer(self.highs, dtype=np.float64),
+                np.frombuffer(self.taxes, dtype=np.int32).reshape(self.rows, FAMILY_COLUMNS),
+            )
+        return self._np
+
+
+def _read_official_excel(file_path):
+    """국세청 공식 조견표 엑셀 → 정제된 DataFrame (pandas는 엑셀을 읽을 때만 import)"""
+    import pandas as pd
+
+    # 상단 헤더 5줄 건너뛰고 로드
+    df = pd.read_excel(file_path, skiprows=5, header=None)
+    
+    # 컬럼명 설정: 0=이상(천원), 1=미만(천원), 2~12=가족 1~11명
+    cols = ['low', 'high'] + [str(i) for i in range(1, 12)]
+    df.columns = cols
+    
+    # 숫자 변환
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # NaN 행 제거
+    df = df.dropna(subset=['low', 'high'])
+    
+    return df
+
+
+def _excel_rows(df):
+    """정제된 DataFrame → (low, high, [가족1..11]) 행"""
+    family_cols = [str(i) for i in range(1, FAMILY_COLUMNS + 1)]
+    return zip(
+        df['low'].tolist(),
+        df['high'].tolist(),
+        df[family_cols].itertuples(index=False, name=None),
+    )
+
+
+def load_tax_table(file_path=DEFAULT_TAX_TABLE_PATH):
+    """확장자로 조견표 형식 판별 (.xlsx/.xls 엑셀, .json, 그 외 컴파일된 바이너리)"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in ('.xlsx', '.xls'):
+        return CompiledTaxTable.from_excel(file_path)
+    if ext == '.json':
+        return CompiledTaxTable.from_json(file_path)
+    return CompiledTaxTable.load(file_path)
+
+
+def _family_column(family_count):
+    """가족 수 → 조견표 컬럼 번호 (1~11, 11명 초과는 11)"""
+    col = min(family_count, FAMILY_COLUMNS)
+    if not isinstance(col, Integral) or col < 1:
+        # 원래 DataFrame 컬럼 조회와 같은 예외
+        raise KeyError(str(col))
+    return int(col)
+
 
 class PerfectHybridDuranCalculator:
     """
@@ -13,47 +281,40 @@ class PerfectHybridDuranCalculator:
     업데이트: 2024년 국세청 공식 간이세액표 기준
     """
 
-    def __init__(self, excel_file_path):
+    def __init__(self, table_path=DEFAULT_TAX_TABLE_PATH):
         """
         Args:
-            excel_file_path: 국세청 공식 근로소득_간이세액표(조견표).xlsx 파일 경로
+            table_path: 조견표 경로
+                - 컴파일된 바이너리 (기본값, build_tax_table.py로 생성, mmap 로드)
+                - 국세청 공식 근로소득_간이세액표(조견표).xlsx
+                - tax_table_full.json
         """
-        self.df = self._load_official_table(excel_file_path)
+        # 구간 경계 배열 + 세액 행렬 (조회는 bisect)
+        self.table = load_tax_table(table_path)
+        self._df = None
         
         # 1,000만원 기준점 값 (조견표 마지막 행: 9,980~10,000천원 구간)
         self.tax_at_10m = self._extract_10m_baseline()
 
-    def _load_official_table(self, file_path):
-        """국세청 공식 조견표 로드 및 정제"""
-        # 상단 헤더 5줄 건너뛰고 로드
-        df = pd.read_excel(file_path, skiprows=5, header=None)
-        
-        # 컬럼명 설정: 0=이상(천원), 1=미만(천원), 2~12=가족 1~11명
-        cols = ['low', 'high'] + [str(i) for i in range(1, 12)]
-        df.columns = cols
-        
-        # 숫자 변환
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # NaN 행 제거
-        df = df.dropna(subset=['low', 'high'])
-        
-        return df
+    @property
+    def df(self):
+        """조견표 DataFrame (확인/디버깅용, 처음 접근할 때 생성)"""
+        if self._df is None:
+            import pandas as pd
+
+            lows, highs = list(self.table.lows), list(self.table.highs)
+            data = {'low': lows, 'high': highs}
+            for i in range(1, FAMILY_COLUMNS + 1):
+                data[str(i)] = [self.table.tax(r, i) for r in range(self.table.rows)]
+            self._df = pd.DataFrame(data)
+        return self._df
 
     def _extract_10m_baseline(self):
         """
         조견표에서 1,000만원 기준점 값 추출
         실제 조견표는 9,980~10,000천원 구간까지만 있으므로 마지막 행 사용
         """
-        last_row = self.df.iloc[-1]
-        
-        baseline = {}
-        for i in range(1, 12):
-            val = last_row[str(i)]
-            baseline[i] = int(val) if pd.notna(val) else 0
-        
-        return baseline
+        return {i + 1: tax for i, tax in enumerate(self.table.last_row_taxes())}
 
     def _lookup_table(self, monthly_income, family_count):
         """
@@ -68,27 +329,20 @@ class PerfectHybridDuranCalculator:
         """
         income_thousand = monthly_income / 1000  # 천원 단위 변환
         
-        # 조견표에서 구간 찾기: low <= 급여 < high
-        match = self.df[(self.df['low'] <= income_thousand) & 
-                        (income_thousand < self.df['high'])]
+        # 조견표에서 구간 찾기: low <= 급여 < high (이진 탐색)
+        row = self.table.find(income_thousand)
         
-        if match.empty:
+        if row < 0:
             # 구간을 벗어난 경우 (1,000만원 상한선)
             return self.tax_at_10m.get(min(family_count, 11), 0)
         
         # 가족 수 컬럼 선택 (최대 11명)
-        family_col = str(min(family_count, 11))
-        base_tax = match.iloc[0][family_col]
-        
-        if pd.isna(base_tax):
-            base_tax = 0
-        
-        base_tax = int(base_tax)
+        base_tax = self.table.tax(row, _family_column(family_count))
         
         # 11명 초과 가족 공제 처리
         if family_count > 11:
-            tax_11 = int(match.iloc[0]['11']) if pd.notna(match.iloc[0]['11']) else 0
-            tax_10 = int(match.iloc[0]['10']) if pd.notna(match.iloc[0]['10']) else 0
+            tax_11 = self.table.tax(row, 11)
+            tax_10 = self.table.tax(row, 10)
             extra_count = family_count - 11
             base_tax = tax_11 - ((tax_10 - tax_11) * extra_count)
         
@@ -192,6 +446,75 @@ class PerfectHybridDuranCalculator:
         # 3. 10원 미만 절사
         return int(math.floor(final_tax / 10) * 10)
     
+    def calculate_many(self, incomes, families=1, children=0):
+        """
+        여러 명 원천징수 세액 일괄 산출 (calculate()와 같은 결과)
+        
+        Args:
+            incomes: 월 급여액 목록 (원 단위, 비과세 제외)
+            families: 공제대상 가족 수 목록 또는 공통 값
+            children: 8~20세 자녀 수 목록 또는 공통 값
+            
+        Returns:
+            list[int]: 최종 원천징수 세액 목록 (10원 미만 절사)
+        """
+        np = _numpy()
+        if np is None:
+            n = len(incomes)
+            families = families if isinstance(families, (list, tuple)) else [families] * n
+            children = children if isinstance(children, (list, tuple)) else [children] * n
+            return [self.calculate(m, f, c) for m, f, c in zip(incomes, families, children)]
+        
+        m, f, c = np.broadcast_arrays(
+            np.asarray(incomes, dtype=np.float64), np.asarray(families), np.asarray(children)
+        )
+        if (m.size == 0 or f.dtype.kind not in 'iu' or c.dtype.kind not in 'iu'
+                or not np.isfinite(m).all() or (f < 1).any()):
+            # 예외/경계 입력은 calculate()와 똑같이 처리되도록 한 건씩 계산
+            return [self.calculate(*args) for args in zip(m.tolist(), f.tolist(), c.tolist())]
+        f = f.astype(np.int64)
+        c = c.astype(np.int64)
+        
+        lows, highs, taxes = self.table.as_numpy()
+        eff = np.minimum(f, FAMILY_COLUMNS)
+        baseline = np.array([0] + [self.tax_at_10m.get(i, 958650) for i in range(1, FAMILY_COLUMNS + 1)], dtype=np.int64)
+        
+        # 1-1. 1,000만원 이하: 조견표 (low <= 급여 < high)
+        income_thousand = m / 1000
+        row = np.searchsorted(lows, income_thousand, side='right') - 1
+        row_c = np.clip(row, 0, None)
+        found = (row >= 0) & (income_thousand < highs[row_c])
+        table_tax = taxes[row_c, eff - 1].astype(np.int64)
+        tax_11 = taxes[row_c, 10].astype(np.int64)
+        tax_10 = taxes[row_c, 9].astype(np.int64)
+        table_tax = np.where(f > 11, tax_11 - (tax_10 - tax_11) * (f - 11), table_tax)
+        table_tax = np.where(found, np.maximum(0, table_tax), baseline[eff])
+        
+        # 1-2. 1,000만원 초과: 법정 산식
+        tax_10m = baseline[eff]
+        high_tax = np.select(
+            [m <= 14000000, m <= 28000000, m <= 30000000, m <= 45000000, m <= 87000000],
+            [tax_10m + ((m - 10000000) * 0.98 * 0.35) + 25000,
+             tax_10m + 1397000 + ((m - 14000000) * 0.98 * 0.38),
+             tax_10m + 6610600 + ((m - 28000000) * 0.98 * 0.40),
+             tax_10m + 7394600 + ((m - 30000000) * 0.40),
+             tax_10m + 13394600 + ((m - 45000000) * 0.42)],
+            tax_10m + 31034600 + ((m - 87000000) * 0.45),
+        )
+        base_tax = np.where(m <= 10000000, table_tax, high_tax)
+        
+        # 2. 자녀 세액공제
+        child_deduction = np.select(
+            [c == 1, c == 2, c >= 3],
+            [12500, 29160, 29160 + (c - 2) * 25000],
+            0,
+        )
+        final_tax = base_tax - child_deduction
+        final_tax = np.where(final_tax > 0, final_tax, 0)
+        
+        # 3. 10원 미만 절사
+        return (np.floor(final_tax / 10) * 10).astype(np.int64).tolist()
+
     def get_baseline_info(self):
         """1,000만원 기준점 값 정보 반환"""
         return self.tax_at_10m.copy()
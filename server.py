@@ -16,20 +16,38 @@ from __future__ import annotations
 import sys
 import os
 import re
+import time
+import asyncio
+import contextvars
+import functools
 import smtplib
+import threading
 import xml.etree.ElementTree as ET
 from email.message import EmailMessage
+from email.utils import format_datetime
 from datetime import datetime, date, timedelta, timezone
 from typing import Optional, List, Literal, Dict, Any
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from typing import AsyncGenerator
 import json
+import copy
+import queue
+import uuid
+import atexit
+import hashlib
+import logging
+from collections import OrderedDict, deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 import pyodbc
 import requests
-from fastapi import FastAPI, HTTPException, Header, Depends, Query, Request
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, ValidationError
 
 
 # =========================
@@ -51,6 +69,18 @@ SMTP_PASS = os.getenv("SMTP_PASS", "")
 SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
 SMTP_SSL = os.getenv("SMTP_SSL", "0") == "1"
 MAIL_FROM = os.getenv("MAIL_FROM", SMTP_USER)
+SMTP_MAX_PER_HOST = int(os.getenv("SMTP_MAX_PER_HOST", "2"))        # 호스트별 동시 SMTP 세션 수
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))     # 유휴 SMTP 세션 종료(초)
+
+# 메일 발송 대기열 (/mail/send는 저장만 하고 백그라운드 워커가 발송)
+MAIL_OUTBOX_ENABLED = os.getenv("MAIL_OUTBOX", "1") == "1"
+MAIL_OUTBOX_PATH = os.getenv(
+    "MAIL_OUTBOX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mail_outbox.sqlite3")
+)
+MAIL_OUTBOX_WORKERS = int(os.getenv("MAIL_OUTBOX_WORKERS", "4"))
+MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+MAIL_OUTBOX_BACKOFF = float(os.getenv("MAIL_OUTBOX_BACKOFF", "30"))          # 첫 재시도 대기(초), 이후 2배씩
+MAIL_OUTBOX_BACKOFF_MAX = float(os.getenv("MAIL_OUTBOX_BACKOFF_MAX", "1800"))  # 재시도 대기 상한(초)
 
 KST = timezone(timedelta(hours=9))
 
@@ -64,8 +94,227 @@ _HOLIDAY_ENDPOINTS = [
     "http://apis.data.go.kr/B090041/openapi/service/SpcdeInfoService/getRestDeInfo",
 ]
 
-_HOLIDAY_CACHE: Dict[int, set[date]] = {}
-_HOLIDAY_CACHE_ERR: Dict[int, str] = {}
+# 공휴일 저장소 (연도별로 받아 SQLite에 보관, 재시작 후에도 유지)
+HOLIDAY_DB_PATH = os.getenv(
+    "HOLIDAY_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "holidays.sqlite3")
+)
+HOLIDAY_FIXTURE_PATH = os.getenv("HOLIDAY_FIXTURE_PATH", "")      # 지정 시 이 JSON만 사용 (완전 오프라인)
+HOLIDAY_OFFLINE = os.getenv("HOLIDAY_OFFLINE", "0") == "1"        # 1이면 외부 API 호출 안 함 (저장된 값만 사용)
+HOLIDAY_FETCH_WORKERS = int(os.getenv("HOLIDAY_FETCH_WORKERS", "6"))  # 월별 동시 요청 수
+HOLIDAY_REFRESH_DAYS = float(os.getenv("HOLIDAY_REFRESH_DAYS", "7"))  # 정상 수신 연도 재확인 주기(일)
+HOLIDAY_RETRY_MINUTES = float(os.getenv("HOLIDAY_RETRY_MINUTES", "10"))  # 일부 월 실패 시 재시도 간격(분)
+
+
+# =========================
+# 로깅 (JSON 한 줄, 큐 + 백그라운드 기록)
+# =========================
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()       # payroll.* 기본 레벨
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")                 # 모듈별 레벨, 예: "payroll.request=WARNING, payroll.db=DEBUG"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")             # 콘솔 형식: json | text (파일은 항상 json)
+LOG_PATH = os.getenv(
+    "LOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.log")
+)                                                        # 빈 값이면 파일 기록 안 함
+LOG_MAX_MB = float(os.getenv("LOG_MAX_MB", "20"))        # 로그 파일 하나의 최대 크기
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))         # 보관할 이전 로그 파일 수
+LOG_ERROR_BUFFER = int(os.getenv("LOG_ERROR_BUFFER", "200"))  # /admin/errors 로 조회할 최근 오류 수
+
+_REQUEST_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_LOG_LISTENERS: List[QueueListener] = []
+
+
+def _log_record_dict(record: logging.LogRecord) -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+        "level": record.levelname,
+        "logger": record.name,
+        "msg": record.getMessage(),
+        "requestId": getattr(record, "request_id", None),
+        "route": getattr(record, "route", None),
+        "thread": record.threadName,
+    }
+    ctx = getattr(record, "ctx", None)
+    if ctx:
+        out["ctx"] = ctx
+    if record.exc_text:
+        out["exc"] = record.exc_text
+    return out
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(_log_record_dict(record), ensure_ascii=False, default=str)
+
+
+class _ContextFilter(logging.Filter):
+    """호출 스레드에서 요청 ID/라우트를 레코드에 붙임 (DbExecutor 스레드도 contextvars 복사로 같은 값)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _REQUEST_ID.get()
+        m = _REQUEST_METRICS.get()
+        record.route = m.route() if m is not None else None
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """메시지/예외는 호출 스레드에서 문자열로 만들고, 형식화·디스크 기록은 리스너 스레드에서"""
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _async_handler(*handlers: logging.Handler) -> QueueHandler:
+    """handlers를 백그라운드 스레드 하나에서 실행하는 큐 핸들러 (요청 경로는 큐에 넣기만 함)"""
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = QueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    _LOG_LISTENERS.append(listener)
+    handler = _QueueHandler(q)
+    handler.addFilter(_ContextFilter())
+    return handler
+
+
+def _stop_logging():
+    # 종료 시 큐에 남은 기록까지 쓰고 멈춤
+    while _LOG_LISTENERS:
+        _LOG_LISTENERS.pop().stop()
+
+
+class ErrorBuffer(logging.Handler):
+    """최근 오류(ERROR 이상) 문맥 링 버퍼 (요청 ID, 라우트, 추가 정보, traceback)"""
+
+    def __init__(self, capacity: int):
+        super().__init__(level=logging.ERROR)
+        self._items: deque = deque(maxlen=max(1, capacity))
+        self._seq = 0
+        self._items_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        item = _log_record_dict(record)
+        with self._items_lock:
+            self._seq += 1
+            item["seq"] = self._seq
+            self._items.append(item)
+
+    def recent(self, limit: int = 50, request_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._items_lock:
+            items = list(self._items)
+        if request_id:
+            items = [i for i in items if i.get("requestId") == request_id]
+        return items[::-1][:limit]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._items_lock:
+            return {"capacity": self._items.maxlen, "buffered": len(self._items), "total": self._seq}
+
+    def clear(self):
+        with self._items_lock:
+            self._items.clear()
+
+
+def _parse_log_levels(spec: str) -> Dict[str, int]:
+    """"payroll.request=WARNING, payroll.db=DEBUG" → {logger: level}"""
+    levels: Dict[str, int] = {}
+    for item in re.split(r"[,;]", spec):
+        name, sep, level = item.partition("=")
+        level = level.strip().upper()
+        if sep and name.strip() and isinstance(logging.getLevelName(level), int):
+            levels[name.strip()] = logging.getLevelName(level)
+    return levels
+
+
+def setup_logging() -> ErrorBuffer:
+    """payroll.* 로거 구성: 콘솔 + 회전 파일 + 오류 링 버퍼, 모두 큐를 거쳐 백그라운드 기록"""
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+    ))
+    handlers: List[logging.Handler] = [console]
+    if LOG_PATH:
+        file_handler = RotatingFileHandler(
+            LOG_PATH, maxBytes=int(LOG_MAX_MB * 1024 * 1024), backupCount=LOG_BACKUPS, encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    errors = ErrorBuffer(LOG_ERROR_BUFFER)
+    handlers.append(errors)
+
+    root = logging.getLogger("payroll")
+    root.setLevel(logging.getLevelName(LOG_LEVEL) if isinstance(logging.getLevelName(LOG_LEVEL), int) else logging.INFO)
+    root.propagate = False
+    root.addHandler(_async_handler(*handlers))
+    for name, level in _parse_log_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+    atexit.register(_stop_logging)
+    return errors
+
+
+ERROR_BUFFER = setup_logging()
+
+log = logging.getLogger("payroll.api")
+log_boot = logging.getLogger("payroll.boot")
+log_request = logging.getLogger("payroll.request")
+log_db = logging.getLogger("payroll.db")
+log_holiday = logging.getLogger("payroll.holiday")
+log_mail = logging.getLogger("payroll.mail")
+
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+class RequestContextMiddleware:
+    """
+    요청 ID 부여 + 접근 로그 (ASGI 미들웨어)
+    - X-Request-ID 헤더가 있으면 그대로, 없으면 새로 만들어 응답 헤더에도 돌려줌
+    - 처리 중 남긴 로그/오류 버퍼/느린 쿼리에 같은 requestId가 붙음
+    - 처리되지 않은 예외는 traceback과 함께 기록 후 그대로 전달
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = next((v.decode("latin-1") for k, v in scope.get("headers", ()) if k == b"x-request-id"), "")
+        request_id = incoming if _REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex[:16]
+        token = _REQUEST_ID.set(request_id)
+        started = time.perf_counter()
+        state = {"status": 500}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                message["headers"] = list(message.get("headers", ())) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        except Exception as e:
+            log_request.exception("unhandled error: %s", e, extra={"ctx": {
+                "path": scope.get("path"), "template": getattr(scope.get("route"), "path", None),
+            }})
+            raise
+        finally:
+            status = state["status"]
+            log_request.log(
+                logging.WARNING if status >= 500 else logging.INFO,
+                "%s %s %s %.1fms", scope["method"], scope.get("path"), status, (time.perf_counter() - started) * 1000,
+                extra={"ctx": {
+                    "status": status,
+                    "template": getattr(scope.get("route"), "path", None),
+                    "query": scope.get("query_string", b"").decode("latin-1") or None,
+                }},
+            )
+            _REQUEST_ID.reset(token)
 
 
 # =========================
@@ -82,32 +331,929 @@ CONN_STR = (
 )
 
 
-def get_conn() -> pyodbc.Connection:
-    return pyodbc.connect(CONN_STR)
+# 연결 풀 설정 (월말 대량 요청 시 TLS 핸드셰이크 반복 방지)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))          # 체크아웃 대기 최대 시간(초)
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "1800"))        # 연결 최대 수명(초)
+DB_POOL_PING_IDLE = float(os.getenv("DB_POOL_PING_IDLE", "30"))      # 이 시간 이상 유휴 시 SELECT 1 확인(초)
+
+# DB 실행기 (동기 핸들러 실행 스레드 = 연결 풀 크기, 대기열 초과 시 503)
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE)))
+DB_QUEUE_MAX = int(os.getenv("DB_QUEUE_MAX", str(DB_EXECUTOR_WORKERS * 8)))    # 실행 대기 요청 상한
+DB_RETRY_AFTER = int(os.getenv("DB_RETRY_AFTER", "2"))                          # 503 응답의 Retry-After(초)
+DB_ROUTE_DEFAULT_LIMIT = int(os.getenv("DB_ROUTE_DEFAULT_LIMIT", "0"))          # 라우트별 동시 실행 기본 상한 (0=실행기 스레드 수)
+DB_ROUTE_LIMITS = os.getenv("DB_ROUTE_LIMITS", "")  # 예: "POST /payroll/results/save-batch=2, GET /payroll/today/clients=4"
+
+
+class PooledConnection:
+    """
+    풀에서 빌려준 연결 래퍼
+    - 기존 핸들러의 conn.close() 호출은 실제 종료 대신 풀 반납으로 동작
+    - 나머지 속성(cursor, commit, rollback ...)은 원본 pyodbc 연결로 위임
+    """
+
+    __slots__ = ("_pool", "_raw", "created_at", "last_used", "_returned")
+
+    def __init__(self, pool: "ConnectionPool", raw: pyodbc.Connection, created_at: float):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = created_at
+        self.last_used = created_at
+        self._returned = True
+
+    @property
+    def raw(self) -> pyodbc.Connection:
+        return self._raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._returned:
+            return
+        self._returned = True
+        self._pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    스레드 안전 ODBC 연결 풀
+    - 최대 size개 연결 (초과 요청은 timeout까지 대기 후 503)
+    - 유휴 시간이 ping_idle 이상이면 체크아웃 시 SELECT 1로 상태 확인
+    - recycle 초과 연결은 폐기 후 재연결
+    """
+
+    def __init__(self, conn_str: str, size: int, timeout: float, recycle: float, ping_idle: float):
+        self.conn_str = conn_str
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_idle = ping_idle
+
+        self._cond = threading.Condition()
+        self._idle: List[PooledConnection] = []
+        self._in_use = 0
+        self._closed = False
+
+        # 통계
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+        self._checkouts = 0
+
+    def _open(self) -> PooledConnection:
+        raw = pyodbc.connect(self.conn_str)
+        with self._cond:
+            self._created += 1
+        return PooledConnection(self, raw, time.monotonic())
+
+    @staticmethod
+    def _close_raw(pc: PooledConnection):
+        try:
+            pc.raw.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, pc: PooledConnection) -> bool:
+        now = time.monotonic()
+        if self.recycle > 0 and now - pc.created_at > self.recycle:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if self.ping_idle >= 0 and now - pc.last_used >= self.ping_idle:
+            try:
+                cur = pc.raw.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchone()
+                cur.close()
+            except Exception:
+                with self._cond:
+                    self._discarded += 1
+                return False
+        return True
+
+    def acquire(self) -> PooledConnection:
+        deadline = time.monotonic() + self.timeout
+        waited_from: Optional[float] = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                if self._idle:
+                    pc = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.size:
+                    pc = None
+                    self._in_use += 1
+                    break
+
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self._waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._record_wait(waited_from)
+                    raise HTTPException(
+                        status_code=503,
+                        detail=f"DB 연결 풀 대기 시간 초과 ({self.timeout:.0f}s, size={self.size})",
+                        headers={"Retry-After": "1"},
+                    )
+                self._cond.wait(remaining)
+
+            if waited_from is not None:
+                self._record_wait(waited_from)
+            self._checkouts += 1
+
+        # 네트워크 작업(ping/connect)은 락 밖에서 수행
+        try:
+            if pc is not None and not self._is_healthy(pc):
+                self._close_raw(pc)
+                pc = None
+            if pc is None:
+                pc = self._open()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        pc._returned = False
+        return pc
+
+    def _record_wait(self, waited_from: float):
+        w = time.monotonic() - waited_from
+        self._wait_time += w
+        if w > self._max_wait:
+            self._max_wait = w
+
+    def release(self, pc: PooledConnection):
+        # 커밋되지 않은 트랜잭션은 되돌린 뒤 반납 (실패하면 연결 폐기)
+        ok = True
+        try:
+            pc.raw.rollback()
+        except Exception:
+            ok = False
+
+        now = time.monotonic()
+        if ok and self.recycle > 0 and now - pc.created_at > self.recycle:
+            ok = False
+            with self._cond:
+                self._recycled += 1
+
+        with self._cond:
+            self._in_use -= 1
+            keep = ok and not self._closed
+            if keep:
+                pc.last_used = now
+                self._idle.append(pc)
+            elif not ok:
+                self._discarded += 1
+            self._cond.notify()
+
+        if not keep:
+            self._close_raw(pc)
+
+    def close_all(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pc in idle:
+            self._close_raw(pc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "inUse": self._in_use,
+                "idle": len(self._idle),
+                "created": self._created,
+                "recycled": self._recycled,
+                "discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "waitTimeSec": round(self._wait_time, 3),
+                "maxWaitSec": round(self._max_wait, 3),
+                "timeouts": self._timeouts,
+            }
+
+
+DB_POOL = ConnectionPool(CONN_STR, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PING_IDLE)
+
+
+def get_conn() -> PooledConnection:
+    return DB_POOL.acquire()
+
+
+# =========================
+# DB 실행기 (요청 동시성 / 대기열 제한)
+# =========================
+def _parse_route_limits(spec: str) -> Dict[str, int]:
+    """"METHOD /path=N, ..." → {"METHOD /path": N}"""
+    limits: Dict[str, int] = {}
+    for item in re.split(r"[,;]", spec):
+        route, sep, n = item.rpartition("=")
+        parts = route.split()
+        if sep and len(parts) == 2 and n.strip().isdigit():
+            limits[f"{parts[0].upper()} {parts[1]}"] = int(n)
+    return limits
+
+
+class DbExecutor:
+    """
+    DB 작업 전용 스레드 실행기 (동기 핸들러는 DbRoute가 여기서 실행)
+    - 스레드 수 = 연결 풀 크기 → 동시에 DB를 쓰는 요청이 풀을 넘지 않음 (anyio 기본 스레드풀 40개와 분리)
+    - 라우트별 동시 실행 상한 (일괄 저장 같은 무거운 요청이 스레드를 독차지하지 않게)
+    - 대기 중(라우트 슬롯 + 스레드)인 요청이 max_queue 이상이면 바로 503 + Retry-After
+    - 라우트별 대기 시간 / 실행 시간 통계
+    - 요청의 contextvars를 복사해 스레드에서 실행
+    """
+
+    def __init__(self, workers: int, max_queue: int, retry_after: int,
+                 default_route_limit: int = 0, route_limits: Optional[Dict[str, int]] = None):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self.default_route_limit = default_route_limit
+        self.route_limits = dict(route_limits or {})
+        self._declared: Dict[str, int] = {}   # db_route(limit=)로 지정한 상한
+
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="db")
+        self._lock = threading.Lock()
+        self._gates: Dict[str, asyncio.Semaphore] = {}
+        self._queued = 0    # 라우트 슬롯 대기
+        self._backlog = 0   # 스레드 대기
+        self._running = 0
+        self._rejected = 0
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def declare(self, route: str, limit: int):
+        self._declared[route] = limit
+
+    def limit_for(self, route: str) -> int:
+        """라우트 동시 실행 상한 (DB_ROUTE_LIMITS > db_route(limit=) > DB_ROUTE_DEFAULT_LIMIT, 0=제한 없음)"""
+        limit = self.route_limits.get(route, self._declared.get(route, self.default_route_limit))
+        return limit if 0 < limit < self.workers else 0
+
+    def _stats(self, route: str) -> Dict[str, Any]:
+        # 호출 측에서 self._lock 보유
+        st = self._routes.get(route)
+        if st is None:
+            st = self._routes[route] = {
+                "calls": 0, "errors": 0, "rejected": 0, "active": 0, "waiting": 0,
+                "waitSec": 0.0, "waitMaxSec": 0.0, "execSec": 0.0, "execMaxSec": 0.0,
+            }
+        return st
+
+    def _gate(self, route: str, limit: int) -> Optional[asyncio.Semaphore]:
+        if limit <= 0:
+            return None
+        gate = self._gates.get(route)
+        if gate is None:
+            gate = self._gates[route] = asyncio.Semaphore(limit)
+        return gate
+
+    @asynccontextmanager
+    async def admit(self, route: str):
+        """
+        대기열 상한 확인 + 라우트 슬롯 확보 (초과 시 503)
+        async 핸들러는 이 블록 안에서 call()로 DB 작업을 실행
+        """
+        with self._lock:
+            st = self._stats(route)
+            if self._queued + self._backlog >= self.max_queue:
+                self._rejected += 1
+                st["rejected"] += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"DB 요청 대기열 초과 (대기 {self._queued + self._backlog}, 상한 {self.max_queue})",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self._queued += 1
+            st["waiting"] += 1
+
+        gate = self._gate(route, self.limit_for(route))
+        admitted = time.perf_counter()
+        try:
+            if gate is not None:
+                await gate.acquire()
+        finally:
+            with self._lock:
+                self._queued -= 1
+                st["waiting"] -= 1
+        try:
+            yield admitted
+        finally:
+            if gate is not None:
+                gate.release()
+
+    async def call(self, fn, *args, _route: Optional[str] = None, _since: Optional[float] = None, **kwargs):
+        """DB 스레드에서 fn 실행 (대기열 상한 확인 없음, 이미 admit된 요청용)"""
+        ctx = contextvars.copy_context()
+        submitted = time.perf_counter() if _since is None else _since
+
+        def work():
+            started = time.perf_counter()
+            with self._lock:
+                self._backlog -= 1
+                self._running += 1
+                if _route is not None:
+                    st = self._stats(_route)
+                    st["active"] += 1
+                    st["waitSec"] += started - submitted
+                    st["waitMaxSec"] = max(st["waitMaxSec"], started - submitted)
+            error = False
+            try:
+                return fn(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception:
+                error = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._running -= 1
+                    if _route is not None:
+                        st = self._stats(_route)
+                        st["active"] -= 1
+                        st["calls"] += 1
+                        st["errors"] += error
+                        st["execSec"] += elapsed
+                        st["execMaxSec"] = max(st["execMaxSec"], elapsed)
+
+        with self._lock:
+            self._backlog += 1
+        future = self._executor.submit(ctx.run, work)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # 클라이언트가 끊겨 취소됐는데 아직 시작 전이면 대기 수에서 제외
+            if future.cancel():
+                with self._lock:
+                    self._backlog -= 1
+            raise
+
+    async def run(self, route: str, fn, *args, **kwargs):
+        """admit + call (동기 핸들러 1회 실행, 대기 시간은 도착부터 스레드 시작까지)"""
+        async with self.admit(route) as admitted:
+            return await self.call(fn, *args, _route=route, _since=admitted, **kwargs)
+
+    def stats(self, routes: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {
+                "workers": self.workers,
+                "maxQueue": self.max_queue,
+                "queued": self._queued + self._backlog,
+                "running": self._running,
+                "rejected": self._rejected,
+            }
+            if routes:
+                out["routes"] = {
+                    route: {
+                        "calls": st["calls"],
+                        "errors": st["errors"],
+                        "rejected": st["rejected"],
+                        "active": st["active"],
+                        "waiting": st["waiting"],
+                        "limit": self.limit_for(route) or None,
+                        "waitAvgMs": round(st["waitSec"] / st["calls"] * 1000, 2) if st["calls"] else 0.0,
+                        "waitMaxMs": round(st["waitMaxSec"] * 1000, 2),
+                        "execAvgMs": round(st["execSec"] / st["calls"] * 1000, 2) if st["calls"] else 0.0,
+                        "execMaxMs": round(st["execMaxSec"] * 1000, 2),
+                    }
+                    for route, st in sorted(self._routes.items())
+                }
+            return out
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+DB_EXECUTOR = DbExecutor(
+    DB_EXECUTOR_WORKERS, DB_QUEUE_MAX, DB_RETRY_AFTER,
+    DB_ROUTE_DEFAULT_LIMIT, _parse_route_limits(DB_ROUTE_LIMITS),
+)
+
+
+def db_route(limit: Optional[int] = None):
+    """
+    동기 핸들러의 라우트별 동시 실행 상한 지정 (@app.get/post 아래에 붙임)
+    DB_ROUTE_LIMITS 환경변수에 같은 라우트가 있으면 그 값이 우선
+    """
+    def decorate(fn):
+        fn._db_route_limit = limit
+        return fn
+    return decorate
+
+
+class DbRoute(APIRoute):
+    """동기(def) 핸들러는 anyio 기본 스레드풀 대신 DB_EXECUTOR에서 실행 (async 핸들러는 그대로)"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            methods = ",".join(sorted(kwargs.get("methods") or ["GET"]))
+            endpoint = self._on_db_executor(f"{methods} {path}", endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _on_db_executor(route: str, fn):
+        limit = getattr(fn, "_db_route_limit", None)
+        if limit is not None:
+            DB_EXECUTOR.declare(route, limit)
+
+        # 시그니처/응답 모델은 functools.wraps로 원본 것을 그대로 사용
+        @functools.wraps(fn)
+        async def endpoint(*args, **kwargs):
+            return await DB_EXECUTOR.run(route, fn, *args, **kwargs)
+
+        return endpoint
+
+
+# =========================
+# 요청/DB 지표 (Prometheus /metrics)
+# =========================
+# 요청 처리 시간 히스토그램 구간(초)
+METRICS_BUCKETS = tuple(
+    float(v) for v in os.getenv("METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30").split(",") if v.strip()
+)
+
+_UNMATCHED_ROUTE = "(unmatched)"
+
+
+class RequestMetrics:
+    """요청 하나의 DB 사용량 (미들웨어가 contextvar에 넣고 _execute/fetch_*가 누적)"""
+    __slots__ = ("scope", "queries", "db_sec", "rows")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.queries = 0
+        self.db_sec = 0.0
+        self.rows = 0
+
+    def route(self) -> Optional[str]:
+        """METHOD /라우트/템플릿 (라우팅 전이면 실제 경로)"""
+        if not self.scope:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope.get('method')} {getattr(route, 'path', None) or self.scope.get('path')}"
+
+
+_REQUEST_METRICS: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar(
+    "request_metrics", default=None
+)
+
+
+def _record_db(elapsed: float, queries: int = 0, rows: int = 0):
+    """현재 요청의 DB 사용량 누적 (요청 밖 백그라운드 작업은 무시)"""
+    m = _REQUEST_METRICS.get()
+    if m is not None:
+        m.queries += queries
+        m.db_sec += elapsed
+        m.rows += rows
+
+
+class MetricsRegistry:
+    """
+    라우트 템플릿(METHOD /clients/{client_id}/...)별 누적 지표
+    - 요청 수(상태 코드별), 처리 시간 히스토그램
+    - DB 쿼리 수, DB 시간, 조회 행 수, 응답 바이트
+    """
+
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._routes: Dict[tuple, Dict[str, Any]] = {}
+        self.started = time.time()
+
+    def observe(self, method: str, route: str, status: int, elapsed: float, m: RequestMetrics, sent: int):
+        key = (method, route)
+        with self._lock:
+            st = self._routes.get(key)
+            if st is None:
+                st = self._routes[key] = {
+                    "status": {}, "buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0,
+                    "queries": 0, "db_sec": 0.0, "rows": 0, "bytes": 0,
+                }
+            st["status"][status] = st["status"].get(status, 0) + 1
+            for i, le in enumerate(self.buckets):
+                if elapsed <= le:
+                    st["buckets"][i] += 1
+                    break
+            st["count"] += 1
+            st["sum"] += elapsed
+            st["queries"] += m.queries
+            st["db_sec"] += m.db_sec
+            st["rows"] += m.rows
+            st["bytes"] += sent
+
+    @staticmethod
+    def _label(v: Any) -> str:
+        return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        with self._lock:
+            routes = sorted((k, dict(v, status=dict(v["status"]), buckets=list(v["buckets"])))
+                            for k, v in self._routes.items())
+
+        def labels(method, route, **extra):
+            pairs = [("method", method), ("route", route)] + list(extra.items())
+            return "{" + ",".join(f'{k}="{self._label(v)}"' for k, v in pairs) + "}"
+
+        out = [
+            "# HELP payroll_http_requests_total HTTP requests by route template and status.",
+            "# TYPE payroll_http_requests_total counter",
+        ]
+        for (method, route), st in routes:
+            for status, n in sorted(st["status"].items()):
+                out.append(f"payroll_http_requests_total{labels(method, route, status=status)} {n}")
+
+        out += [
+            "# HELP payroll_http_request_duration_seconds HTTP request latency.",
+            "# TYPE payroll_http_request_duration_seconds histogram",
+        ]
+        for (method, route), st in routes:
+            acc = 0
+            for le, n in zip(self.buckets, st["buckets"]):
+                acc += n
+                out.append(f"payroll_http_request_duration_seconds_bucket{labels(method, route, le=repr(le))} {acc}")
+            out.append(f"payroll_http_request_duration_seconds_bucket{labels(method, route, le='+Inf')} {st['count']}")
+            out.append(f"payroll_http_request_duration_seconds_sum{labels(method, route)} {st['sum']:.6f}")
+            out.append(f"payroll_http_request_duration_seconds_count{labels(method, route)} {st['count']}")
+
+        for name, field, kind, help_text in (
+            ("payroll_http_db_queries_total", "queries", "counter", "SQL statements executed while handling requests."),
+            ("payroll_http_db_seconds_total", "db_sec", "counter", "Time spent executing SQL and fetching rows."),
+            ("payroll_http_db_rows_total", "rows", "counter", "Rows returned by fetch_all/fetch_one."),
+            ("payroll_http_response_bytes_total", "bytes", "counter", "Response body bytes sent."),
+        ):
+            out += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for (method, route), st in routes:
+                v = st[field]
+                out.append(f"{name}{labels(method, route)} {v:.6f}" if isinstance(v, float)
+                           else f"{name}{labels(method, route)} {v}")
+
+        pool = DB_POOL.stats()
+        ex = DB_EXECUTOR.stats(routes=False)
+        for name, kind, value, help_text in (
+            ("payroll_db_pool_in_use", "gauge", pool["inUse"], "ODBC connections checked out."),
+            ("payroll_db_pool_idle", "gauge", pool["idle"], "Idle ODBC connections in the pool."),
+            ("payroll_db_pool_waits_total", "counter", pool["waits"], "Pool checkouts that had to wait."),
+            ("payroll_db_pool_timeouts_total", "counter", pool["timeouts"], "Pool checkouts that timed out."),
+            ("payroll_db_executor_queued", "gauge", ex["queued"], "Requests waiting for a DB executor slot."),
+            ("payroll_db_executor_running", "gauge", ex["running"], "Requests running on the DB executor."),
+            ("payroll_db_executor_rejected_total", "counter", ex["rejected"], "Requests rejected with 503."),
+            ("payroll_process_start_time_seconds", "gauge", round(self.started, 3), "Server start time (unix)."),
+        ):
+            out += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(out) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    요청별 처리 시간/상태/응답 바이트 기록 (ASGI 미들웨어, 응답 본문은 그대로 전달)
+    라우트 이름은 실제 경로가 아니라 템플릿으로 묶음 (/clients/3/employees → /clients/{client_id}/employees)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        m = RequestMetrics(scope)
+        token = _REQUEST_METRICS.set(m)
+        started = time.perf_counter()
+        state = {"status": 500, "bytes": 0}
+
+        async def send_counted(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_counted)
+        finally:
+            _REQUEST_METRICS.reset(token)
+            route = scope.get("route")
+            METRICS.observe(
+                scope["method"], getattr(route, "path", None) or _UNMATCHED_ROUTE,
+                state["status"], time.perf_counter() - started, m, state["bytes"],
+            )
+
+
+# =========================
+# SQL 지문 통계 / 느린 쿼리 로그
+# =========================
+SLOW_SQL_MS = float(os.getenv("SLOW_SQL_MS", "500"))                 # 이 시간(ms) 이상 걸린 SQL 기록 (음수면 사용 안 함)
+SLOW_SQL_LOG_PATH = os.getenv(
+    "SLOW_SQL_LOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "slow_sql.log")
+)
+SLOW_SQL_LOG_MAX_MB = float(os.getenv("SLOW_SQL_LOG_MAX_MB", "10"))  # 로그 파일 하나의 최대 크기
+SLOW_SQL_LOG_BACKUPS = int(os.getenv("SLOW_SQL_LOG_BACKUPS", "5"))    # 보관할 이전 로그 파일 수
+SQL_STATS_MAX = int(os.getenv("SQL_STATS_MAX", "500"))                # 통계를 유지할 SQL 지문 수 (초과 시 오래 안 쓴 것부터 제거)
+SQL_STATS_WINDOW = int(os.getenv("SQL_STATS_WINDOW", "512"))          # 지문별 p50/p95 계산에 쓰는 최근 실행 수
+
+_FP_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_FP_STRING = re.compile(r"N?'(?:[^']|'')*'")
+_FP_NUMBER = re.compile(r"(?<![\w@#$.\]])[-+]?\d+(?:\.\d+)?\b")
+_FP_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_FP_ROWS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_FP_SPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def sql_fingerprint(sql: str) -> tuple:
+    """
+    SQL → (지문 ID, 정규화한 SQL)
+    주석 제거, 공백 통일, 문자열/숫자 리터럴 → ?, (?, ?, ...) 목록/여러 VALUES 행 → (?+)
+    IN 목록 길이나 리터럴만 다른 쿼리는 같은 지문으로 묶임
+    """
+    text = _FP_COMMENT.sub(" ", sql)
+    text = _FP_STRING.sub("?", text)
+    text = _FP_NUMBER.sub("?", text)
+    text = _FP_SPACE.sub(" ", text).strip()
+    text = _FP_LIST.sub("(?+)", text)
+    text = _FP_ROWS.sub("(?+)", text)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12], text
+
+
+def _redact_param(v: Any) -> Any:
+    """느린 쿼리 로그용 파라미터 가림 (값 대신 형식/길이만)"""
+    if v is None:
+        return None
+    if isinstance(v, (str, bytes, bytearray)):
+        return f"<{type(v).__name__}:{len(v)}>"
+    return f"<{type(v).__name__}>"
+
+
+def _redact_params(params: Any) -> Any:
+    if isinstance(params, list):  # executemany 행 목록
+        width = len(params[0]) if params and isinstance(params[0], (tuple, list)) else 0
+        return f"<{len(params)} rows x {width}>"
+    return [_redact_param(v) for v in (params or ())]
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class SqlStats:
+    """
+    SQL 지문별 누적 통계 (메모리, 스레드 안전)
+    - 호출/오류 수, 총/최대 시간, 조회 행 수
+    - 최근 SQL_STATS_WINDOW회 실행 시간으로 p50/p95
+    """
+
+    SORT_KEYS = ("total", "avg", "p95", "max", "calls", "rows", "errors")
+
+    def __init__(self, max_fingerprints: int = SQL_STATS_MAX, window: int = SQL_STATS_WINDOW):
+        self.max_fingerprints = max(1, max_fingerprints)
+        self.window = max(1, window)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.evicted = 0
+        self.since = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def observe(self, fp_id: str, fp_text: str, elapsed: float, rows: Optional[int], failed: bool):
+        with self._lock:
+            st = self._entries.get(fp_id)
+            if st is None:
+                st = self._entries[fp_id] = {
+                    "sql": fp_text, "calls": 0, "errors": 0, "totalSec": 0.0, "maxSec": 0.0,
+                    "rows": 0, "samples": deque(maxlen=self.window), "lastSeen": None,
+                }
+                while len(self._entries) > self.max_fingerprints:
+                    self._entries.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._entries.move_to_end(fp_id)
+            st["calls"] += 1
+            st["errors"] += 1 if failed else 0
+            st["totalSec"] += elapsed
+            st["maxSec"] = max(st["maxSec"], elapsed)
+            st["rows"] += rows or 0
+            st["samples"].append(elapsed)
+            st["lastSeen"] = time.time()
+
+    def top(self, n: int = 20, sort: str = "total") -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [(fp_id, dict(st, samples=sorted(st["samples"]))) for fp_id, st in self._entries.items()]
+
+        out = []
+        for fp_id, st in items:
+            calls = st["calls"]
+            out.append({
+                "fingerprintId": fp_id,
+                "sql": st["sql"],
+                "calls": calls,
+                "errors": st["errors"],
+                "rows": st["rows"],
+                "totalMs": round(st["totalSec"] * 1000, 2),
+                "avgMs": round(st["totalSec"] / calls * 1000, 2) if calls else 0.0,
+                "p50Ms": round(_percentile(st["samples"], 0.50) * 1000, 2),
+                "p95Ms": round(_percentile(st["samples"], 0.95) * 1000, 2),
+                "maxMs": round(st["maxSec"] * 1000, 2),
+                "lastSeen": datetime.fromtimestamp(st["lastSeen"], timezone.utc).isoformat(timespec="seconds"),
+            })
+        field = {"total": "totalMs", "avg": "avgMs", "p95": "p95Ms", "max": "maxMs"}.get(sort, sort)
+        out.sort(key=lambda r: r[field], reverse=True)
+        return out[:max(0, n)]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"fingerprints": len(self._entries), "evicted": self.evicted, "since": self.since}
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self.evicted = 0
+            self.since = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class SlowQueryLog:
+    """
+    threshold_ms 이상 걸린 SQL을 JSON 한 줄씩 기록 (크기 기준 회전, 파라미터는 형식/길이만)
+    파일 기록은 로깅 큐의 백그라운드 스레드에서 (요청 스레드는 큐에 넣기만 함)
+    """
+
+    def __init__(self, path: str, threshold_ms: float, max_bytes: int, backups: int):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.logged = 0
+        self._lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms >= 0
+
+    def _get_logger(self) -> logging.Logger:
+        with self._lock:
+            if self._logger is None:
+                logger = logging.getLogger("payroll.slow_sql")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8", delay=True
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(_async_handler(handler))
+                self._logger = logger
+            return self._logger
+
+    def maybe_log(self, fp_id: str, fp_text: str, params: Any, elapsed: float, rows: Optional[int], failed: bool):
+        ms = elapsed * 1000
+        if not self.enabled or ms < self.threshold_ms:
+            return
+        m = _REQUEST_METRICS.get()
+        record = {
+            "ts": now_utc(),
+            "ms": round(ms, 2),
+            "rows": rows,
+            "failed": failed,
+            "fingerprintId": fp_id,
+            "requestId": _REQUEST_ID.get(),
+            "route": m.route() if m is not None else None,
+            "thread": threading.current_thread().name,
+            "sql": fp_text,
+            "params": _redact_params(params),
+        }
+        try:
+            self._get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+            with self._lock:
+                self.logged += 1
+        except Exception as e:
+            log_db.warning("slow query log write failed: %s", e)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "thresholdMs": self.threshold_ms, "path": self.path, "logged": self.logged}
+
+
+SQL_STATS = SqlStats()
+SLOW_SQL = SlowQueryLog(SLOW_SQL_LOG_PATH, SLOW_SQL_MS, int(SLOW_SQL_LOG_MAX_MB * 1024 * 1024), SLOW_SQL_LOG_BACKUPS)
+
+
+def _observe_sql(sql: str, params: Any, elapsed: float, rows: Optional[int] = None, failed: bool = False):
+    """SQL 1회 실행 기록: 요청 지표 + 지문 통계 + 느린 쿼리 로그 (rows: 조회 행 수, DML/적재는 None)"""
+    _record_db(elapsed, queries=1, rows=rows or 0)
+    fp_id, fp_text = sql_fingerprint(sql)
+    SQL_STATS.observe(fp_id, fp_text, elapsed, rows, failed)
+    SLOW_SQL.maybe_log(fp_id, fp_text, params, elapsed, rows, failed)
+
+
+# SQLSTATE: 42S22 = 잘못된 컬럼 이름, 42S02 = 잘못된 개체 이름
+_SCHEMA_ERROR_STATES = ("42S22", "42S02")
+
+
+def _is_schema_error(e: Exception) -> bool:
+    args = getattr(e, "args", ())
+    state = str(args[0]) if args else ""
+    if state in _SCHEMA_ERROR_STATES:
+        return True
+    msg = str(e)
+    return any(s in msg for s in _SCHEMA_ERROR_STATES) or "Invalid column name" in msg
+
+
+def _run_sql(cur: pyodbc.Cursor, sql: str, params: tuple = ()):
+    # 스키마 오류 시 스키마 캐시 무효화 (시간 측정은 호출 측)
+    try:
+        return cur.execute(sql, params)
+    except pyodbc.Error as e:
+        if _is_schema_error(e):
+            SCHEMA.invalidate(f"query failed: {e}")
+        raise
+
+
+def _execute(cur: pyodbc.Cursor, sql: str, params: tuple = ()):
+    """모든 SQL 실행의 공통 진입점 (스키마 오류 시 스키마 캐시 무효화, 지표/지문 통계/느린 쿼리 기록)"""
+    started = time.perf_counter()
+    failed = True
+    try:
+        out = _run_sql(cur, sql, params)
+        failed = False
+        return out
+    finally:
+        _observe_sql(sql, params, time.perf_counter() - started, failed=failed)
+
+
+def _execute_many(cur: pyodbc.Cursor, sql: str, rows: list):
+    """스테이징 적재용 fast_executemany (_execute와 같은 스키마 오류 처리/기록, 1회로 집계)"""
+    started = time.perf_counter()
+    failed = True
+    cur.fast_executemany = True
+    try:
+        cur.executemany(sql, rows)
+        failed = False
+    except pyodbc.Error as e:
+        if _is_schema_error(e):
+            SCHEMA.invalidate(f"query failed: {e}")
+        raise
+    finally:
+        cur.fast_executemany = False
+        _observe_sql(sql, rows, time.perf_counter() - started, failed=failed)
 
 
 def exec_sql(conn: pyodbc.Connection, sql: str, params: tuple = ()) -> int:
     cur = conn.cursor()
-    cur.execute(sql, params)
+    _execute(cur, sql, params)
     rowcount = cur.rowcount
     conn.commit()
     return rowcount
 
 
 def fetch_all(conn: pyodbc.Connection, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
-    cur = conn.cursor()
-    cur.execute(sql, params)
-    cols = [c[0] for c in cur.description]
-    rows = []
-    for r in cur.fetchall():
-        rows.append({cols[i]: r[i] for i in range(len(cols))})
-    return rows
+    # 실행 + 행 읽기까지 한 번으로 기록
+    started = time.perf_counter()
+    rows: Optional[List[Dict[str, Any]]] = None
+    try:
+        cur = conn.cursor()
+        _run_sql(cur, sql, params)
+        cols = [c[0] for c in cur.description]
+        rows = []
+        for r in cur.fetchall():
+            rows.append({cols[i]: r[i] for i in range(len(cols))})
+        return rows
+    finally:
+        _observe_sql(sql, params, time.perf_counter() - started,
+                     rows=len(rows) if rows is not None else None, failed=rows is None)
 
 
 def fetch_one(conn: pyodbc.Connection, sql: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
-    cur = conn.cursor()
-    cur.execute(sql, params)
-    row = cur.fetchone()
+    started = time.perf_counter()
+    done = False
+    row = None
+    try:
+        cur = conn.cursor()
+        _run_sql(cur, sql, params)
+        row = cur.fetchone()
+        done = True
+    finally:
+        _observe_sql(sql, params, time.perf_counter() - started, rows=1 if row else 0, failed=not done)
     if not row:
         return None
     cols = [c[0] for c in cur.description]
@@ -137,6 +1283,9 @@ def object_exists(conn: pyodbc.Connection, full_name: str, obj_type: str) -> boo
 
 
 def table_exists(conn: pyodbc.Connection, full_name: str) -> bool:
+    known = SCHEMA.has_table(conn, full_name)
+    if known is not None:
+        return known
     return object_exists(conn, full_name, "U")
 
 
@@ -145,7 +1294,10 @@ def view_exists(conn: pyodbc.Connection, full_name: str) -> bool:
 
 
 def column_exists(conn: pyodbc.Connection, table_name: str, column_name: str) -> bool:
-    """테이블에 컬럼이 있는지 확인"""
+    """테이블에 컬럼이 있는지 확인 (추적 테이블은 스키마 캐시에서 조회)"""
+    known = SCHEMA.has_column(conn, table_name, column_name)
+    if known is not None:
+        return known
     row = fetch_one(
         conn,
         "SELECT 1 AS ok FROM sys.columns "
@@ -155,6 +1307,581 @@ def column_exists(conn: pyodbc.Connection, table_name: str, column_name: str) ->
     return bool(row and row.get("ok") == 1)
 
 
+# =========================
+# 스키마 캐시 (테이블/컬럼 존재 여부)
+# =========================
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "600"))
+
+# 핸들러에서 table_exists / column_exists로 확인하는 테이블 목록
+SCHEMA_TRACKED_TABLES = [
+    "dbo.거래처",
+    "dbo.Employees",
+    "dbo.PayrollMonthlyInput",
+    "dbo.PayrollResults",
+    "dbo.MonthlyData",
+    "dbo.PayrollDocLog",
+    "dbo.PayrollMailLog",
+    "dbo.PayrollMailStatus",
+    "dbo.급여발송로그",
+    "dbo.SmtpConfig",
+    "dbo.AppSettings",
+    "dbo.AllowanceMasters",
+    "dbo.DeductionMasters",
+]
+
+
+def _norm_table_name(name: str) -> str:
+    n = name.replace("[", "").replace("]", "").strip()
+    if "." not in n:
+        n = "dbo." + n
+    return n.lower()
+
+
+class SchemaRegistry:
+    """
+    추적 테이블의 sys.tables / sys.columns 메타데이터를 한 번의 쿼리로 적재해 메모리에서 조회
+    - TTL 경과, invalidate() 호출, 컬럼/개체 오류 발생 시 다음 조회에서 다시 적재
+    - 컬럼 구성이 바뀌면 version 증가 (SQL 문 캐시 키로 사용)
+    """
+
+    def __init__(self, tables: List[str], ttl: float):
+        self.ttl = ttl
+        self._tracked = {_norm_table_name(t): t for t in tables}
+        self._lock = threading.Lock()
+        self._columns: Dict[str, frozenset] = {}
+        self._loaded_at: Optional[float] = None
+        self._loaded_at_utc: Optional[str] = None
+        self._stale = True
+        self._last_invalidation: Optional[str] = None
+        self.version = 0
+        self.loads = 0
+
+    def _load(self, conn: pyodbc.Connection):
+        names = list(self._tracked.values())
+        marks = ", ".join(["?"] * len(names))
+        rows = fetch_all(
+            conn,
+            "SELECT s.name AS schemaName, t.name AS tableName, c.name AS columnName "
+            "FROM sys.tables t "
+            "JOIN sys.schemas s ON s.schema_id = t.schema_id "
+            "LEFT JOIN sys.columns c ON c.object_id = t.object_id "
+            f"WHERE s.name + '.' + t.name IN ({marks})",
+            tuple(names),
+        )
+
+        cols: Dict[str, set] = {}
+        for r in rows:
+            key = f"{r['schemaName']}.{r['tableName']}".lower()
+            bucket = cols.setdefault(key, set())
+            if r.get("columnName"):
+                bucket.add(str(r["columnName"]).lower())
+
+        new_columns = {k: frozenset(v) for k, v in cols.items()}
+        if new_columns != self._columns:
+            self.version += 1
+        self._columns = new_columns
+        self._loaded_at = time.monotonic()
+        self._loaded_at_utc = now_utc()
+        self._stale = False
+        self.loads += 1
+
+    def ensure(self, conn: pyodbc.Connection):
+        if not self._stale and self._loaded_at is not None and (
+            self.ttl <= 0 or time.monotonic() - self._loaded_at < self.ttl
+        ):
+            return
+        with self._lock:
+            # 다른 스레드가 먼저 적재했으면 건너뜀
+            if not self._stale and self._loaded_at is not None and (
+                self.ttl <= 0 or time.monotonic() - self._loaded_at < self.ttl
+            ):
+                return
+            self._load(conn)
+
+    def refresh(self, conn: pyodbc.Connection) -> Dict[str, Any]:
+        with self._lock:
+            self._load(conn)
+        return self.snapshot()
+
+    def invalidate(self, reason: str = "manual"):
+        self._stale = True
+        self._last_invalidation = f"{now_utc()} {reason}"
+
+    def has_table(self, conn: pyodbc.Connection, table: str) -> Optional[bool]:
+        key = _norm_table_name(table)
+        if key not in self._tracked:
+            return None
+        self.ensure(conn)
+        return key in self._columns
+
+    def has_column(self, conn: pyodbc.Connection, table: str, column: str) -> Optional[bool]:
+        key = _norm_table_name(table)
+        if key not in self._tracked:
+            return None
+        self.ensure(conn)
+        return column.lower() in self._columns.get(key, frozenset())
+
+    def columns(self, conn: pyodbc.Connection, table: str) -> Optional[frozenset]:
+        """추적 테이블의 컬럼 이름 집합 (테이블이 없거나 추적 대상이 아니면 None)"""
+        key = _norm_table_name(table)
+        if key not in self._tracked:
+            return None
+        self.ensure(conn)
+        return self._columns.get(key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "loads": self.loads,
+            "loadedAt": self._loaded_at_utc,
+            "stale": self._stale,
+            "ttlSec": self.ttl,
+            "lastInvalidation": self._last_invalidation,
+            "tables": {
+                name: len(self._columns[key]) if key in self._columns else None
+                for key, name in self._tracked.items()
+            },
+        }
+
+
+SCHEMA = SchemaRegistry(SCHEMA_TRACKED_TABLES, SCHEMA_CACHE_TTL)
+
+
+# =========================
+# SQL 문 캐시 (스키마 버전별 1회 컴파일)
+# =========================
+class CompiledStatement:
+    """
+    컴파일된 SQL 문
+    - extract: 요청 객체에서 행 값을 뽑는 함수 목록 (컬럼 순서)
+    - layout: SQL 파라미터 순서 = 행 값 인덱스 목록 (None이면 행 그대로)
+    - shape: 조회 결과 행 후처리 함수
+    - extra: 같은 계획을 공유하는 보조 SQL (스테이징 등)
+    """
+
+    __slots__ = ("name", "sql", "columns", "extract", "layout", "shape", "extra")
+
+    def __init__(self, name: str, sql: str, columns: Optional[List[str]] = None, extract=None, layout=None, shape=None,
+                 extra: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.sql = sql
+        self.columns = columns or []
+        self.extract = extract or []
+        self.layout = layout
+        self.shape = shape
+        self.extra = extra or {}
+
+    def row(self, src) -> tuple:
+        return tuple([f(src) for f in self.extract])
+
+    def params(self, src) -> tuple:
+        row = self.row(src)
+        if self.layout is None:
+            return row
+        return tuple([row[i] for i in self.layout])
+
+
+class StatementCache:
+    """(문 이름, 스키마 버전) 단위로 컴파일 결과 보관. 스키마 버전이 바뀌면 전체 폐기"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: Dict[str, CompiledStatement] = {}
+        self._version = -1
+        self.hits = 0
+        self.compiles = 0
+
+    def get(self, conn: pyodbc.Connection, name: str, compiler) -> CompiledStatement:
+        SCHEMA.ensure(conn)
+        version = SCHEMA.version
+        if self._version == version:
+            st = self._items.get(name)
+            if st is not None:
+                self.hits += 1
+                return st
+
+        with self._lock:
+            if self._version != version:
+                self._items = {}
+                self._version = version
+            st = self._items.get(name)
+            if st is None:
+                st = compiler(conn)
+                self._items[name] = st
+                self.compiles += 1
+            return st
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "schemaVersion": self._version,
+            "statements": sorted(self._items.keys()),
+            "hits": self.hits,
+            "compiles": self.compiles,
+        }
+
+
+STATEMENTS = StatementCache()
+
+
+def _blank_to_none(v: Optional[str]) -> Optional[str]:
+    return v if v and v.strip() else None
+
+
+def _float_or_zero(v) -> float:
+    return float(v or 0)
+
+
+def _float_or_none(v) -> Optional[float]:
+    return float(v) if v is not None else None
+
+
+def _strip_or_none(v) -> Optional[str]:
+    return str(v).strip() if v is not None else None
+
+
+# 직원 기본 쓰기 컬럼 (MERGE UPDATE 대상)
+_EMP_BASE_WRITE = [
+    ("EmploymentType", lambda b: b.employmentType),
+    ("SalaryType", lambda b: b.salaryType),
+    ("BaseSalary", lambda b: b.baseSalary),
+    ("HourlyRate", lambda b: b.hourlyRate),
+    ("NormalHours", lambda b: b.normalHours),
+    ("FoodAllowance", lambda b: b.foodAllowance),
+    ("CarAllowance", lambda b: b.carAllowance),
+    ("EmailTo", lambda b: b.emailTo),
+    ("EmailCc", lambda b: b.emailCc),
+    ("UseEmail", lambda b: int(b.useEmail)),
+]
+
+# 직원 기본 조회 컬럼
+_EMP_BASE_SELECT = [
+    "EmploymentType AS employmentType",
+    "SalaryType AS salaryType",
+    "BaseSalary AS baseSalary",
+    "HourlyRate AS hourlyRate",
+    "NormalHours AS normalHours",
+    "FoodAllowance AS foodAllowance",
+    "CarAllowance AS carAllowance",
+    "EmailTo AS emailTo",
+    "EmailCc AS emailCc",
+    "UseEmail AS useEmail",
+]
+
+_EMP_FLOAT_KEYS = ["baseSalary", "hourlyRate", "normalHours", "foodAllowance", "carAllowance"]
+
+# 직원 선택 컬럼 (DB에 있을 때만 사용)
+# (컬럼, 응답 키, SELECT 식, 컬럼 없을 때 기본값, 조회값 변환, 쓰기값 추출)
+_EMP_OPTIONAL = [
+    ("EmpNo", "empNo", "{p}EmpNo AS empNo", None, _strip_or_none, None),
+    ("HasNationalPension", "hasNationalPension", None, True, bool, lambda b: int(b.hasNationalPension)),
+    ("HasHealthInsurance", "hasHealthInsurance", None, True, bool, lambda b: int(b.hasHealthInsurance)),
+    ("HasEmploymentInsurance", "hasEmploymentInsurance", None, True, bool, lambda b: int(b.hasEmploymentInsurance)),
+    ("HealthInsuranceBasis", "healthInsuranceBasis", None, "salary", None, lambda b: b.healthInsuranceBasis),
+    ("PensionInsurableWage", "pensionInsurableWage", None, None, _float_or_none, lambda b: b.pensionInsurableWage),
+    ("JoinDate", "joinDate", "CONVERT(NVARCHAR(10), {p}JoinDate, 23) AS joinDate", None, None, lambda b: _blank_to_none(b.joinDate)),
+    ("ResignDate", "resignDate", "CONVERT(NVARCHAR(10), {p}ResignDate, 23) AS resignDate", None, None, lambda b: _blank_to_none(b.resignDate)),
+    ("TaxDependents", "taxDependents", None, 1, None, lambda b: b.taxDependents),
+    ("ChildrenCount", "childrenCount", None, 0, None, lambda b: b.childrenCount),
+    ("TaxFreeMeal", "taxFreeMeal", None, 0.0, _float_or_zero, lambda b: b.taxFreeMeal),
+    ("TaxFreeCarMaintenance", "taxFreeCarMaintenance", None, 0.0, _float_or_zero, lambda b: b.taxFreeCarMaintenance),
+    ("OtherTaxFree", "otherTaxFree", None, 0.0, _float_or_zero, lambda b: b.otherTaxFree),
+    ("IncomeTaxRate", "incomeTaxRate", None, 100, None, lambda b: b.incomeTaxRate),
+]
+
+
+def _employee_optional_present(conn: pyodbc.Connection) -> List[tuple]:
+    return [spec for spec in _EMP_OPTIONAL if column_exists(conn, "dbo.Employees", spec[0])]
+
+
+def _employee_select_parts(present: List[tuple], alias: str = "") -> List[str]:
+    p = f"{alias}." if alias else ""
+    present_cols = {spec[0] for spec in present}
+    parts = [
+        f"{p}EmployeeId AS employeeId",
+        f"{p}ClientId AS clientId",
+        f"{p}Name AS name",
+        f"{p}BirthDate AS birthDate",
+    ]
+    if "EmpNo" in present_cols:
+        parts.append(f"{p}EmpNo AS empNo")
+    parts += [f"{p}{x}" for x in _EMP_BASE_SELECT]
+    for col, key, expr, _default, _read, _write in present:
+        if col == "EmpNo":
+            continue
+        if expr:
+            parts.append(expr.format(p=p))
+        else:
+            parts.append(f"{p}{col} AS {key}")
+    parts.append(f"CONVERT(NVARCHAR(19), {p}UpdatedAt, 126) AS updatedAt")
+    return parts
+
+
+def _employee_shaper(present: List[tuple]):
+    present_cols = {spec[0] for spec in present}
+    converters = [(key, read) for col, key, _e, _d, read, _w in present if read is not None]
+    defaults = [(key, default) for col, key, _e, default, _r, _w in _EMP_OPTIONAL if col not in present_cols]
+
+    def shape(r: Dict[str, Any]) -> Dict[str, Any]:
+        for k in _EMP_FLOAT_KEYS:
+            r[k] = float(r.get(k) or 0)
+        r["useEmail"] = bool(r.get("useEmail"))
+        for k, conv in converters:
+            r[k] = conv(r.get(k))
+        for k, d in defaults:
+            r[k] = d
+        return r
+
+    return shape
+
+
+def compile_employee_select(name: str, where: str):
+    """직원 조회 SELECT 컴파일러 (where: 'ClientId=? ORDER BY Name' 등)"""
+    def compiler(conn: pyodbc.Connection) -> CompiledStatement:
+        present = _employee_optional_present(conn)
+        sql = f"SELECT {', '.join(_employee_select_parts(present))} FROM dbo.Employees WHERE {where}"
+        return CompiledStatement(name, sql, shape=_employee_shaper(present))
+    return compiler
+
+
+def compile_employee_merge(conn: pyodbc.Connection) -> CompiledStatement:
+    """직원 MERGE 컴파일 (키: ClientId + Name + BirthDate)"""
+    present = _employee_optional_present(conn)
+
+    write = [
+        ("ClientId", lambda b: b.clientId),
+        ("Name", lambda b: b.name),
+        ("BirthDate", lambda b: b.birthDate),
+    ] + _EMP_BASE_WRITE + [(col, w) for col, _k, _e, _d, _r, w in present if w is not None]
+
+    columns = [c for c, _ in write]
+    update_sets = [f"{c}=?" for c in columns[3:]] + ["UpdatedAt=SYSUTCDATETIME()"]
+
+    sql = f"""
+        MERGE dbo.Employees AS t
+        USING (SELECT ? AS ClientId, ? AS Name, ? AS BirthDate) AS s
+        ON (t.ClientId=s.ClientId AND t.Name=s.Name AND t.BirthDate=s.BirthDate)
+        WHEN MATCHED THEN
+            UPDATE SET {', '.join(update_sets)}
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(columns)})
+            VALUES ({', '.join(['?'] * len(columns))});
+        """
+
+    n = len(columns)
+    layout = [0, 1, 2] + list(range(3, n)) + list(range(n))
+    return CompiledStatement(
+        "employees.merge", sql, columns=columns, extract=[f for _, f in write], layout=layout,
+    )
+
+
+def compile_employee_bulk_merge(conn: pyodbc.Connection) -> CompiledStatement:
+    """
+    직원 일괄 MERGE 컴파일
+    - stage: #EmpStage 임시 테이블 생성 (Employees 컬럼 타입 그대로 복사)
+    - insert: 스테이징 INSERT (fast_executemany 대상)
+    - sql: 집합 기반 MERGE, 결과는 OUTPUT INTO #EmpOut (트리거 있는 테이블도 허용)
+    - select: #EmpOut 기준 재조회 (EmpNo 트리거 반영)
+    """
+    single = compile_employee_merge(conn)
+    present = _employee_optional_present(conn)
+    columns = single.columns
+    update_cols = columns[3:]
+
+    stage_sql = (
+        "IF OBJECT_ID('tempdb..#EmpStage') IS NOT NULL DROP TABLE #EmpStage; "
+        "IF OBJECT_ID('tempdb..#EmpOut') IS NOT NULL DROP TABLE #EmpOut; "
+        f"SELECT TOP 0 CAST(0 AS INT) AS RowNo, {', '.join(columns)} INTO #EmpStage FROM dbo.Employees; "
+        "CREATE TABLE #EmpOut (Act NVARCHAR(10) NOT NULL, EmployeeId INT NOT NULL, RowNo INT NOT NULL);"
+    )
+    insert_sql = (
+        f"INSERT INTO #EmpStage (RowNo, {', '.join(columns)}) "
+        f"VALUES ({', '.join(['?'] * (len(columns) + 1))})"
+    )
+    merge_sql = f"""
+        MERGE dbo.Employees AS t
+        USING #EmpStage AS s
+        ON (t.ClientId=s.ClientId AND t.Name=s.Name AND t.BirthDate=s.BirthDate)
+        WHEN MATCHED THEN
+            UPDATE SET {', '.join(f't.{c}=s.{c}' for c in update_cols)}, t.UpdatedAt=SYSUTCDATETIME()
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(columns)})
+            VALUES ({', '.join(f's.{c}' for c in columns)})
+        OUTPUT $action, inserted.EmployeeId, s.RowNo INTO #EmpOut (Act, EmployeeId, RowNo);
+        """
+    select_sql = (
+        f"SELECT o.RowNo AS rowNo, o.Act AS mergeAction, {', '.join(_employee_select_parts(present, 'e'))} "
+        "FROM #EmpOut o JOIN dbo.Employees e ON e.EmployeeId = o.EmployeeId ORDER BY o.RowNo"
+    )
+    drop_sql = (
+        "IF OBJECT_ID('tempdb..#EmpStage') IS NOT NULL DROP TABLE #EmpStage; "
+        "IF OBJECT_ID('tempdb..#EmpOut') IS NOT NULL DROP TABLE #EmpOut;"
+    )
+    return CompiledStatement(
+        "employees.bulk_merge", merge_sql, columns=columns, extract=single.extract,
+        shape=_employee_shaper(present),
+        extra={"stage": stage_sql, "insert": insert_sql, "select": select_sql, "drop": drop_sql},
+    )
+
+
+# 급여 결과 쓰기 컬럼 (MERGE 키 EmployeeId/Year/Month 다음 순서)
+_PR_REQUIRED = object()
+
+
+def _pr_value(key: str, default=None):
+    if default is _PR_REQUIRED:
+        return lambda d: d[key]
+    return lambda d: d.get(key, default)
+
+
+def _pr_json(key: str):
+    return lambda d: json.dumps(d.get(key, {}), ensure_ascii=False)
+
+
+_PR_WRITE = [
+    ("ClientId", _pr_value("clientId", _PR_REQUIRED)),
+    ("BaseSalary", _pr_value("baseSalary", _PR_REQUIRED)),
+    ("OvertimeAllowance", _pr_value("overtimeAllowance", 0)),
+    ("NightAllowance", _pr_value("nightAllowance", 0)),
+    ("HolidayAllowance", _pr_value("holidayAllowance", 0)),
+    ("WeeklyHolidayPay", _pr_value("weeklyHolidayPay", 0)),
+    ("Bonus", _pr_value("bonus", 0)),
+    ("AdditionalAllowance1Name", _pr_value("additionalAllowance1Name")),
+    ("AdditionalAllowance1Amount", _pr_value("additionalAllowance1Amount", 0)),
+    ("AdditionalAllowance2Name", _pr_value("additionalAllowance2Name")),
+    ("AdditionalAllowance2Amount", _pr_value("additionalAllowance2Amount", 0)),
+    ("TotalPayment", _pr_value("totalPayment", _PR_REQUIRED)),
+    ("NationalPension", _pr_value("nationalPension", 0)),
+    ("HealthInsurance", _pr_value("healthInsurance", 0)),
+    ("LongTermCare", _pr_value("longTermCare", 0)),
+    ("EmploymentInsurance", _pr_value("employmentInsurance", 0)),
+    ("IncomeTax", _pr_value("incomeTax", 0)),
+    ("LocalIncomeTax", _pr_value("localIncomeTax", 0)),
+    ("AdditionalDeduction1Name", _pr_value("additionalDeduction1Name")),
+    ("AdditionalDeduction1Amount", _pr_value("additionalDeduction1Amount", 0)),
+    ("AdditionalDeduction2Name", _pr_value("additionalDeduction2Name")),
+    ("AdditionalDeduction2Amount", _pr_value("additionalDeduction2Amount", 0)),
+    ("TotalDeduction", _pr_value("totalDeduction", _PR_REQUIRED)),
+    ("NetPay", _pr_value("netPay", _PR_REQUIRED)),
+    ("PaymentFormulas", _pr_json("paymentFormulas")),
+    ("DeductionFormulas", _pr_json("deductionFormulas")),
+    ("NormalHours", _pr_value("normalHours")),
+    ("OvertimeHours", _pr_value("overtimeHours")),
+    ("NightHours", _pr_value("nightHours")),
+    ("HolidayHours", _pr_value("holidayHours")),
+    ("AttendanceWeeks", _pr_value("attendanceWeeks")),
+]
+
+# ✅ 두루누리 컬럼 (DB에 있을 때만)
+_PR_DURU = [
+    ("DuruNuriEmployerContribution", lambda d: float(d.get("duruNuriEmployerContribution", 0) or 0)),
+    ("DuruNuriEmployeeContribution", lambda d: float(d.get("duruNuriEmployeeContribution", 0) or 0)),
+    ("DuruNuriApplied", lambda d: 1 if bool(d.get("duruNuriApplied", False)) else 0),
+]
+
+# 문자열 컬럼 (나머지는 숫자: 일괄 저장 시 행 단위로 미리 검사)
+_PR_TEXT_COLUMNS = {
+    "AdditionalAllowance1Name", "AdditionalAllowance2Name",
+    "AdditionalDeduction1Name", "AdditionalDeduction2Name",
+    "PaymentFormulas", "DeductionFormulas", "CalculatedBy",
+}
+
+
+def _pr_check_numbers(columns: List[str], row: tuple):
+    """숫자 컬럼에 숫자가 아닌 값이 있으면 ValueError (fast_executemany 적재 전체가 실패하지 않도록)"""
+    for col, v in zip(columns, row):
+        if col in _PR_TEXT_COLUMNS or v is None or isinstance(v, (int, float)):
+            continue
+        if isinstance(v, str):
+            try:
+                float(v)
+                continue
+            except ValueError:
+                pass
+        raise ValueError(f"{col} is not a number: {v!r}")
+
+
+def compile_payroll_result_merge(conn: pyodbc.Connection) -> CompiledStatement:
+    """급여 결과 MERGE 컴파일 (키: EmployeeId + Year + Month)"""
+    write = [
+        ("EmployeeId", _pr_value("employeeId", _PR_REQUIRED)),
+        ("Year", _pr_value("year", _PR_REQUIRED)),
+        ("Month", _pr_value("month", _PR_REQUIRED)),
+    ] + _PR_WRITE + [
+        (col, f) for col, f in _PR_DURU if column_exists(conn, "dbo.PayrollResults", col)
+    ] + [
+        ("CalculatedBy", _pr_value("calculatedBy", "system")),
+    ]
+
+    columns = [c for c, _ in write]
+    update_cols = columns[3:]
+    update_sets = [f"{c} = ?" for c in update_cols[:-1]] + ["CalculatedAt = SYSUTCDATETIME()", "CalculatedBy = ?"]
+
+    sql = f"""
+        MERGE dbo.PayrollResults AS target
+        USING (SELECT ? AS EmployeeId, ? AS Year, ? AS Month) AS source
+        ON target.EmployeeId = source.EmployeeId 
+            AND target.Year = source.Year 
+            AND target.Month = source.Month
+        WHEN MATCHED THEN
+            UPDATE SET {', '.join(update_sets)}
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(columns)})
+            VALUES ({', '.join(['?'] * len(columns))});
+        """
+
+    n = len(columns)
+    layout = [0, 1, 2] + list(range(3, n)) + list(range(n))
+    return CompiledStatement(
+        "payroll_results.merge", sql, columns=columns, extract=[f for _, f in write], layout=layout,
+    )
+
+
+def compile_payroll_result_bulk_merge(conn: pyodbc.Connection) -> CompiledStatement:
+    """
+    급여 결과 일괄 MERGE 컴파일 (거래처/월 단위 저장)
+    - stage/insert: #PrStage 생성 및 적재 (fast_executemany)
+    - sql: 집합 기반 MERGE, OUTPUT INTO #PrOut
+    - select: 행별 처리 결과 (RowNo 순)
+    """
+    single = compile_payroll_result_merge(conn)
+    columns = single.columns
+    update_cols = columns[3:-1]  # CalculatedBy는 CalculatedAt과 함께 마지막에 갱신
+
+    stage_sql = (
+        "IF OBJECT_ID('tempdb..#PrStage') IS NOT NULL DROP TABLE #PrStage; "
+        "IF OBJECT_ID('tempdb..#PrOut') IS NOT NULL DROP TABLE #PrOut; "
+        f"SELECT TOP 0 CAST(0 AS INT) AS RowNo, {', '.join(columns)} INTO #PrStage FROM dbo.PayrollResults; "
+        "CREATE TABLE #PrOut (Act NVARCHAR(10) NOT NULL, ResultId INT NOT NULL, RowNo INT NOT NULL);"
+    )
+    insert_sql = (
+        f"INSERT INTO #PrStage (RowNo, {', '.join(columns)}) "
+        f"VALUES ({', '.join(['?'] * (len(columns) + 1))})"
+    )
+    merge_sql = f"""
+        MERGE dbo.PayrollResults AS t
+        USING #PrStage AS s
+        ON t.EmployeeId = s.EmployeeId
+            AND t.Year = s.Year
+            AND t.Month = s.Month
+        WHEN MATCHED THEN
+            UPDATE SET {', '.join(f't.{c} = s.{c}' for c in update_cols)},
+                t.CalculatedAt = SYSUTCDATETIME(), t.CalculatedBy = s.CalculatedBy
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(columns)})
+            VALUES ({', '.join(f's.{c}' for c in columns)})
+        OUTPUT $action, inserted.ResultId, s.RowNo INTO #PrOut (Act, ResultId, RowNo);
+        """
+    select_sql = "SELECT RowNo AS rowNo, Act AS mergeAction, ResultId AS resultId FROM #PrOut ORDER BY RowNo"
+    drop_sql = (
+        "IF OBJECT_ID('tempdb..#PrStage') IS NOT NULL DROP TABLE #PrStage; "
+        "IF OBJECT_ID('tempdb..#PrOut') IS NOT NULL DROP TABLE #PrOut;"
+    )
+    return CompiledStatement(
+        "payroll_results.bulk_merge", merge_sql, columns=columns, extract=single.extract,
+        extra={"stage": stage_sql, "insert": insert_sql, "select": select_sql, "drop": drop_sql},
+    )
+
+
 # =========================
 # 유틸
 # =========================
@@ -198,63 +1925,336 @@ def require_api_key(x_api_key: Optional[str] = Header(default=None, alias="X-API
 # =========================
 # 공휴일 API
 # =========================
-def fetch_holidays(year: int) -> set[date]:
-    if year in _HOLIDAY_CACHE:
-        return _HOLIDAY_CACHE[year]
+def _parse_holiday_day(v) -> Optional[date]:
+    s = str(v or "").strip().replace("-", "")
+    if not re.match(r"^\d{8}$", s):
+        return None
+    return date(int(s[0:4]), int(s[4:6]), int(s[6:8]))
 
-    holidays: set[date] = set()
 
-    if not HOLIDAY_SERVICE_KEY or not str(HOLIDAY_SERVICE_KEY).strip():
-        _HOLIDAY_CACHE[year] = holidays
-        _HOLIDAY_CACHE_ERR[year] = "HOLIDAY_SERVICE_KEY is empty"
-        return holidays
+def _fetch_holiday_month(year: int, month: int) -> set[date]:
+    """특일정보 API 한 달 조회 (엔드포인트 순서대로 시도, 모두 실패하면 마지막 오류로 예외)"""
+    last_err = "no endpoint"
+    for ep in _HOLIDAY_ENDPOINTS:
+        try:
+            params = {
+                "ServiceKey": HOLIDAY_SERVICE_KEY,
+                "solYear": str(year),
+                "solMonth": f"{month:02d}",
+                "_type": "xml",
+            }
+            r = requests.get(ep, params=params, timeout=5)
+            r.raise_for_status()
+
+            root = ET.fromstring(r.text)
+            result_code = root.findtext(".//resultCode")
+            result_msg = root.findtext(".//resultMsg")
+            if result_code and result_code != "00":
+                last_err = f"{result_code}:{result_msg}"
+                continue
 
-    last_err: Optional[str] = None
+            days: set[date] = set()
+            for e in root.findall(".//item/locdate"):
+                d = _parse_holiday_day(e.text if e is not None else None)
+                if d:
+                    days.add(d)
+            return days
 
-    for month in range(1, 13):
-        sol_month = f"{month:02d}"
-        month_ok = False
-        for ep in _HOLIDAY_ENDPOINTS:
-            try:
-                params = {
-                    "ServiceKey": HOLIDAY_SERVICE_KEY,
-                    "solYear": str(year),
-                    "solMonth": sol_month,
-                    "_type": "xml",
-                }
-                r = requests.get(ep, params=params, timeout=5)
-                r.raise_for_status()
-
-                root = ET.fromstring(r.text)
-                result_code = root.findtext(".//resultCode")
-                result_msg = root.findtext(".//resultMsg")
-                if result_code and result_code != "00":
-                    last_err = f"{result_code}:{result_msg}"
-                    continue
+        except Exception as ex:
+            last_err = str(ex)
 
-                for e in root.findall(".//item/locdate"):
-                    if e is None or not e.text:
-                        continue
-                    s = e.text.strip()
-                    if re.match(r"^\d{8}$", s):
-                        y = int(s[0:4])
-                        m = int(s[4:6])
-                        d = int(s[6:8])
-                        holidays.add(date(y, m, d))
+    raise RuntimeError(f"{month:02d}월: {last_err}")
 
-                month_ok = True
-                break
 
-            except Exception as ex:
-                last_err = str(ex)
+class HolidayStore:
+    """
+    연도별 공휴일 저장소
+    - 요청 경로(get)는 메모리/SQLite만 조회하고 네트워크를 기다리지 않음
+    - 없는 연도, 일부 월 실패, 오래된 연도는 백그라운드에서 12개월을 동시에 받아 SQLite에 저장
+    - fixture 경로 지정 시 해당 JSON만 사용 (외부 API 호출 없음)
+      형식: {"2025": ["2025-01-01", "20250128", ...], ...}
+    """
+
+    def __init__(self, db_path: str, fixture_path: str = "", offline: bool = False,
+                 workers: int = 6, refresh_days: float = 7, retry_minutes: float = 10):
+        self.db_path = db_path
+        self.fixture_path = fixture_path
+        self.offline = offline or bool(fixture_path)
+        self.workers = max(1, workers)
+        self.refresh_sec = refresh_days * 86400
+        self.retry_sec = retry_minutes * 60
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._years: Dict[int, set[date]] = {}
+        self._meta: Dict[int, Dict[str, Any]] = {}
+        self._inflight: set[int] = set()
+        self._executor = None
+        self._db_ready = False
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.version = 0  # 공휴일 내용이 바뀔 때마다 증가 (영업일 달력 캐시 키)
+
+        if fixture_path:
+            self._load_fixture()
+
+    # ---- SQLite ----
+    def _db(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS holiday_years ("
+                " year INTEGER PRIMARY KEY, status TEXT NOT NULL, error TEXT,"
+                " fetched_at REAL NOT NULL, fetched_at_utc TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS holidays ("
+                " year INTEGER NOT NULL, day TEXT NOT NULL, PRIMARY KEY (year, day))"
+            )
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _read_year(self, year: int) -> bool:
+        """SQLite에 저장된 연도를 메모리로 올림 (없으면 False)"""
+        try:
+            with self._db_lock:
+                conn = self._db()
+                try:
+                    meta = conn.execute(
+                        "SELECT status, error, fetched_at, fetched_at_utc FROM holiday_years WHERE year=?",
+                        (year,),
+                    ).fetchone()
+                    days = conn.execute("SELECT day FROM holidays WHERE year=?", (year,)).fetchall() if meta else []
+                finally:
+                    conn.close()
+        except Exception as e:
+            log_holiday.warning("holiday store read failed (%s): %s", year, e)
+            return False
+
+        if not meta:
+            return False
+        with self._lock:
+            self._years[year] = {d for d in (_parse_holiday_day(r[0]) for r in days) if d}
+            self.version += 1
+            self._meta[year] = {
+                "status": meta[0], "error": meta[1], "fetchedAt": meta[2], "fetchedAtUtc": meta[3], "source": "sqlite",
+            }
+        return True
+
+    def _write_year(self, year: int, days: set[date], status: str, error: Optional[str]):
+        fetched_at = time.time()
+        fetched_at_utc = now_utc()
+        try:
+            with self._db_lock:
+                conn = self._db()
+                try:
+                    conn.execute("DELETE FROM holidays WHERE year=?", (year,))
+                    conn.executemany(
+                        "INSERT INTO holidays (year, day) VALUES (?, ?)",
+                        [(year, d.isoformat()) for d in sorted(days)],
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO holiday_years (year, status, error, fetched_at, fetched_at_utc) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (year, status, error, fetched_at, fetched_at_utc),
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception as e:
+            log_holiday.warning("holiday store write failed (%s): %s", year, e)
+
+        with self._lock:
+            self._years[year] = set(days)
+            self.version += 1
+            self._meta[year] = {
+                "status": status, "error": error, "fetchedAt": fetched_at, "fetchedAtUtc": fetched_at_utc, "source": "api",
+            }
+
+    def _mark_year(self, year: int, status: str, error: Optional[str]):
+        """수신 실패 시 상태/오류만 갱신 (저장된 공휴일은 그대로 유지)"""
+        fetched_at = time.time()
+        fetched_at_utc = now_utc()
+        try:
+            with self._db_lock:
+                conn = self._db()
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO holiday_years (year, status, error, fetched_at, fetched_at_utc) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (year, status, error, fetched_at, fetched_at_utc),
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception as e:
+            log_holiday.warning("holiday store write failed (%s): %s", year, e)
+
+        with self._lock:
+            prev = self._meta.get(year) or {}
+            self._years.setdefault(year, set())
+            self._meta[year] = {
+                "status": status, "error": error, "fetchedAt": fetched_at, "fetchedAtUtc": fetched_at_utc,
+                "source": prev.get("source") or "api",
+            }
+
+    def _known_days(self, year: int) -> set[date]:
+        """이전에 받아 둔 공휴일 (메모리에 없으면 SQLite에서 올림)"""
+        if year not in self._years:
+            self._read_year(year)
+        return set(self._years.get(year) or ())
+
+    # ---- fixture ----
+    def _load_fixture(self):
+        try:
+            with open(self.fixture_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            log_holiday.warning("holiday fixture load failed: %s", e)
+            data = {}
+
+        for y, items in (data or {}).items():
+            year = safe_int(y)
+            if year is None:
+                continue
+            self._years[year] = {d for d in (_parse_holiday_day(v) for v in items or []) if d}
+            self._meta[year] = {"status": "ok", "error": None, "fetchedAt": None, "fetchedAtUtc": None, "source": "fixture"}
+
+    # ---- 백그라운드 수신 ----
+    def _needs_fetch(self, year: int) -> bool:
+        if self.offline:
+            return False
+        meta = self._meta.get(year)
+        if not meta or meta.get("fetchedAt") is None:
+            return True
+        age = time.time() - float(meta["fetchedAt"])
+        if meta.get("status") != "ok":
+            return age >= self.retry_sec
+        return age >= self.refresh_sec
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="holiday")
+            return self._executor
+
+    def _fetch_year(self, year: int):
+        try:
+            if not HOLIDAY_SERVICE_KEY or not str(HOLIDAY_SERVICE_KEY).strip():
+                self._known_days(year)
+                self._mark_year(year, "error", "HOLIDAY_SERVICE_KEY is empty")
+                return
+
+            executor = self._get_executor()
+            futures = [executor.submit(_fetch_holiday_month, year, m) for m in range(1, 13)]
+
+            days: set[date] = set()
+            errors: List[str] = []
+            for fut in futures:
+                try:
+                    days |= fut.result()
+                except Exception as e:
+                    errors.append(str(e))
+
+            self.fetches += 1
+            if errors:
+                self.fetch_errors += 1
+                if len(errors) == 12:
+                    # 전체 실패: 이전에 받아 둔 공휴일은 지우지 않고 상태만 기록
+                    self._known_days(year)
+                    self._mark_year(year, "error", errors[-1])
+                else:
+                    # 일부 실패: 실패한 달의 공휴일이 빠지지 않도록 이전 값과 합침
+                    days |= self._known_days(year)
+                    self._write_year(year, days, "partial", errors[-1])
+            else:
+                self._write_year(year, days, "ok", None)
+            log_holiday.info("%s: %d days, %d month(s) failed", year, len(days), len(errors))
+        except Exception as e:
+            self.fetch_errors += 1
+            log_holiday.warning("holiday fetch failed (%s): %s", year, e)
+        finally:
+            with self._lock:
+                self._inflight.discard(year)
+
+    def schedule(self, year: int, force: bool = False) -> bool:
+        """백그라운드 수신 예약 (이미 진행 중이거나 필요 없으면 False)"""
+        if self.offline:
+            return False
+        with self._lock:
+            if year in self._inflight:
+                return False
+            if not force and not self._needs_fetch(year):
+                return False
+            self._inflight.add(year)
+        threading.Thread(target=self._fetch_year, args=(year,), name=f"holiday-{year}", daemon=True).start()
+        return True
+
+    def warm(self, years: List[int]):
+        """기동 시 호출: 저장된 연도를 올리고, 없거나 오래된 연도는 백그라운드로 수신"""
+        for year in years:
+            if year not in self._years:
+                self._read_year(year)
+            self.schedule(year)
+
+    # ---- 조회 ----
+    def get(self, year: int) -> set[date]:
+        """요청 경로용: 네트워크를 기다리지 않음 (아직 없으면 빈 집합 + 백그라운드 수신)"""
+        days = self._years.get(year)
+        if days is None and not self.fixture_path:
+            if self._read_year(year):
+                days = self._years.get(year)
+            else:
+                # 저장소에도 없음: 빈 집합으로 기억해 두고 (반복 조회 방지) 수신 결과가 오면 교체
+                with self._lock:
+                    days = self._years.setdefault(year, set())
+        if not self.fixture_path:
+            self.schedule(year)
+        return days if days is not None else set()
+
+    def years(self) -> List[int]:
+        """수신(또는 fixture 적재)이 끝난 연도"""
+        return sorted(self._meta.keys())
+
+    def errors(self) -> Dict[int, str]:
+        return {y: m["error"] for y, m in sorted(self._meta.items()) if m.get("error")}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "dbPath": self.db_path,
+                "fixture": self.fixture_path or None,
+                "offline": self.offline,
+                "inflight": sorted(self._inflight),
+                "fetches": self.fetches,
+                "fetchErrors": self.fetch_errors,
+                "years": {
+                    y: {**m, "days": len(self._years.get(y, ()))}
+                    for y, m in sorted(self._meta.items())
+                },
+            }
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+HOLIDAYS = HolidayStore(
+    HOLIDAY_DB_PATH,
+    fixture_path=HOLIDAY_FIXTURE_PATH,
+    offline=HOLIDAY_OFFLINE,
+    workers=HOLIDAY_FETCH_WORKERS,
+    refresh_days=HOLIDAY_REFRESH_DAYS,
+    retry_minutes=HOLIDAY_RETRY_MINUTES,
+)
 
-        if not month_ok:
-            continue
 
-    _HOLIDAY_CACHE[year] = holidays
-    if last_err:
-        _HOLIDAY_CACHE_ERR[year] = last_err
-    return holidays
+def fetch_holidays(year: int) -> set[date]:
+    return HOLIDAYS.get(year)
 
 
 def is_business_day(d: date) -> bool:
@@ -270,6 +2270,43 @@ def adjust_to_workday(d: date) -> date:
     return d
 
 
+_DUE_CALENDAR: Dict[tuple, Dict[int, date]] = {}
+_DUE_CALENDAR_LOCK = threading.Lock()
+
+
+def month_due_dates(year: int, month: int) -> Dict[int, date]:
+    """
+    발송일(1~31) → 해당 월 실제 발송 기한 표
+    - 말일을 넘는 발송일은 말일로, 휴일이면 직전 영업일로 당김 (adjust_to_workday와 동일)
+    - (연, 월, 공휴일 버전) 단위로 한 번만 계산
+    """
+    key = (year, month, HOLIDAYS.version)
+    table = _DUE_CALENDAR.get(key)
+    if table is not None:
+        return table
+
+    import calendar
+    last_day = calendar.monthrange(year, month)[1]
+
+    table = {}
+    workday: Optional[date] = None
+    for day in range(1, last_day + 1):
+        d = date(year, month, day)
+        if is_business_day(d):
+            workday = d
+        elif workday is None:
+            workday = adjust_to_workday(d)  # 월초 휴일: 전월 마지막 영업일
+        table[day] = workday
+    for day in range(last_day + 1, 32):
+        table[day] = table[last_day]
+
+    with _DUE_CALENDAR_LOCK:
+        if len(_DUE_CALENDAR) >= 24:
+            _DUE_CALENDAR.clear()
+        _DUE_CALENDAR[key] = table
+    return table
+
+
 # =========================
 # Pydantic DTO
 # =========================
@@ -321,6 +2358,11 @@ class EmployeeUpsertIn(BaseModel):
     incomeTaxRate: int = 100
 
 
+class EmployeeBulkUpsertIn(BaseModel):
+    # 행 단위 오류 보고를 위해 항목은 dict로 받아 개별 검증
+    items: List[Dict[str, Any]]
+
+
 class EmployeeOut(BaseModel):
     employeeId: int
     clientId: int
@@ -528,6 +2570,15 @@ class ConfirmationStatusOut(BaseModel):
 
 
 # ✅ 급여 결과 저장 (명세서 수정)
+class PayrollResultBatchIn(BaseModel):
+    """거래처/월 단위 급여 결과 일괄 저장 (items는 /payroll/results/save 본문과 동일)"""
+    clientId: int
+    year: int
+    month: int
+    calculatedBy: Optional[str] = None
+    items: List[Dict[str, Any]]
+
+
 class PayrollResultSaveIn(BaseModel):
     employeeId: int
     clientId: int
@@ -571,30 +2622,51 @@ class PayrollResultSaveIn(BaseModel):
 # =========================
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    print(f"[BOOT] Durantax Payroll API v3.0.0 starting...")
-    print(f"[BOOT] DB: {DB_SERVER}:{DB_PORT}/{DB_NAME}")
-    print(f"[BOOT] INIT_DB: {INIT_DB}")
+    log_boot.info("Durantax Payroll API v3.0.0 starting...")
+    log_boot.info("DB: %s:%s/%s", DB_SERVER, DB_PORT, DB_NAME)
+    log_boot.info("INIT_DB: %s", INIT_DB)
     
     # 기존 DB 사용 시 INIT_DB=0으로 설정하면 테이블 생성 건너뜀
     if INIT_DB:
-        print("[WARN] INIT_DB is enabled but should be disabled for existing DB")
-    
-    yield
+        log_boot.warning("INIT_DB is enabled but should be disabled for existing DB")
 
+    log_boot.info("DB pool: size=%s, timeout=%ss, recycle=%ss", DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_RECYCLE)
+    log_boot.info("DB executor: workers=%s, maxQueue=%s, routeLimits=%s",
+                  DB_EXECUTOR.workers, DB_EXECUTOR.max_queue, DB_EXECUTOR.route_limits or "-")
 
-app = FastAPI(title="Durantax Payroll API", version="3.0.0", lifespan=lifespan)
+    # 스키마 캐시 선적재 (실패해도 첫 요청에서 다시 시도)
+    try:
+        conn = get_conn()
+        try:
+            snap = SCHEMA.refresh(conn)
+            log_boot.info("schema cache loaded: version=%s, tables=%s", snap["version"], snap["tables"])
+        finally:
+            conn.close()
+    except Exception as e:
+        log_boot.warning("schema cache preload failed: %s", e)
 
-print("[BOOT] server file =", __file__)
+    # 공휴일: 올해/내년을 백그라운드로 준비 (기동을 막지 않음)
+    this_year = today_kst().year
+    HOLIDAYS.warm([this_year, this_year + 1])
+    log_boot.info("holidays: years=%s, offline=%s, db=%s", HOLIDAYS.years(), HOLIDAYS.offline, HOLIDAY_DB_PATH)
 
+    if MAIL_OUTBOX_ENABLED:
+        MAIL_OUTBOX.start()
+        log_boot.info("mail outbox: workers=%s, smtpPerHost=%s, db=%s", MAIL_OUTBOX_WORKERS, SMTP_MAX_PER_HOST, MAIL_OUTBOX_PATH)
 
+    yield
+
+    MAIL_OUTBOX.stop()
+    HOLIDAYS.close()
+    DB_EXECUTOR.shutdown()
+    DB_POOL.close_all()
+
+
+app = FastAPI(title="Durantax Payroll API", version="3.0.0", lifespan=lifespan)
+app.router.route_class = DbRoute  # 이후 등록하는 동기 핸들러는 DB_EXECUTOR에서 실행
+
+log_boot.info("server file = %s", __file__)
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    try:
-        print(f"[REQ] {request.method} {request.url.path}{'?' + request.url.query if request.url.query else ''}")
-    except Exception:
-        pass
-    return await call_next(request)
 
 app.add_middleware(
     CORSMiddleware,
@@ -602,7 +2674,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(MetricsMiddleware)         # CORS 포함 전체 처리 시간
+app.add_middleware(RequestContextMiddleware)  # 가장 바깥: 요청 ID를 먼저 정해 지표/로그가 모두 같은 값 사용
 
 
 @app.get("/_routes")
@@ -621,72 +2696,308 @@ def _routes():
 
 
 # =========================
-# 헬스체크
+# 헬스체크
+# =========================
+@app.get("/health", dependencies=[Depends(require_api_key)])
+def health():
+    try:
+        conn = get_conn()
+        row = fetch_one(conn, "SELECT 1 AS ok")
+        conn.close()
+        return {
+            "ok": True,
+            "db": bool(row and row.get("ok") == 1),
+            "time": now_utc(),
+            "holidayCacheYears": HOLIDAYS.years(),
+            "holidayCacheErr": HOLIDAYS.errors(),
+            "dbPool": DB_POOL.stats(),
+            "dbExecutor": DB_EXECUTOR.stats(routes=False),
+        }
+    except Exception as e:
+        return {"ok": False, "db": False, "error": str(e), "time": now_utc(), "dbPool": DB_POOL.stats(),
+                "dbExecutor": DB_EXECUTOR.stats(routes=False)}
+
+
+@app.get("/metrics", dependencies=[Depends(require_api_key)])
+async def metrics():
+    """Prometheus 수집용 지표 (라우트 템플릿별 요청 수/처리 시간/DB 쿼리·시간·행 수/응답 바이트)"""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+# =========================
+# 관리자: 메일 발송 현황 요약
+# =========================
+@app.post("/admin/mail-status/rebuild", dependencies=[Depends(require_api_key)])
+@db_route(limit=1)
+def admin_mail_status_rebuild(clientId: Optional[int] = Query(default=None), ym: Optional[str] = Query(default=None)):
+    """PayrollMailLog로 dbo.PayrollMailStatus 다시 채우기 (clientId/ym 지정 시 해당 범위만)"""
+    if ym and not re.match(r"^\d{4}-\d{2}$", ym):
+        raise HTTPException(status_code=400, detail="ym must be YYYY-MM")
+
+    conn = get_conn()
+    try:
+        started = time.perf_counter()
+        try:
+            count = rebuild_mail_status(conn, clientId, ym)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return {
+            "ok": True,
+            "clientId": clientId,
+            "ym": ym,
+            "rows": count,
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 1),
+        }
+    finally:
+        conn.close()
+
+
+# =========================
+# 관리자: DB 실행기
+# =========================
+@app.get("/admin/db-executor", dependencies=[Depends(require_api_key)])
+async def admin_db_executor():
+    """DB 실행기 상태 (대기/실행 수, 라우트별 대기 시간 vs 실행 시간), 실행기가 꽉 차도 응답하도록 async"""
+    return {**DB_EXECUTOR.stats(), "dbPool": DB_POOL.stats()}
+
+
+# =========================
+# 관리자: SQL 지문 통계
+# =========================
+@app.get("/admin/sql-stats", dependencies=[Depends(require_api_key)])
+async def admin_sql_stats(
+    top: int = Query(default=20, ge=1, le=500),
+    sort: str = Query(default="total"),
+):
+    """SQL 지문별 통계 상위 N개 (sort: total|avg|p95|max|calls|rows|errors)"""
+    if sort not in SqlStats.SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SqlStats.SORT_KEYS)}")
+    return {**SQL_STATS.summary(), "slowLog": SLOW_SQL.summary(), "sort": sort, "items": SQL_STATS.top(top, sort)}
+
+
+@app.post("/admin/sql-stats/reset", dependencies=[Depends(require_api_key)])
+async def admin_sql_stats_reset():
+    """지문 통계 초기화 (느린 쿼리 로그 파일은 그대로)"""
+    SQL_STATS.reset()
+    return {"ok": True, **SQL_STATS.summary()}
+
+
+# =========================
+# 관리자: 최근 오류
+# =========================
+@app.get("/admin/errors", dependencies=[Depends(require_api_key)])
+async def admin_errors(
+    limit: int = Query(default=50, ge=1, le=1000),
+    requestId: Optional[str] = Query(default=None),
+):
+    """최근 오류 로그 (최신순, requestId 지정 시 해당 요청만) - 디스크를 읽지 않고 메모리 링 버퍼에서 조회"""
+    return {**ERROR_BUFFER.summary(), "items": ERROR_BUFFER.recent(limit, requestId)}
+
+
+@app.post("/admin/errors/clear", dependencies=[Depends(require_api_key)])
+async def admin_errors_clear():
+    ERROR_BUFFER.clear()
+    return {"ok": True, **ERROR_BUFFER.summary()}
+
+
+# =========================
+# 관리자: 스키마 캐시
+# =========================
+@app.get("/admin/schema", dependencies=[Depends(require_api_key)])
+def admin_schema():
+    """스키마 캐시 상태 조회"""
+    return SCHEMA.snapshot()
+
+
+@app.post("/admin/schema/refresh", dependencies=[Depends(require_api_key)])
+def admin_schema_refresh():
+    """스키마 캐시 즉시 재적재 (컬럼 추가 마이그레이션 후 호출)"""
+    conn = get_conn()
+    try:
+        return SCHEMA.refresh(conn)
+    finally:
+        conn.close()
+
+
+# =========================
+# 관리자: 공휴일 저장소
+# =========================
+@app.get("/admin/holidays", dependencies=[Depends(require_api_key)])
+def admin_holidays(year: Optional[int] = Query(default=None)):
+    """공휴일 저장소 상태 (year 지정 시 해당 연도 공휴일 목록 포함)"""
+    out = HOLIDAYS.stats()
+    if year is not None:
+        out["holidays"] = [d.isoformat() for d in sorted(HOLIDAYS.get(year))]
+    return out
+
+
+@app.post("/admin/holidays/refresh", dependencies=[Depends(require_api_key)])
+def admin_holidays_refresh(year: int = Query(...)):
+    """해당 연도 공휴일을 백그라운드로 다시 수신 (결과는 /admin/holidays 로 확인)"""
+    if HOLIDAYS.offline:
+        raise HTTPException(status_code=409, detail="holiday store is offline (fixture/HOLIDAY_OFFLINE)")
+    return {"ok": True, "year": year, "scheduled": HOLIDAYS.schedule(year, force=True)}
+
+
+# =========================
+# 조건부 GET (ETag / 304)
 # =========================
-@app.get("/health", dependencies=[Depends(require_api_key)])
-def health():
-    try:
-        conn = get_conn()
-        row = fetch_one(conn, "SELECT 1 AS ok")
-        conn.close()
-        return {
-            "ok": True,
-            "db": bool(row and row.get("ok") == 1),
-            "time": now_utc(),
-            "holidayCacheYears": sorted(list(_HOLIDAY_CACHE.keys())),
-            "holidayCacheErr": _HOLIDAY_CACHE_ERR,
-        }
-    except Exception as e:
-        return {"ok": False, "db": False, "error": str(e), "time": now_utc()}
+# 서버 코드가 바뀌면(응답 모양 변경 가능) 기존 ETag 무효화, 여러 워커 프로세스에서도 같은 값
+with open(__file__, "rb") as _f:
+    _ETAG_SALT = hashlib.sha1(_f.read()).hexdigest()[:8]
+
+
+class ResourceVersion:
+    """조회 결과의 버전 토큰 (ETag, Last-Modified)"""
+    __slots__ = ("etag", "last_modified", "rows")
+
+    def __init__(self, etag: str, last_modified: Optional[datetime], rows: int):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.rows = rows
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+        return headers
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match 비교 (약한 비교, 여러 값/* 허용)"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        own = self.etag[2:] if self.etag.startswith("W/") else self.etag
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if (tag[2:] if tag.startswith("W/") else tag) == own:
+                return True
+        return False
+
+
+def resource_version(
+    conn: pyodbc.Connection,
+    key: str,
+    table: str,
+    where: str = "1=1",
+    params: tuple = (),
+    updated_col: Optional[str] = "UpdatedAt",
+    allow_empty: bool = True,
+    content: Optional[List[str]] = None,
+) -> Optional[ResourceVersion]:
+    """
+    목록/설정 조회의 버전 토큰 (전체 조회 대신 집계 쿼리 1회)
+    - UpdatedAt 컬럼이 있으면: COUNT + MAX(UpdatedAt) + CHECKSUM_AGG(BINARY_CHECKSUM(*))
+    - 없으면: 응답에 나가는 컬럼(content, SELECT 식 목록)을 정렬된 JSON으로 만들어 SHA2_256
+      (BINARY_CHECKSUM은 놓치는 변경이 있고 CHECKSUM_AGG는 XOR라, 이것만으로는 수정 후에도 같은 값이 될 수 있음)
+    - 테이블 컬럼 구성과 서버 코드 해시를 섞어 스키마/응답 모양이 바뀌면 다른 값
+    - 다른 프로그램(Streamlit 등)이 DB를 직접 고쳐도 다음 요청에서 바로 반영
+    테이블이 없거나, (allow_empty=False이고) 행이 없거나, UpdatedAt도 content도 없으면 None
+    → 조건부 처리 없이 원래대로 조회
+    """
+    cols = SCHEMA.columns(conn, table)
+    if cols is None:
+        return None
+    has_updated = bool(updated_col) and updated_col.lower() in cols
+
+    if has_updated:
+        sql = f"SELECT COUNT_BIG(*) AS n, CHECKSUM_AGG(BINARY_CHECKSUM(*)) AS cs, MAX({updated_col}) AS updatedAt FROM {table} WHERE {where}"
+    elif content:
+        order = ", ".join(str(i) for i in range(1, len(content) + 1))
+        sql = (
+            f"SELECT (SELECT COUNT_BIG(*) FROM {table} WHERE {where}) AS n, "
+            f"HASHBYTES('SHA2_256', (SELECT {', '.join(content)} FROM {table} WHERE {where} "
+            f"ORDER BY {order} FOR JSON PATH, INCLUDE_NULL_VALUES)) AS cs"
+        )
+        params = tuple(params) * 2
+    else:
+        return None
+    row = fetch_one(conn, sql, params) or {}
+
+    rows = int(row.get("n") or 0)
+    if not rows and not allow_empty:
+        return None
+    updated = row.get("updatedAt") if has_updated else None
+    cs = row.get("cs")
+    if isinstance(cs, (bytes, bytearray)):
+        cs = cs.hex()
+    raw = "|".join([_ETAG_SALT, key, ",".join(sorted(cols)), str(rows), str(cs), str(updated)])
+    etag = f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+    return ResourceVersion(etag, updated if isinstance(updated, datetime) else None, rows)
+
+
+def conditional_get(request: Request, response: Response, version: Optional[ResourceVersion]) -> Optional[Response]:
+    """If-None-Match가 현재 버전과 같으면 304 (본문 조회/직렬화 생략), 아니면 응답에 ETag 헤더만 설정"""
+    if version is None:
+        return None
+    headers = version.headers()
+    if version.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
 
 
 # =========================
 # 거래처 조회/수정
 # =========================
+_CLIENT_FILTER = "원천세='O' AND 사용여부=1"  # /clients 목록 대상
+
+
+def _client_select(conn: pyodbc.Connection):
+    """거래처 SELECT 컬럼과 행 후처리 함수 (선택 컬럼은 존재할 때만)"""
+    has_5workers = column_exists(conn, "dbo.거래처", "Has5OrMoreWorkers")
+    has_subject = column_exists(conn, "dbo.거래처", "EmailSubjectTemplate")
+    has_body = column_exists(conn, "dbo.거래처", "EmailBodyTemplate")
+
+    select_parts = [
+        "ID AS id",
+        "고객명 AS name",
+        "사업자등록번호 AS bizId",
+        "급여명세서발송일 AS slipSendDay",
+        "급여대장일 AS registerSendDay",
+    ]
+
+    if has_5workers:
+        select_parts.append("Has5OrMoreWorkers AS has5OrMoreWorkers")
+    if has_subject:
+        select_parts.append("EmailSubjectTemplate AS emailSubjectTemplate")
+    if has_body:
+        select_parts.append("EmailBodyTemplate AS emailBodyTemplate")
+
+    def shape(r: Dict[str, Any]) -> Dict[str, Any]:
+        r["slipSendDay"] = safe_int(r.get("slipSendDay"))
+        r["registerSendDay"] = safe_int(r.get("registerSendDay"))
+
+        if not has_5workers:
+            r["has5OrMoreWorkers"] = False
+        else:
+            r["has5OrMoreWorkers"] = bool(r.get("has5OrMoreWorkers"))
+
+        if not has_subject:
+            r["emailSubjectTemplate"] = "{clientName} {year}년 {month}월 {workerName} 급여명세서"
+        if not has_body:
+            r["emailBodyTemplate"] = "안녕하세요,\n\n{year}년 {month}월 급여명세서를 발송드립니다.\n\n감사합니다."
+        return r
+
+    return select_parts, shape
+
+
 @app.get("/clients", response_model=List[ClientOut], dependencies=[Depends(require_api_key)])
-def get_clients():
+def get_clients(request: Request, response: Response):
     conn = get_conn()
     try:
         if not table_exists(conn, "dbo.거래처"):
             return []
 
-        has_5workers = column_exists(conn, "dbo.거래처", "Has5OrMoreWorkers")
-        has_subject = column_exists(conn, "dbo.거래처", "EmailSubjectTemplate")
-        has_body = column_exists(conn, "dbo.거래처", "EmailBodyTemplate")
-
-        select_parts = [
-            "ID AS id",
-            "고객명 AS name",
-            "사업자등록번호 AS bizId",
-            "급여명세서발송일 AS slipSendDay",
-            "급여대장일 AS registerSendDay",
-        ]
-
-        if has_5workers:
-            select_parts.append("Has5OrMoreWorkers AS has5OrMoreWorkers")
-        if has_subject:
-            select_parts.append("EmailSubjectTemplate AS emailSubjectTemplate")
-        if has_body:
-            select_parts.append("EmailBodyTemplate AS emailBodyTemplate")
-
-        sql = f"SELECT {', '.join(select_parts)} FROM 거래처 WHERE 원천세='O' AND 사용여부=1 ORDER BY 고객명"
-        rows = fetch_all(conn, sql)
-
-        for r in rows:
-            r["slipSendDay"] = safe_int(r.get("slipSendDay"))
-            r["registerSendDay"] = safe_int(r.get("registerSendDay"))
-
-            if not has_5workers:
-                r["has5OrMoreWorkers"] = False
-            else:
-                r["has5OrMoreWorkers"] = bool(r.get("has5OrMoreWorkers"))
-
-            if not has_subject:
-                r["emailSubjectTemplate"] = "{clientName} {year}년 {month}월 {workerName} 급여명세서"
-            if not has_body:
-                r["emailBodyTemplate"] = "안녕하세요,\n\n{year}년 {month}월 급여명세서를 발송드립니다.\n\n감사합니다."
+        version = resource_version(conn, "clients", "dbo.거래처", _CLIENT_FILTER, content=_client_select(conn)[0])
+        not_modified = conditional_get(request, response, version)
+        if not_modified is not None:
+            return not_modified
 
-        return rows
+        select_parts, shape = _client_select(conn)
+        sql = f"SELECT {', '.join(select_parts)} FROM 거래처 WHERE {_CLIENT_FILTER} ORDER BY 고객명"
+        return [shape(r) for r in fetch_all(conn, sql)]
     finally:
         conn.close()
 
@@ -722,9 +3033,7 @@ def update_client(client_id: int, body: ClientUpdateIn):
         exec_sql(conn, sql, tuple(params))
         return {"ok": True}
     except Exception as e:
-        print(f"CRITICAL ERROR in save_payroll_result: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("client update failed: %s", e, extra={"ctx": {"clientId": client_id}})
         raise HTTPException(status_code=500, detail=f"Save failed: {str(e)}")
     finally:
         conn.close()
@@ -734,153 +3043,23 @@ def update_client(client_id: int, body: ClientUpdateIn):
 # 직원 조회/업서트/삭제
 # =========================
 @app.get("/clients/{client_id}/employees", response_model=List[EmployeeOut], dependencies=[Depends(require_api_key)])
-def get_employees(client_id: int):
+def get_employees(client_id: int, request: Request, response: Response):
     conn = get_conn()
     try:
         if not table_exists(conn, "dbo.Employees"):
-            print("[WARN] dbo.Employees table does not exist")
+            log.warning("dbo.Employees table does not exist")
             return []
 
+        version = resource_version(conn, f"employees:{client_id}", "dbo.Employees", "ClientId=?", (client_id,))
+        not_modified = conditional_get(request, response, version)
+        if not_modified is not None:
+            return not_modified
 
-        has_empno = column_exists(conn, "dbo.Employees", "EmpNo")
-        has_pension = column_exists(conn, "dbo.Employees", "HasNationalPension")
-        has_health = column_exists(conn, "dbo.Employees", "HasHealthInsurance")
-        has_employment = column_exists(conn, "dbo.Employees", "HasEmploymentInsurance")
-        has_basis = column_exists(conn, "dbo.Employees", "HealthInsuranceBasis")
-        has_wage = column_exists(conn, "dbo.Employees", "PensionInsurableWage")
-        has_tax_dependents = column_exists(conn, "dbo.Employees", "TaxDependents")
-        has_children = column_exists(conn, "dbo.Employees", "ChildrenCount")
-        has_tax_free_meal = column_exists(conn, "dbo.Employees", "TaxFreeMeal")
-        has_tax_free_car = column_exists(conn, "dbo.Employees", "TaxFreeCarMaintenance")
-        has_other_tax_free = column_exists(conn, "dbo.Employees", "OtherTaxFree")
-        has_income_tax_rate = column_exists(conn, "dbo.Employees", "IncomeTaxRate")
-        has_join_date = column_exists(conn, "dbo.Employees", "JoinDate")
-        has_resign_date = column_exists(conn, "dbo.Employees", "ResignDate")
-
-        select_parts = [
-            "EmployeeId AS employeeId",
-            "ClientId AS clientId",
-            "Name AS name",
-            "BirthDate AS birthDate",
-        ]
-
-        if has_empno:
-            select_parts.append("EmpNo AS empNo")
-
-        select_parts += [
-            "EmploymentType AS employmentType",
-            "SalaryType AS salaryType",
-            "BaseSalary AS baseSalary",
-            "HourlyRate AS hourlyRate",
-            "NormalHours AS normalHours",
-            "FoodAllowance AS foodAllowance",
-            "CarAllowance AS carAllowance",
-            "EmailTo AS emailTo",
-            "EmailCc AS emailCc",
-            "UseEmail AS useEmail",
-        ]
-
-        if has_pension:
-            select_parts.append("HasNationalPension AS hasNationalPension")
-        if has_health:
-            select_parts.append("HasHealthInsurance AS hasHealthInsurance")
-        if has_employment:
-            select_parts.append("HasEmploymentInsurance AS hasEmploymentInsurance")
-        if has_basis:
-            select_parts.append("HealthInsuranceBasis AS healthInsuranceBasis")
-        if has_wage:
-            select_parts.append("PensionInsurableWage AS pensionInsurableWage")
-
-        if has_tax_dependents:
-            select_parts.append("TaxDependents AS taxDependents")
-        if has_children:
-            select_parts.append("ChildrenCount AS childrenCount")
-        if has_tax_free_meal:
-            select_parts.append("TaxFreeMeal AS taxFreeMeal")
-        if has_tax_free_car:
-            select_parts.append("TaxFreeCarMaintenance AS taxFreeCarMaintenance")
-        if has_other_tax_free:
-            select_parts.append("OtherTaxFree AS otherTaxFree")
-        if has_income_tax_rate:
-            select_parts.append("IncomeTaxRate AS incomeTaxRate")
-
-        if has_join_date:
-            select_parts.append("CONVERT(NVARCHAR(10), JoinDate, 23) AS joinDate")
-        if has_resign_date:
-            select_parts.append("CONVERT(NVARCHAR(10), ResignDate, 23) AS resignDate")
-
-        select_parts.append("CONVERT(NVARCHAR(19), UpdatedAt, 126) AS updatedAt")
-
-        sql = f"SELECT {', '.join(select_parts)} FROM dbo.Employees WHERE ClientId=? ORDER BY Name"
-        rows = fetch_all(conn, sql, (client_id,))
-
-        for r in rows:
-            for k in ["baseSalary", "hourlyRate", "normalHours", "foodAllowance", "carAllowance"]:
-                r[k] = float(r.get(k) or 0)
-            r["useEmail"] = bool(r.get("useEmail"))
-
-            if not has_empno:
-                r["empNo"] = None
-            else:
-                v = r.get("empNo")
-                r["empNo"] = str(v).strip() if v is not None else None
-
-            if not has_pension:
-                r["hasNationalPension"] = True
-            else:
-                r["hasNationalPension"] = bool(r.get("hasNationalPension"))
-
-            if not has_health:
-                r["hasHealthInsurance"] = True
-            else:
-                r["hasHealthInsurance"] = bool(r.get("hasHealthInsurance"))
-
-            if not has_employment:
-                r["hasEmploymentInsurance"] = True
-            else:
-                r["hasEmploymentInsurance"] = bool(r.get("hasEmploymentInsurance"))
-
-            if not has_basis:
-                r["healthInsuranceBasis"] = "salary"
-
-            if not has_wage:
-                r["pensionInsurableWage"] = None
-            elif r.get("pensionInsurableWage") is not None:
-                r["pensionInsurableWage"] = float(r.get("pensionInsurableWage") or 0)
-
-            if not has_tax_dependents:
-                r["taxDependents"] = 1
-            if not has_children:
-                r["childrenCount"] = 0
-
-            if not has_tax_free_meal:
-                r["taxFreeMeal"] = 0.0
-            else:
-                r["taxFreeMeal"] = float(r.get("taxFreeMeal") or 0)
-
-            if not has_tax_free_car:
-                r["taxFreeCarMaintenance"] = 0.0
-            else:
-                r["taxFreeCarMaintenance"] = float(r.get("taxFreeCarMaintenance") or 0)
-
-            if not has_other_tax_free:
-                r["otherTaxFree"] = 0.0
-            else:
-                r["otherTaxFree"] = float(r.get("otherTaxFree") or 0)
-
-            if not has_income_tax_rate:
-                r["incomeTaxRate"] = 100
-
-            if not has_join_date:
-                r["joinDate"] = None
-            if not has_resign_date:
-                r["resignDate"] = None
-
-        return rows
+        stmt = STATEMENTS.get(conn, "employees.by_client", compile_employee_select("employees.by_client", "ClientId=? ORDER BY Name"))
+        rows = fetch_all(conn, stmt.sql, (client_id,))
+        return [stmt.shape(r) for r in rows]
     except Exception as e:
-        print(f"CRITICAL ERROR in get_employees: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("get_employees failed: %s", e, extra={"ctx": {"clientId": client_id}})
         raise HTTPException(status_code=500, detail=f"Employee fetch failed: {str(e)}")
     finally:
         conn.close()
@@ -893,163 +3072,12 @@ def upsert_employee(body: EmployeeUpsertIn):
         if not table_exists(conn, "dbo.Employees"):
             raise HTTPException(status_code=500, detail="dbo.Employees 테이블이 없습니다.")
 
-        has_empno = column_exists(conn, "dbo.Employees", "EmpNo")
-        has_pension = column_exists(conn, "dbo.Employees", "HasNationalPension")
-        has_health = column_exists(conn, "dbo.Employees", "HasHealthInsurance")
-        has_employment = column_exists(conn, "dbo.Employees", "HasEmploymentInsurance")
-        has_basis = column_exists(conn, "dbo.Employees", "HealthInsuranceBasis")
-        has_wage = column_exists(conn, "dbo.Employees", "PensionInsurableWage")
-        has_tax_dependents = column_exists(conn, "dbo.Employees", "TaxDependents")
-        has_children = column_exists(conn, "dbo.Employees", "ChildrenCount")
-        has_tax_free_meal = column_exists(conn, "dbo.Employees", "TaxFreeMeal")
-        has_tax_free_car = column_exists(conn, "dbo.Employees", "TaxFreeCarMaintenance")
-        has_other_tax_free = column_exists(conn, "dbo.Employees", "OtherTaxFree")
-        has_income_tax_rate = column_exists(conn, "dbo.Employees", "IncomeTaxRate")
-        has_join_date = column_exists(conn, "dbo.Employees", "JoinDate")
-        has_resign_date = column_exists(conn, "dbo.Employees", "ResignDate")
-
-        update_sets = [
-            "EmploymentType=?", "SalaryType=?", "BaseSalary=?", "HourlyRate=?", "NormalHours=?",
-            "FoodAllowance=?", "CarAllowance=?", "EmailTo=?", "EmailCc=?", "UseEmail=?",
-        ]
-        insert_cols = [
-            "ClientId", "Name", "BirthDate", "EmploymentType", "SalaryType", "BaseSalary",
-            "HourlyRate", "NormalHours", "FoodAllowance", "CarAllowance", "EmailTo", "EmailCc", "UseEmail",
-        ]
-        insert_vals = ["?"] * 13
-
-        params_update = [
-            body.employmentType, body.salaryType, body.baseSalary, body.hourlyRate, body.normalHours,
-            body.foodAllowance, body.carAllowance, body.emailTo, body.emailCc, int(body.useEmail),
-        ]
-        params_insert = [
-            body.clientId, body.name, body.birthDate, body.employmentType, body.salaryType,
-            body.baseSalary, body.hourlyRate, body.normalHours, body.foodAllowance, body.carAllowance,
-            body.emailTo, body.emailCc, int(body.useEmail),
-        ]
-
-        if has_pension:
-            update_sets.append("HasNationalPension=?")
-            insert_cols.append("HasNationalPension")
-            insert_vals.append("?")
-            params_update.append(int(body.hasNationalPension))
-            params_insert.append(int(body.hasNationalPension))
-
-        if has_health:
-            update_sets.append("HasHealthInsurance=?")
-            insert_cols.append("HasHealthInsurance")
-            insert_vals.append("?")
-            params_update.append(int(body.hasHealthInsurance))
-            params_insert.append(int(body.hasHealthInsurance))
-
-        if has_employment:
-            update_sets.append("HasEmploymentInsurance=?")
-            insert_cols.append("HasEmploymentInsurance")
-            insert_vals.append("?")
-            params_update.append(int(body.hasEmploymentInsurance))
-            params_insert.append(int(body.hasEmploymentInsurance))
-
-        if has_basis:
-            update_sets.append("HealthInsuranceBasis=?")
-            insert_cols.append("HealthInsuranceBasis")
-            insert_vals.append("?")
-            params_update.append(body.healthInsuranceBasis)
-            params_insert.append(body.healthInsuranceBasis)
-
-        if has_wage:
-            update_sets.append("PensionInsurableWage=?")
-            insert_cols.append("PensionInsurableWage")
-            insert_vals.append("?")
-            params_update.append(body.pensionInsurableWage)
-            params_insert.append(body.pensionInsurableWage)
-
-        if has_join_date:
-            update_sets.append("JoinDate=?")
-            insert_cols.append("JoinDate")
-            insert_vals.append("?")
-            # 빈 문자열을 None으로 변환
-            join_date_val = body.joinDate if body.joinDate and body.joinDate.strip() else None
-            params_update.append(join_date_val)
-            params_insert.append(join_date_val)
-
-        if has_resign_date:
-            update_sets.append("ResignDate=?")
-            insert_cols.append("ResignDate")
-            insert_vals.append("?")
-            # 빈 문자열을 None으로 변환
-            resign_date_val = body.resignDate if body.resignDate and body.resignDate.strip() else None
-            params_update.append(resign_date_val)
-            params_insert.append(resign_date_val)
-
-        if has_tax_dependents:
-            update_sets.append("TaxDependents=?")
-            insert_cols.append("TaxDependents")
-            insert_vals.append("?")
-            params_update.append(body.taxDependents)
-            params_insert.append(body.taxDependents)
-
-        if has_children:
-            update_sets.append("ChildrenCount=?")
-            insert_cols.append("ChildrenCount")
-            insert_vals.append("?")
-            params_update.append(body.childrenCount)
-            params_insert.append(body.childrenCount)
-
-        if has_tax_free_meal:
-            update_sets.append("TaxFreeMeal=?")
-            insert_cols.append("TaxFreeMeal")
-            insert_vals.append("?")
-            params_update.append(body.taxFreeMeal)
-            params_insert.append(body.taxFreeMeal)
-
-        if has_tax_free_car:
-            update_sets.append("TaxFreeCarMaintenance=?")
-            insert_cols.append("TaxFreeCarMaintenance")
-            insert_vals.append("?")
-            params_update.append(body.taxFreeCarMaintenance)
-            params_insert.append(body.taxFreeCarMaintenance)
-
-        if has_other_tax_free:
-            update_sets.append("OtherTaxFree=?")
-            insert_cols.append("OtherTaxFree")
-            insert_vals.append("?")
-            params_update.append(body.otherTaxFree)
-            params_insert.append(body.otherTaxFree)
-
-        if has_income_tax_rate:
-            update_sets.append("IncomeTaxRate=?")
-            insert_cols.append("IncomeTaxRate")
-            insert_vals.append("?")
-            params_update.append(body.incomeTaxRate)
-            params_insert.append(body.incomeTaxRate)
-
-
-        update_sets.append("UpdatedAt=SYSUTCDATETIME()")
-
-        sql = f"""
-        MERGE dbo.Employees AS t
-        USING (SELECT ? AS ClientId, ? AS Name, ? AS BirthDate) AS s
-        ON (t.ClientId=s.ClientId AND t.Name=s.Name AND t.BirthDate=s.BirthDate)
-        WHEN MATCHED THEN
-            UPDATE SET {', '.join(update_sets)}
-        WHEN NOT MATCHED THEN
-            INSERT ({', '.join(insert_cols)})
-            VALUES ({', '.join(insert_vals)});
-        """
-
-
-        params = (body.clientId, body.name, body.birthDate) + tuple(params_update) + tuple(params_insert)
+        stmt = STATEMENTS.get(conn, "employees.merge", compile_employee_merge)
+        params = stmt.params(body)
 
         try:
-            # Log SQL for debugging
-            with open("debug_employee_sql.log", "w", encoding="utf-8") as f:
-                f.write(f"SQL Statement:\n{sql}\n\n")
-                f.write(f"Insert Columns: {insert_cols}\n")
-                f.write(f"Update Sets: {update_sets}\n")
-                f.write(f"Params count: {len(params)}\n")
-            
             cur = conn.cursor()
-            cur.execute(sql, params)
+            _execute(cur, stmt.sql, params)
             conn.commit()
             
             # Get EmployeeId via SELECT after MERGE
@@ -1057,14 +3085,13 @@ def upsert_employee(body: EmployeeUpsertIn):
                 SELECT EmployeeId FROM dbo.Employees 
                 WHERE ClientId=? AND Name=? AND BirthDate=?
             """
-            cur.execute(select_id_sql, (body.clientId, body.name, body.birthDate))
+            _execute(cur, select_id_sql, (body.clientId, body.name, body.birthDate))
             out = cur.fetchone()
         except Exception as e:
-            import traceback
-            err_msg = traceback.format_exc()
-            print(f"CRITICAL ERROR in upsert_employee: {e}")
-            with open("debug_error.log", "w", encoding="utf-8") as f:
-                f.write(f"Error in upsert_employee: {e}\nTraceback:\n{err_msg}\nSQL:\n{sql}\n")
+            log.exception("upsert_employee failed: %s", e, extra={"ctx": {
+                "clientId": body.clientId, "statement": stmt.name, "fingerprintId": sql_fingerprint(stmt.sql)[0],
+                "params": len(params),
+            }})
             raise HTTPException(status_code=500, detail=f"Employee upsert failed: {str(e)}")
 
         if not out:
@@ -1073,127 +3100,119 @@ def upsert_employee(body: EmployeeUpsertIn):
         employee_id = int(out[0])
 
         # SELECT로 다시 읽기 (EmpNo 트리거 반영)
-        select_parts = [
-            "EmployeeId AS employeeId",
-            "ClientId AS clientId",
-            "Name AS name",
-            "BirthDate AS birthDate",
-        ]
-        if has_empno:
-            select_parts.append("EmpNo AS empNo")
-
-        select_parts += [
-            "EmploymentType AS employmentType",
-            "SalaryType AS salaryType",
-            "BaseSalary AS baseSalary",
-            "HourlyRate AS hourlyRate",
-            "NormalHours AS normalHours",
-            "FoodAllowance AS foodAllowance",
-            "CarAllowance AS carAllowance",
-            "EmailTo AS emailTo",
-            "EmailCc AS emailCc",
-            "UseEmail AS useEmail",
-        ]
-
-        if has_pension:
-            select_parts.append("HasNationalPension AS hasNationalPension")
-        if has_health:
-            select_parts.append("HasHealthInsurance AS hasHealthInsurance")
-        if has_employment:
-            select_parts.append("HasEmploymentInsurance AS hasEmploymentInsurance")
-        if has_basis:
-            select_parts.append("HealthInsuranceBasis AS healthInsuranceBasis")
-        if has_wage:
-            select_parts.append("PensionInsurableWage AS pensionInsurableWage")
-
-        if has_tax_dependents:
-            select_parts.append("TaxDependents AS taxDependents")
-        if has_children:
-            select_parts.append("ChildrenCount AS childrenCount")
-        if has_tax_free_meal:
-            select_parts.append("TaxFreeMeal AS taxFreeMeal")
-        if has_tax_free_car:
-            select_parts.append("TaxFreeCarMaintenance AS taxFreeCarMaintenance")
-        if has_other_tax_free:
-            select_parts.append("OtherTaxFree AS otherTaxFree")
-        if has_income_tax_rate:
-            select_parts.append("IncomeTaxRate AS incomeTaxRate")
-
-        if has_join_date:
-            select_parts.append("CONVERT(NVARCHAR(10), JoinDate, 23) AS joinDate")
-        if has_resign_date:
-            select_parts.append("CONVERT(NVARCHAR(10), ResignDate, 23) AS resignDate")
-
-        select_parts.append("CONVERT(NVARCHAR(19), UpdatedAt, 126) AS updatedAt")
-
-        sql_select = f"SELECT {', '.join(select_parts)} FROM dbo.Employees WHERE EmployeeId=?"
-        row = fetch_one(conn, sql_select, (employee_id,))
+        sel = STATEMENTS.get(conn, "employees.by_id", compile_employee_select("employees.by_id", "EmployeeId=?"))
+        row = fetch_one(conn, sel.sql, (employee_id,))
         if not row:
             raise HTTPException(status_code=404, detail="Employee not found after upsert")
 
-        for k in ["baseSalary", "hourlyRate", "normalHours", "foodAllowance", "carAllowance"]:
-            row[k] = float(row.get(k) or 0)
-        row["useEmail"] = bool(row.get("useEmail"))
-
-        if not has_empno:
-            row["empNo"] = None
-        else:
-            v = row.get("empNo")
-            row["empNo"] = str(v).strip() if v is not None else None
-
-        if not has_pension:
-            row["hasNationalPension"] = True
-        else:
-            row["hasNationalPension"] = bool(row.get("hasNationalPension"))
-
-        if not has_health:
-            row["hasHealthInsurance"] = True
-        else:
-            row["hasHealthInsurance"] = bool(row.get("hasHealthInsurance"))
-
-        if not has_employment:
-            row["hasEmploymentInsurance"] = True
-        else:
-            row["hasEmploymentInsurance"] = bool(row.get("hasEmploymentInsurance"))
+        return sel.shape(row)
 
-        if not has_basis:
-            row["healthInsuranceBasis"] = "salary"
+    finally:
+        conn.close()
 
-        if not has_wage:
-            row["pensionInsurableWage"] = None
-        elif row.get("pensionInsurableWage") is not None:
-            row["pensionInsurableWage"] = float(row.get("pensionInsurableWage") or 0)
 
-        if not has_tax_dependents:
-            row["taxDependents"] = 1
-        if not has_children:
-            row["childrenCount"] = 0
+@app.post("/clients/{client_id}/employees/bulk-upsert", dependencies=[Depends(require_api_key)])
+@db_route(limit=2)
+def bulk_upsert_employees(client_id: int, body: EmployeeBulkUpsertIn):
+    """
+    직원 일괄 등록/수정 (엑셀 온보딩용)
+    - 임시 테이블에 fast_executemany로 적재 후 MERGE 1회
+    - 행 단위 검증 오류는 해당 행만 실패 처리하고 나머지는 계속 진행
+    """
+    results: List[Dict[str, Any]] = [None] * len(body.items)
+    valid: Dict[tuple, tuple] = {}  # (name, birthDate) -> (index, EmployeeUpsertIn)
 
-        if not has_tax_free_meal:
-            row["taxFreeMeal"] = 0.0
-        else:
-            row["taxFreeMeal"] = float(row.get("taxFreeMeal") or 0)
+    for idx, raw in enumerate(body.items):
+        item = dict(raw)
+        item.setdefault("clientId", client_id)
+        try:
+            emp = EmployeeUpsertIn.model_validate(item)
+        except Exception as e:
+            results[idx] = {"index": idx, "status": "failed", "employeeId": None, "error": str(e)}
+            continue
 
-        if not has_tax_free_car:
-            row["taxFreeCarMaintenance"] = 0.0
-        else:
-            row["taxFreeCarMaintenance"] = float(row.get("taxFreeCarMaintenance") or 0)
+        if emp.clientId != client_id:
+            results[idx] = {"index": idx, "status": "failed", "employeeId": None,
+                            "error": f"clientId {emp.clientId} != {client_id}"}
+            continue
+        if not emp.name.strip() or not emp.birthDate.strip():
+            results[idx] = {"index": idx, "status": "failed", "employeeId": None, "error": "name/birthDate is empty"}
+            continue
 
-        if not has_other_tax_free:
-            row["otherTaxFree"] = 0.0
-        else:
-            row["otherTaxFree"] = float(row.get("otherTaxFree") or 0)
+        key = (emp.name, emp.birthDate)
+        if key in valid:
+            prev_idx = valid[key][0]
+            results[prev_idx] = {"index": prev_idx, "status": "failed", "employeeId": None,
+                                 "error": f"duplicate of row {idx} (later row wins)"}
+        valid[key] = (idx, emp)
 
-        if not has_income_tax_rate:
-            row["incomeTaxRate"] = 100
+    employees: List[Dict[str, Any]] = []
 
-        if not has_join_date:
-            row["joinDate"] = None
-        if not has_resign_date:
-            row["resignDate"] = None
+    conn = get_conn()
+    try:
+        if not table_exists(conn, "dbo.Employees"):
+            raise HTTPException(status_code=500, detail="dbo.Employees 테이블이 없습니다.")
 
-        return row
+        if valid:
+            stmt = STATEMENTS.get(conn, "employees.bulk_merge", compile_employee_bulk_merge)
+            staged = [(idx,) + stmt.row(emp) for idx, emp in valid.values()]
+            cur = conn.cursor()
+            try:
+                _execute(cur, stmt.extra["stage"])
+                _execute_many(cur, stmt.extra["insert"], staged)
+                _execute(cur, stmt.sql)
+                conn.commit()
+
+                for r in fetch_all(conn, stmt.extra["select"]):
+                    idx = int(r.pop("rowNo"))
+                    action = str(r.pop("mergeAction") or "").lower()
+                    row = stmt.shape(r)
+                    employees.append(row)
+                    results[idx] = {
+                        "index": idx,
+                        "status": "inserted" if action == "insert" else "updated",
+                        "employeeId": int(row["employeeId"]),
+                        "error": None,
+                    }
+                exec_sql(conn, stmt.extra["drop"])
+            except Exception as e:
+                # 집합 기반 MERGE 실패 시 행 단위로 재시도해 실패 행만 보고
+                log.warning("bulk employee MERGE failed, falling back to per-row: %s", e)
+                conn.rollback()
+                single = STATEMENTS.get(conn, "employees.merge", compile_employee_merge)
+                for idx, emp in valid.values():
+                    try:
+                        _execute(cur, single.sql, single.params(emp))
+                        conn.commit()
+                        results[idx] = {"index": idx, "status": "upserted", "employeeId": None, "error": None}
+                    except Exception as row_err:
+                        conn.rollback()
+                        results[idx] = {"index": idx, "status": "failed", "employeeId": None, "error": str(row_err)}
+
+                sel = STATEMENTS.get(conn, "employees.by_client", compile_employee_select("employees.by_client", "ClientId=? ORDER BY Name"))
+                by_key = {(r["name"], r["birthDate"]): sel.shape(r) for r in fetch_all(conn, sel.sql, (client_id,))}
+                for idx, emp in valid.values():
+                    row = by_key.get((emp.name, emp.birthDate))
+                    if results[idx]["status"] == "upserted" and row:
+                        results[idx]["employeeId"] = int(row["employeeId"])
+                        employees.append(row)
+
+        for idx, r in enumerate(results):
+            if r is None:
+                results[idx] = {"index": idx, "status": "failed", "employeeId": None, "error": "no row returned by MERGE"}
+
+        counts = {"inserted": 0, "updated": 0, "upserted": 0, "failed": 0}
+        for r in results:
+            counts[r["status"]] += 1
 
+        return {
+            "ok": counts["failed"] == 0,
+            "clientId": client_id,
+            "total": len(body.items),
+            **counts,
+            "employees": employees,
+            "results": results,
+        }
     finally:
         conn.close()
 
@@ -1321,37 +3340,22 @@ def upsert_monthly(body: MonthlyUpsertIn):
         conn.close()
 
 
-@app.get("/payroll/monthly", dependencies=[Depends(require_api_key)])
-def get_monthly(employeeId: int, ym: str):
-    conn = get_conn()
-    try:
-        if not table_exists(conn, "dbo.PayrollMonthlyInput"):
-            return None
-
-        # ✅ IsDurunuri 컬럼 존재 여부 확인
-        has_is_durunuri = column_exists(conn, "dbo.PayrollMonthlyInput", "IsDurunuri")
-
-        if has_is_durunuri:
-            sql = """
-            SELECT EmployeeId AS employeeId, Ym AS ym, WorkHours AS workHours, Bonus AS bonus,
-            OvertimeHours AS overtimeHours, NightHours AS nightHours, HolidayHours AS holidayHours,
-            WeeklyHours AS weeklyHours, WeekCount AS weekCount, IsDurunuri AS isDurunuri,
-            CONVERT(NVARCHAR(19), UpdatedAt, 126) AS updatedAt
-            FROM dbo.PayrollMonthlyInput WHERE EmployeeId=? AND Ym=?
-            """
-        else:
-            sql = """
-            SELECT EmployeeId AS employeeId, Ym AS ym, WorkHours AS workHours, Bonus AS bonus,
-            OvertimeHours AS overtimeHours, NightHours AS nightHours, HolidayHours AS holidayHours,
-            WeeklyHours AS weeklyHours, WeekCount AS weekCount,
-            CONVERT(NVARCHAR(19), UpdatedAt, 126) AS updatedAt
-            FROM dbo.PayrollMonthlyInput WHERE EmployeeId=? AND Ym=?
-            """
+def _monthly_select(conn: pyodbc.Connection, alias: str = ""):
+    """월별 입력 SELECT 컬럼과 행 후처리 함수"""
+    p = f"{alias}." if alias else ""
+    # ✅ IsDurunuri 컬럼 존재 여부 확인
+    has_is_durunuri = column_exists(conn, "dbo.PayrollMonthlyInput", "IsDurunuri")
 
-        row = fetch_one(conn, sql, (employeeId, ym))
-        if not row:
-            return None
+    select_parts = [
+        f"{p}EmployeeId AS employeeId", f"{p}Ym AS ym", f"{p}WorkHours AS workHours", f"{p}Bonus AS bonus",
+        f"{p}OvertimeHours AS overtimeHours", f"{p}NightHours AS nightHours", f"{p}HolidayHours AS holidayHours",
+        f"{p}WeeklyHours AS weeklyHours", f"{p}WeekCount AS weekCount",
+    ]
+    if has_is_durunuri:
+        select_parts.append(f"{p}IsDurunuri AS isDurunuri")
+    select_parts.append(f"CONVERT(NVARCHAR(19), {p}UpdatedAt, 126) AS updatedAt")
 
+    def shape(row: Dict[str, Any]) -> Dict[str, Any]:
         for k in ["workHours", "bonus", "overtimeHours", "nightHours", "holidayHours", "weeklyHours"]:
             row[k] = float(row[k] or 0)
         row["weekCount"] = int(row.get("weekCount") or 0)
@@ -1360,8 +3364,25 @@ def get_monthly(employeeId: int, ym: str):
             row["isDurunuri"] = bool(row.get("isDurunuri"))
         else:
             row["isDurunuri"] = False
-
         return row
+
+    return select_parts, shape
+
+
+@app.get("/payroll/monthly", dependencies=[Depends(require_api_key)])
+def get_monthly(employeeId: int, ym: str):
+    conn = get_conn()
+    try:
+        if not table_exists(conn, "dbo.PayrollMonthlyInput"):
+            return None
+
+        select_parts, shape = _monthly_select(conn)
+        sql = f"SELECT {', '.join(select_parts)} FROM dbo.PayrollMonthlyInput WHERE EmployeeId=? AND Ym=?"
+
+        row = fetch_one(conn, sql, (employeeId, ym))
+        if not row:
+            return None
+        return shape(row)
     finally:
         conn.close()
 
@@ -1377,214 +3398,218 @@ def save_payroll_result(data: dict):
         if not table_exists(conn, "dbo.PayrollResults"):
             raise HTTPException(status_code=500, detail="dbo.PayrollResults 테이블이 없습니다.")
 
-        # 공식 JSON 변환
-        payment_formulas = json.dumps(data.get("paymentFormulas", {}), ensure_ascii=False)
-        deduction_formulas = json.dumps(data.get("deductionFormulas", {}), ensure_ascii=False)
-
-        # ✅ 두루누리 컬럼 체크
-        has_duru_employer = column_exists(conn, "dbo.PayrollResults", "DuruNuriEmployerContribution")
-        has_duru_employee = column_exists(conn, "dbo.PayrollResults", "DuruNuriEmployeeContribution")
-        has_duru_applied = column_exists(conn, "dbo.PayrollResults", "DuruNuriApplied")
-
-        duru_employer = float(data.get("duruNuriEmployerContribution", 0) or 0)
-        duru_employee = float(data.get("duruNuriEmployeeContribution", 0) or 0)
-        duru_applied = 1 if bool(data.get("duruNuriApplied", False)) else 0
-
-        # UPDATE SET 절 구성
-        update_sets = [
-            "ClientId = ?",
-            "BaseSalary = ?",
-            "OvertimeAllowance = ?",
-            "NightAllowance = ?",
-            "HolidayAllowance = ?",
-            "WeeklyHolidayPay = ?",
-            "Bonus = ?",
-            "AdditionalAllowance1Name = ?",
-            "AdditionalAllowance1Amount = ?",
-            "AdditionalAllowance2Name = ?",
-            "AdditionalAllowance2Amount = ?",
-            "TotalPayment = ?",
-            "NationalPension = ?",
-            "HealthInsurance = ?",
-            "LongTermCare = ?",
-            "EmploymentInsurance = ?",
-            "IncomeTax = ?",
-            "LocalIncomeTax = ?",
-            "AdditionalDeduction1Name = ?",
-            "AdditionalDeduction1Amount = ?",
-            "AdditionalDeduction2Name = ?",
-            "AdditionalDeduction2Amount = ?",
-            "TotalDeduction = ?",
-            "NetPay = ?",
-            "PaymentFormulas = ?",
-            "DeductionFormulas = ?",
-            "NormalHours = ?",
-            "OvertimeHours = ?",
-            "NightHours = ?",
-            "HolidayHours = ?",
-            "AttendanceWeeks = ?",
-        ]
+        stmt = STATEMENTS.get(conn, "payroll_results.merge", compile_payroll_result_merge)
+        params = stmt.params(data)
+        exec_sql(conn, stmt.sql, params)
+        return {"ok": True, "employeeId": data["employeeId"], "year": data["year"], "month": data["month"]}
+    except Exception as e:
+        log.exception("save_payroll_result failed: %s", e, extra={"ctx": {
+            "employeeId": data.get("employeeId"), "year": data.get("year"), "month": data.get("month"),
+        }})
+        raise HTTPException(status_code=500, detail=f"Save failed: {str(e)}")
+    finally:
+        conn.close()
 
-        # INSERT 컬럼 및 VALUES
-        insert_cols = [
-            "EmployeeId", "ClientId", "Year", "Month",
-            "BaseSalary", "OvertimeAllowance", "NightAllowance", "HolidayAllowance",
-            "WeeklyHolidayPay", "Bonus",
-            "AdditionalAllowance1Name", "AdditionalAllowance1Amount",
-            "AdditionalAllowance2Name", "AdditionalAllowance2Amount",
-            "TotalPayment",
-            "NationalPension", "HealthInsurance", "LongTermCare", "EmploymentInsurance",
-            "IncomeTax", "LocalIncomeTax",
-            "AdditionalDeduction1Name", "AdditionalDeduction1Amount",
-            "AdditionalDeduction2Name", "AdditionalDeduction2Amount",
-            "TotalDeduction", "NetPay",
-            "PaymentFormulas", "DeductionFormulas",
-            "NormalHours", "OvertimeHours", "NightHours", "HolidayHours", "AttendanceWeeks",
-        ]
 
-        insert_vals = ["?"] * 34
-
-        params_update = [
-            data["clientId"],
-            data["baseSalary"],
-            data.get("overtimeAllowance", 0),
-            data.get("nightAllowance", 0),
-            data.get("holidayAllowance", 0),
-            data.get("weeklyHolidayPay", 0),
-            data.get("bonus", 0),
-            data.get("additionalAllowance1Name"),
-            data.get("additionalAllowance1Amount", 0),
-            data.get("additionalAllowance2Name"),
-            data.get("additionalAllowance2Amount", 0),
-            data["totalPayment"],
-            data.get("nationalPension", 0),
-            data.get("healthInsurance", 0),
-            data.get("longTermCare", 0),
-            data.get("employmentInsurance", 0),
-            data.get("incomeTax", 0),
-            data.get("localIncomeTax", 0),
-            data.get("additionalDeduction1Name"),
-            data.get("additionalDeduction1Amount", 0),
-            data.get("additionalDeduction2Name"),
-            data.get("additionalDeduction2Amount", 0),
-            data["totalDeduction"],
-            data["netPay"],
-            payment_formulas,
-            deduction_formulas,
-            data.get("normalHours"),
-            data.get("overtimeHours"),
-            data.get("nightHours"),
-            data.get("holidayHours"),
-            data.get("attendanceWeeks"),
-        ]
+@app.post("/payroll/results/save-batch", dependencies=[Depends(require_api_key)])
+@db_route(limit=2)
+def save_payroll_results_batch(body: PayrollResultBatchIn):
+    """
+    급여 계산 결과 일괄 저장 (거래처 한 달치)
+    - 임시 테이블 적재 후 MERGE 1회, 커밋 1회 (전체 성공 또는 전체 롤백)
+    - 입력 오류 행은 건너뛰고 상태 목록에 failed로 보고
+    """
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = [None] * len(body.items)
+    staged_items: Dict[int, tuple] = {}  # employeeId -> (index, data)
 
-        params_insert = [
-            data["employeeId"], data["clientId"], data["year"], data["month"],
-            data["baseSalary"],
-            data.get("overtimeAllowance", 0),
-            data.get("nightAllowance", 0),
-            data.get("holidayAllowance", 0),
-            data.get("weeklyHolidayPay", 0),
-            data.get("bonus", 0),
-            data.get("additionalAllowance1Name"),
-            data.get("additionalAllowance1Amount", 0),
-            data.get("additionalAllowance2Name"),
-            data.get("additionalAllowance2Amount", 0),
-            data["totalPayment"],
-            data.get("nationalPension", 0),
-            data.get("healthInsurance", 0),
-            data.get("longTermCare", 0),
-            data.get("employmentInsurance", 0),
-            data.get("incomeTax", 0),
-            data.get("localIncomeTax", 0),
-            data.get("additionalDeduction1Name"),
-            data.get("additionalDeduction1Amount", 0),
-            data.get("additionalDeduction2Name"),
-            data.get("additionalDeduction2Amount", 0),
-            data["totalDeduction"],
-            data["netPay"],
-            payment_formulas,
-            deduction_formulas,
-            data.get("normalHours"),
-            data.get("overtimeHours"),
-            data.get("nightHours"),
-            data.get("holidayHours"),
-            data.get("attendanceWeeks"),
-        ]
+    conn = get_conn()
+    try:
+        if not table_exists(conn, "dbo.PayrollResults"):
+            raise HTTPException(status_code=500, detail="dbo.PayrollResults 테이블이 없습니다.")
 
-        # ✅ 두루누리 컬럼 추가
-        if has_duru_employer:
-            update_sets.append("DuruNuriEmployerContribution = ?")
-            insert_cols.append("DuruNuriEmployerContribution")
-            insert_vals.append("?")
-            params_update.append(duru_employer)
-            params_insert.append(duru_employer)
+        own_ids = {
+            int(r["EmployeeId"])
+            for r in fetch_all(conn, "SELECT EmployeeId FROM dbo.Employees WHERE ClientId=?", (body.clientId,))
+        }
 
-        if has_duru_employee:
-            update_sets.append("DuruNuriEmployeeContribution = ?")
-            insert_cols.append("DuruNuriEmployeeContribution")
-            insert_vals.append("?")
-            params_update.append(duru_employee)
-            params_insert.append(duru_employee)
+        for idx, raw in enumerate(body.items):
+            data = dict(raw)
+            data.setdefault("clientId", body.clientId)
+            data.setdefault("year", body.year)
+            data.setdefault("month", body.month)
+            if body.calculatedBy is not None:
+                data.setdefault("calculatedBy", body.calculatedBy)
 
-        if has_duru_applied:
-            update_sets.append("DuruNuriApplied = ?")
-            insert_cols.append("DuruNuriApplied")
-            insert_vals.append("?")
-            params_update.append(duru_applied)
-            params_insert.append(duru_applied)
+            emp_id = data.get("employeeId")
+            error = None
+            try:
+                if emp_id is None:
+                    error = "employeeId is required"
+                elif (int(data["clientId"]), int(data["year"]), int(data["month"])) != (body.clientId, body.year, body.month):
+                    error = "clientId/year/month mismatch"
+                elif int(emp_id) not in own_ids:
+                    error = f"employee {emp_id} does not belong to client {body.clientId}"
+            except (ValueError, TypeError) as e:
+                error = f"invalid clientId/year/month/employeeId: {e}"
+            if error:
+                results[idx] = {"employeeId": emp_id, "status": "failed", "error": error}
+                continue
 
-        update_sets.append("CalculatedAt = SYSUTCDATETIME()")
-        update_sets.append("CalculatedBy = ?")
-        insert_cols.append("CalculatedBy")
-        insert_vals.append("?")
+            emp_id = int(emp_id)
+            data["employeeId"] = emp_id
+            if emp_id in staged_items:
+                prev_idx = staged_items[emp_id][0]
+                results[prev_idx] = {"employeeId": emp_id, "status": "failed", "error": f"duplicate of row {idx} (later row wins)"}
+            staged_items[emp_id] = (idx, data)
 
-        params_update.append(data.get("calculatedBy", "system"))
-        params_insert.append(data.get("calculatedBy", "system"))
+        stmt = STATEMENTS.get(conn, "payroll_results.bulk_merge", compile_payroll_result_bulk_merge)
+        staged = []
+        for emp_id, (idx, data) in staged_items.items():
+            try:
+                row = stmt.row(data)
+                _pr_check_numbers(stmt.columns, row)
+                staged.append((idx,) + row)
+            except KeyError as e:
+                results[idx] = {"employeeId": emp_id, "status": "failed", "error": f"missing field {e}"}
+            except (ValueError, TypeError) as e:
+                results[idx] = {"employeeId": emp_id, "status": "failed", "error": f"invalid value: {e}"}
+
+        if staged:
+            cur = conn.cursor()
+            try:
+                _execute(cur, stmt.extra["stage"])
+                _execute_many(cur, stmt.extra["insert"], staged)
+                _execute(cur, stmt.sql)
+                out = fetch_all(conn, stmt.extra["select"])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise HTTPException(status_code=500, detail=f"Batch save failed: {e}")
+
+            for r in out:
+                idx = int(r["rowNo"])
+                results[idx] = {
+                    "employeeId": int(body.items[idx]["employeeId"]),
+                    "status": "inserted" if str(r["mergeAction"]).lower() == "insert" else "updated",
+                    "resultId": int(r["resultId"]),
+                }
+            exec_sql(conn, stmt.extra["drop"])
 
-        sql = f"""
-        MERGE dbo.PayrollResults AS target
-        USING (SELECT ? AS EmployeeId, ? AS Year, ? AS Month) AS source
-        ON target.EmployeeId = source.EmployeeId 
-            AND target.Year = source.Year 
-            AND target.Month = source.Month
-        WHEN MATCHED THEN
-            UPDATE SET {', '.join(update_sets)}
-        WHEN NOT MATCHED THEN
-            INSERT ({', '.join(insert_cols)})
-            VALUES ({', '.join(insert_vals)});
-        """
+        for idx, r in enumerate(results):
+            if r is None:
+                results[idx] = {"employeeId": body.items[idx].get("employeeId"), "status": "failed", "error": "no row returned by MERGE"}
 
-        params = (
-            data["employeeId"], data["year"], data["month"],
-        ) + tuple(params_update) + tuple(params_insert)
+        counts = {"inserted": 0, "updated": 0, "failed": 0}
+        for r in results:
+            counts[r["status"]] += 1
 
+        elapsed = time.perf_counter() - started
+        saved = counts["inserted"] + counts["updated"]
+        rows_per_sec = round(saved / elapsed, 1) if elapsed > 0 else None
+        log.info("급여 결과 일괄 저장: client=%s %s-%02d rows=%s failed=%s %.0fms (%s rows/s)",
+                 body.clientId, body.year, body.month, saved, counts["failed"], elapsed * 1000, rows_per_sec,
+                 extra={"ctx": {"clientId": body.clientId, "rows": saved, "failed": counts["failed"]}})
 
-        print(f"DEBUG_SQL_MARKERS: {sql.count('?')}")
-        print(f"DEBUG_PARAMS_LEN: {len(params)}")
-        print(f"DEBUG_INSERT_COLS: {insert_cols}")
-        print(f"DEBUG_UPDATE_SETS_COUNT: {len(update_sets)}")
-        
-        # Log full SQL for debugging
-        with open("debug_sql.log", "w", encoding="utf-8") as f:
-            f.write(f"SQL Statement:\n{sql}\n\n")
-            f.write(f"Insert Columns: {insert_cols}\n")
-            f.write(f"Update Sets: {update_sets}\n")
-            f.write(f"Params count: {len(params)}\n")
-        
-        exec_sql(conn, sql, params)
-        return {"ok": True, "employeeId": data["employeeId"], "year": data["year"], "month": data["month"]}
-    except Exception as e:
-        import traceback
-        err_msg = traceback.format_exc()
-        print(f"CRITICAL ERROR in save_payroll_result: {e}")
-        with open("debug_error.log", "w", encoding="utf-8") as f:
-            f.write(f"Error: {e}\nTraceback:\n{err_msg}")
-        raise HTTPException(status_code=500, detail=f"Save failed: {str(e)}")
+        return {
+            "ok": counts["failed"] == 0,
+            "clientId": body.clientId,
+            "year": body.year,
+            "month": body.month,
+            "total": len(body.items),
+            **counts,
+            "elapsedMs": round(elapsed * 1000, 1),
+            "rowsPerSec": rows_per_sec,
+            "results": results,
+        }
     finally:
         conn.close()
 
 
+def _payroll_result_select(conn: pyodbc.Connection):
+    """급여 결과 SELECT 컬럼과 행 후처리 함수 (두루누리 포함)"""
+    # ✅ 두루누리 컬럼 체크
+    has_duru_employer = column_exists(conn, "dbo.PayrollResults", "DuruNuriEmployerContribution")
+    has_duru_employee = column_exists(conn, "dbo.PayrollResults", "DuruNuriEmployeeContribution")
+    has_duru_applied = column_exists(conn, "dbo.PayrollResults", "DuruNuriApplied")
+
+    select_parts = [
+        "ResultId AS resultId", "EmployeeId AS employeeId", "ClientId AS clientId",
+        "Year AS year", "Month AS month",
+        "BaseSalary AS baseSalary", "OvertimeAllowance AS overtimeAllowance",
+        "NightAllowance AS nightAllowance", "HolidayAllowance AS holidayAllowance",
+        "WeeklyHolidayPay AS weeklyHolidayPay", "Bonus AS bonus",
+        "AdditionalAllowance1Name AS additionalAllowance1Name",
+        "AdditionalAllowance1Amount AS additionalAllowance1Amount",
+        "AdditionalAllowance2Name AS additionalAllowance2Name",
+        "AdditionalAllowance2Amount AS additionalAllowance2Amount",
+        "TotalPayment AS totalPayment",
+        "NationalPension AS nationalPension", "HealthInsurance AS healthInsurance",
+        "LongTermCare AS longTermCare", "EmploymentInsurance AS employmentInsurance",
+        "IncomeTax AS incomeTax", "LocalIncomeTax AS localIncomeTax",
+        "AdditionalDeduction1Name AS additionalDeduction1Name",
+        "AdditionalDeduction1Amount AS additionalDeduction1Amount",
+        "AdditionalDeduction2Name AS additionalDeduction2Name",
+        "AdditionalDeduction2Amount AS additionalDeduction2Amount",
+        "TotalDeduction AS totalDeduction", "NetPay AS netPay",
+        "PaymentFormulas AS paymentFormulas", "DeductionFormulas AS deductionFormulas",
+        "NormalHours AS normalHours", "OvertimeHours AS overtimeHours",
+        "NightHours AS nightHours", "HolidayHours AS holidayHours",
+        "AttendanceWeeks AS attendanceWeeks",
+    ]
+
+    if has_duru_employer:
+        select_parts.append("DuruNuriEmployerContribution AS duruNuriEmployerContribution")
+    if has_duru_employee:
+        select_parts.append("DuruNuriEmployeeContribution AS duruNuriEmployeeContribution")
+    if has_duru_applied:
+        select_parts.append("DuruNuriApplied AS duruNuriApplied")
+
+    select_parts.append("CONVERT(NVARCHAR(19), CalculatedAt, 126) AS calculatedAt")
+    select_parts.append("CalculatedBy AS calculatedBy")
+
+    def shape(r: Dict[str, Any]) -> Dict[str, Any]:
+        # 숫자 변환
+        for k in ["baseSalary", "overtimeAllowance", "nightAllowance", "holidayAllowance",
+                  "weeklyHolidayPay", "bonus", "additionalAllowance1Amount", "additionalAllowance2Amount",
+                  "totalPayment", "nationalPension", "healthInsurance", "longTermCare",
+                  "employmentInsurance", "incomeTax", "localIncomeTax",
+                  "additionalDeduction1Amount", "additionalDeduction2Amount",
+                  "totalDeduction", "netPay", "normalHours", "overtimeHours",
+                  "nightHours", "holidayHours", "attendanceWeeks"]:
+            if k in r:
+                r[k] = float(r.get(k) or 0)
+
+        # 공식 JSON 파싱
+        try:
+            r["paymentFormulas"] = json.loads(r.get("paymentFormulas") or "{}")
+        except:
+            r["paymentFormulas"] = {}
+        try:
+            r["deductionFormulas"] = json.loads(r.get("deductionFormulas") or "{}")
+        except:
+            r["deductionFormulas"] = {}
+
+        # 두루누리
+        if has_duru_employer:
+            r["duruNuriEmployerContribution"] = float(r.get("duruNuriEmployerContribution") or 0)
+        else:
+            r["duruNuriEmployerContribution"] = 0.0
+
+        if has_duru_employee:
+            r["duruNuriEmployeeContribution"] = float(r.get("duruNuriEmployeeContribution") or 0)
+        else:
+            r["duruNuriEmployeeContribution"] = 0.0
+
+        if has_duru_applied:
+            r["duruNuriApplied"] = bool(r.get("duruNuriApplied"))
+        else:
+            r["duruNuriApplied"] = False
+        return r
+
+    return select_parts, shape
+
+
 @app.get("/payroll/results/{employee_id}", dependencies=[Depends(require_api_key)])
 def get_payroll_results(employee_id: int, year: int = Query(default=None), month: int = Query(default=None)):
     """직원 급여 이력 조회 (두루누리 포함)"""
@@ -1593,45 +3618,7 @@ def get_payroll_results(employee_id: int, year: int = Query(default=None), month
         if not table_exists(conn, "dbo.PayrollResults"):
             return []
 
-        # ✅ 두루누리 컬럼 체크
-        has_duru_employer = column_exists(conn, "dbo.PayrollResults", "DuruNuriEmployerContribution")
-        has_duru_employee = column_exists(conn, "dbo.PayrollResults", "DuruNuriEmployeeContribution")
-        has_duru_applied = column_exists(conn, "dbo.PayrollResults", "DuruNuriApplied")
-
-        select_parts = [
-            "ResultId AS resultId", "EmployeeId AS employeeId", "ClientId AS clientId",
-            "Year AS year", "Month AS month",
-            "BaseSalary AS baseSalary", "OvertimeAllowance AS overtimeAllowance",
-            "NightAllowance AS nightAllowance", "HolidayAllowance AS holidayAllowance",
-            "WeeklyHolidayPay AS weeklyHolidayPay", "Bonus AS bonus",
-            "AdditionalAllowance1Name AS additionalAllowance1Name",
-            "AdditionalAllowance1Amount AS additionalAllowance1Amount",
-            "AdditionalAllowance2Name AS additionalAllowance2Name",
-            "AdditionalAllowance2Amount AS additionalAllowance2Amount",
-            "TotalPayment AS totalPayment",
-            "NationalPension AS nationalPension", "HealthInsurance AS healthInsurance",
-            "LongTermCare AS longTermCare", "EmploymentInsurance AS employmentInsurance",
-            "IncomeTax AS incomeTax", "LocalIncomeTax AS localIncomeTax",
-            "AdditionalDeduction1Name AS additionalDeduction1Name",
-            "AdditionalDeduction1Amount AS additionalDeduction1Amount",
-            "AdditionalDeduction2Name AS additionalDeduction2Name",
-            "AdditionalDeduction2Amount AS additionalDeduction2Amount",
-            "TotalDeduction AS totalDeduction", "NetPay AS netPay",
-            "PaymentFormulas AS paymentFormulas", "DeductionFormulas AS deductionFormulas",
-            "NormalHours AS normalHours", "OvertimeHours AS overtimeHours",
-            "NightHours AS nightHours", "HolidayHours AS holidayHours",
-            "AttendanceWeeks AS attendanceWeeks",
-        ]
-
-        if has_duru_employer:
-            select_parts.append("DuruNuriEmployerContribution AS duruNuriEmployerContribution")
-        if has_duru_employee:
-            select_parts.append("DuruNuriEmployeeContribution AS duruNuriEmployeeContribution")
-        if has_duru_applied:
-            select_parts.append("DuruNuriApplied AS duruNuriApplied")
-
-        select_parts.append("CONVERT(NVARCHAR(19), CalculatedAt, 126) AS calculatedAt")
-        select_parts.append("CalculatedBy AS calculatedBy")
+        select_parts, shape = _payroll_result_select(conn)
 
         where = "WHERE EmployeeId=?"
         params = [employee_id]
@@ -1641,47 +3628,7 @@ def get_payroll_results(employee_id: int, year: int = Query(default=None), month
             params.extend([year, month])
 
         sql = f"SELECT {', '.join(select_parts)} FROM dbo.PayrollResults {where} ORDER BY Year DESC, Month DESC"
-        rows = fetch_all(conn, sql, tuple(params))
-
-        for r in rows:
-            # 숫자 변환
-            for k in ["baseSalary", "overtimeAllowance", "nightAllowance", "holidayAllowance",
-                      "weeklyHolidayPay", "bonus", "additionalAllowance1Amount", "additionalAllowance2Amount",
-                      "totalPayment", "nationalPension", "healthInsurance", "longTermCare",
-                      "employmentInsurance", "incomeTax", "localIncomeTax",
-                      "additionalDeduction1Amount", "additionalDeduction2Amount",
-                      "totalDeduction", "netPay", "normalHours", "overtimeHours",
-                      "nightHours", "holidayHours", "attendanceWeeks"]:
-                if k in r:
-                    r[k] = float(r.get(k) or 0)
-
-            # 공식 JSON 파싱
-            try:
-                r["paymentFormulas"] = json.loads(r.get("paymentFormulas") or "{}")
-            except:
-                r["paymentFormulas"] = {}
-            try:
-                r["deductionFormulas"] = json.loads(r.get("deductionFormulas") or "{}")
-            except:
-                r["deductionFormulas"] = {}
-
-            # 두루누리
-            if has_duru_employer:
-                r["duruNuriEmployerContribution"] = float(r.get("duruNuriEmployerContribution") or 0)
-            else:
-                r["duruNuriEmployerContribution"] = 0.0
-
-            if has_duru_employee:
-                r["duruNuriEmployeeContribution"] = float(r.get("duruNuriEmployeeContribution") or 0)
-            else:
-                r["duruNuriEmployeeContribution"] = 0.0
-
-            if has_duru_applied:
-                r["duruNuriApplied"] = bool(r.get("duruNuriApplied"))
-            else:
-                r["duruNuriApplied"] = False
-
-        return rows
+        return [shape(r) for r in fetch_all(conn, sql, tuple(params))]
     finally:
         conn.close()
 
@@ -1774,7 +3721,7 @@ def confirm_all_payroll_results(client_id: int, year: int, month: int, confirmed
 @app.get("/payroll/results/client/{client_id}/confirmation-status", dependencies=[Depends(require_api_key)])
 def get_confirmation_status(client_id: int, year: int, month: int):
     """거래처 급여 결과 확정 상태 조회"""
-    print(f"🔍 마감 현황 조회: ClientId={client_id}, Year={year}, Month={month}")
+    log.debug("마감 현황 조회: ClientId=%s, Year=%s, Month=%s", client_id, year, month)
     conn = get_conn()
     try:
         if not table_exists(conn, "dbo.PayrollResults"):
@@ -1804,7 +3751,7 @@ def get_confirmation_status(client_id: int, year: int, month: int):
 
         return {"employees": rows}
     except Exception as e:
-        print(f"⚠️ 마감 현황 조회 에러: {e}")
+        log.exception("마감 현황 조회 에러: %s", e, extra={"ctx": {"clientId": client_id, "year": year, "month": month}})
         return {"employees": []}
     finally:
         conn.close()
@@ -1814,13 +3761,18 @@ def get_confirmation_status(client_id: int, year: int, month: int):
 # SMTP 설정
 # =========================
 @app.get("/smtp/config", response_model=SmtpConfigOut, dependencies=[Depends(require_api_key)])
-def get_smtp_config():
+def get_smtp_config(request: Request, response: Response):
     """SMTP 설정 조회"""
     conn = get_conn()
     try:
         if not table_exists(conn, "dbo.SmtpConfig"):
             raise HTTPException(status_code=404, detail="SmtpConfig 테이블이 없습니다. init_db.py를 실행하세요.")
 
+        version = resource_version(conn, "smtp-config", "dbo.SmtpConfig", allow_empty=False)
+        not_modified = conditional_get(request, response, version)
+        if not_modified is not None:
+            return not_modified
+
         row = fetch_one(
             conn,
             "SELECT TOP 1 Host AS host, Port AS port, Username AS username, Password AS password, "
@@ -1836,7 +3788,7 @@ def get_smtp_config():
     except HTTPException:
         raise
     except Exception as e:
-        print(f"⚠️ SMTP 설정 조회 에러: {e}")
+        log.exception("SMTP 설정 조회 에러: %s", e)
         raise HTTPException(status_code=500, detail=f"SMTP 설정 조회 실패: {str(e)}")
     finally:
         conn.close()
@@ -1869,13 +3821,18 @@ def save_smtp_config(body: SmtpConfigIn):
 # 앱 설정
 # =========================
 @app.get("/app/settings", response_model=AppSettingsOut, dependencies=[Depends(require_api_key)])
-def get_app_settings():
+def get_app_settings(request: Request, response: Response):
     """앱 설정 조회"""
     conn = get_conn()
     try:
         if not table_exists(conn, "dbo.AppSettings"):
             raise HTTPException(status_code=404, detail="AppSettings 테이블이 없습니다. init_db.py를 실행하세요.")
 
+        version = resource_version(conn, "app-settings", "dbo.AppSettings", allow_empty=False)
+        not_modified = conditional_get(request, response, version)
+        if not_modified is not None:
+            return not_modified
+
         row = fetch_one(
             conn,
             "SELECT TOP 1 ServerUrl AS serverUrl, ApiKey AS apiKey, "
@@ -1890,12 +3847,7 @@ def get_app_settings():
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        with open("server_error.log", "a", encoding="utf-8") as f:
-            f.write(f"\n[ERROR] /app/settings failed: {str(e)}\n")
-            f.write(traceback.format_exc())
-            f.write("-" * 20 + "\n")
-        print(f"⚠️ 앱 설정 조회 에러: {e}")
+        log.exception("앱 설정 조회 에러: %s", e)
         raise HTTPException(status_code=500, detail=f"앱 설정 조회 실패: {str(e)}")
     finally:
         conn.close()
@@ -1923,6 +3875,194 @@ def save_app_settings(body: AppSettingsIn):
         conn.close()
 
 
+# =========================
+# 메일 발송 현황 요약 (dbo.PayrollMailStatus)
+# =========================
+# 직원 x 연월 x 문서별 최근 로그 1건 + 마지막 성공 발송 시각 (add_mail_status_summary.sql)
+# 로그 INSERT와 같은 트랜잭션에서 갱신하고, 발송 현황 조회는 이 표만 읽음
+MAIL_STATUS_TABLE = "dbo.PayrollMailStatus"
+
+_MAIL_LOG_INSERT = (
+    "INSERT INTO dbo.PayrollMailLog (ClientId, EmployeeId, Ym, DocType, ToEmail, CcEmail, Subject, Status, ErrorMessage, PcId) "
+    "OUTPUT inserted.Id, inserted.SentAt "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# 더 최근(SentAt, Id) 상태가 이미 있으면 상태는 그대로 두고 마지막 성공 시각만 보정
+_MAIL_STATUS_MERGE = """
+MERGE dbo.PayrollMailStatus WITH (HOLDLOCK) AS t
+USING (
+    SELECT ? AS ClientId, ? AS Ym, ? AS DocType, ? AS EmployeeId,
+           ? AS Status, ? AS ErrorMessage, CAST(? AS DATETIME2(7)) AS SentAt, ? AS LastLogId
+) AS s
+ON t.ClientId = s.ClientId AND t.Ym = s.Ym AND t.DocType = s.DocType AND t.EmployeeId = s.EmployeeId
+WHEN MATCHED AND (s.SentAt > t.SentAt OR (s.SentAt = t.SentAt AND s.LastLogId > t.LastLogId)) THEN
+    UPDATE SET
+        Status = s.Status,
+        ErrorMessage = s.ErrorMessage,
+        SentAt = s.SentAt,
+        LastLogId = s.LastLogId,
+        LastSentOkAt = CASE WHEN s.Status = 'sent' THEN s.SentAt ELSE t.LastSentOkAt END,
+        UpdatedAt = SYSUTCDATETIME()
+WHEN MATCHED AND s.Status = 'sent' AND (t.LastSentOkAt IS NULL OR s.SentAt > t.LastSentOkAt) THEN
+    UPDATE SET LastSentOkAt = s.SentAt, UpdatedAt = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN
+    INSERT (ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, LastLogId, LastSentOkAt)
+    VALUES (s.ClientId, s.Ym, s.DocType, s.EmployeeId, s.Status, s.ErrorMessage, s.SentAt, s.LastLogId,
+            CASE WHEN s.Status = 'sent' THEN s.SentAt END);
+"""
+
+
+# 일괄 저장: 스테이징 적재(fast_executemany) → 로그 INSERT 1회 → 요약 MERGE 1회
+_MAIL_LOG_COLUMNS = "ClientId, EmployeeId, Ym, DocType, ToEmail, CcEmail, Subject, Status, ErrorMessage, PcId"
+
+_MAIL_BULK_STAGE = (
+    "IF OBJECT_ID('tempdb..#MailStage') IS NOT NULL DROP TABLE #MailStage; "
+    "IF OBJECT_ID('tempdb..#MailOut') IS NOT NULL DROP TABLE #MailOut; "
+    f"SELECT TOP 0 CAST(0 AS INT) AS RowNo, {_MAIL_LOG_COLUMNS} INTO #MailStage FROM dbo.PayrollMailLog; "
+    "CREATE TABLE #MailOut (Id INT NOT NULL, ClientId INT NOT NULL, EmployeeId INT NULL, Ym NVARCHAR(7) NOT NULL, "
+    "DocType NVARCHAR(30) NOT NULL, Status NVARCHAR(30) NOT NULL, ErrorMessage NVARCHAR(1000) NULL, SentAt DATETIME2(7) NOT NULL);"
+)
+_MAIL_BULK_STAGE_INSERT = f"INSERT INTO #MailStage (RowNo, {_MAIL_LOG_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_MAIL_BULK_INSERT = (
+    f"INSERT INTO dbo.PayrollMailLog ({_MAIL_LOG_COLUMNS}) "
+    "OUTPUT inserted.Id, inserted.ClientId, inserted.EmployeeId, inserted.Ym, inserted.DocType, "
+    "inserted.Status, inserted.ErrorMessage, inserted.SentAt INTO #MailOut "
+    f"SELECT {_MAIL_LOG_COLUMNS} FROM #MailStage ORDER BY RowNo"
+)
+_MAIL_BULK_STATUS_MERGE = """
+MERGE dbo.PayrollMailStatus WITH (HOLDLOCK) AS t
+USING (
+    SELECT ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, LastLogId, LastSentOkAt
+    FROM (
+        SELECT ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, Id AS LastLogId,
+               MAX(CASE WHEN Status = 'sent' THEN SentAt END)
+                   OVER (PARTITION BY ClientId, Ym, DocType, EmployeeId) AS LastSentOkAt,
+               ROW_NUMBER() OVER (PARTITION BY ClientId, Ym, DocType, EmployeeId ORDER BY SentAt DESC, Id DESC) AS rn
+        FROM #MailOut
+        WHERE EmployeeId IS NOT NULL
+    ) x
+    WHERE rn = 1
+) AS s
+ON t.ClientId = s.ClientId AND t.Ym = s.Ym AND t.DocType = s.DocType AND t.EmployeeId = s.EmployeeId
+WHEN MATCHED AND (s.SentAt > t.SentAt OR (s.SentAt = t.SentAt AND s.LastLogId > t.LastLogId)) THEN
+    UPDATE SET
+        Status = s.Status,
+        ErrorMessage = s.ErrorMessage,
+        SentAt = s.SentAt,
+        LastLogId = s.LastLogId,
+        LastSentOkAt = CASE WHEN s.LastSentOkAt > t.LastSentOkAt OR t.LastSentOkAt IS NULL
+                            THEN s.LastSentOkAt ELSE t.LastSentOkAt END,
+        UpdatedAt = SYSUTCDATETIME()
+WHEN MATCHED AND s.LastSentOkAt IS NOT NULL AND (t.LastSentOkAt IS NULL OR s.LastSentOkAt > t.LastSentOkAt) THEN
+    UPDATE SET LastSentOkAt = s.LastSentOkAt, UpdatedAt = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN
+    INSERT (ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, LastLogId, LastSentOkAt)
+    VALUES (s.ClientId, s.Ym, s.DocType, s.EmployeeId, s.Status, s.ErrorMessage, s.SentAt, s.LastLogId, s.LastSentOkAt);
+"""
+_MAIL_BULK_DROP = (
+    "IF OBJECT_ID('tempdb..#MailStage') IS NOT NULL DROP TABLE #MailStage; "
+    "IF OBJECT_ID('tempdb..#MailOut') IS NOT NULL DROP TABLE #MailOut;"
+)
+
+
+def insert_mail_logs(conn: pyodbc.Connection, rows: List[tuple]) -> int:
+    """
+    PayrollMailLog INSERT + 발송 현황 요약 갱신 (커밋하지 않음, 호출 측이 트랜잭션 관리)
+    rows: (ClientId, EmployeeId, Ym, DocType, ToEmail, CcEmail, Subject, Status, ErrorMessage, PcId)
+    - 1건: INSERT ... OUTPUT 후 요약 MERGE
+    - 여러 건: #MailStage에 fast_executemany로 적재 → INSERT...SELECT 1회 → 요약 MERGE 1회
+    """
+    if not rows:
+        return 0
+
+    has_summary = table_exists(conn, MAIL_STATUS_TABLE)
+    cur = conn.cursor()
+
+    if len(rows) == 1:
+        row = rows[0]
+        _execute(cur, _MAIL_LOG_INSERT, row)
+        log_id, sent_at = cur.fetchone()
+        if has_summary and row[1] is not None:
+            _execute(cur, _MAIL_STATUS_MERGE, (row[0], row[2], row[3], row[1], row[7], row[8], sent_at, log_id))
+        return 1
+
+    try:
+        _execute(cur, _MAIL_BULK_STAGE)
+        _execute_many(cur, _MAIL_BULK_STAGE_INSERT, [(i,) + tuple(r) for i, r in enumerate(rows)])
+        _execute(cur, _MAIL_BULK_INSERT)
+        if has_summary:
+            _execute(cur, _MAIL_BULK_STATUS_MERGE)
+    finally:
+        try:
+            _execute(cur, _MAIL_BULK_DROP)
+        except Exception:
+            pass
+    return len(rows)
+
+
+def write_mail_logs(conn: pyodbc.Connection, rows: List[tuple]) -> int:
+    """insert_mail_logs + 커밋 (실패 시 전체 롤백)"""
+    try:
+        count = insert_mail_logs(conn, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return count
+
+
+def rebuild_mail_status(conn: pyodbc.Connection, client_id: Optional[int] = None, ym: Optional[str] = None) -> int:
+    """PayrollMailLog 전체(또는 거래처/연월 범위)로 요약 표를 다시 채움"""
+    if not table_exists(conn, MAIL_STATUS_TABLE):
+        raise RuntimeError(f"{MAIL_STATUS_TABLE} 테이블이 없습니다. add_mail_status_summary.sql을 먼저 실행하세요.")
+
+    where = ["m.EmployeeId IS NOT NULL"]
+    scope = []
+    params: List[Any] = []
+    if client_id is not None:
+        where.append("m.ClientId = ?")
+        scope.append("ClientId = ?")
+        params.append(client_id)
+    if ym:
+        where.append("m.Ym = ?")
+        scope.append("Ym = ?")
+        params.append(ym)
+
+    cur = conn.cursor()
+    try:
+        _execute(
+            cur,
+            f"DELETE FROM dbo.PayrollMailStatus {'WHERE ' + ' AND '.join(scope) if scope else ''}",
+            tuple(params),
+        )
+        _execute(
+            cur,
+            f"""
+            INSERT INTO dbo.PayrollMailStatus (ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, LastLogId, LastSentOkAt)
+            SELECT ClientId, Ym, DocType, EmployeeId, Status, ErrorMessage, SentAt, Id, LastSentOkAt
+            FROM (
+                SELECT m.ClientId, m.Ym, m.DocType, m.EmployeeId, m.Status, m.ErrorMessage, m.SentAt, m.Id,
+                       MAX(CASE WHEN m.Status = 'sent' THEN m.SentAt END)
+                           OVER (PARTITION BY m.ClientId, m.Ym, m.DocType, m.EmployeeId) AS LastSentOkAt,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY m.ClientId, m.Ym, m.DocType, m.EmployeeId ORDER BY m.SentAt DESC, m.Id DESC
+                       ) AS rn
+                FROM dbo.PayrollMailLog m
+                WHERE {' AND '.join(where)}
+            ) x
+            WHERE rn = 1
+            """,
+            tuple(params),
+        )
+        count = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return count
+
+
 # =========================
 # 발송 현황
 # =========================
@@ -1992,9 +4132,31 @@ def clients_send_status(client_id: int, ym: str, docType: Literal["slip", "regis
         year = int(year_str)
         month = int(month_str)
         
+        if table_exists(conn, MAIL_STATUS_TABLE):
+            # 요약 표: 직원별 최근 상태 1행 (PK 조회)
+            last_mail = """
+            LEFT JOIN dbo.PayrollMailStatus ml
+                ON ml.ClientId = e.ClientId
+                AND ml.Ym = ?
+                AND ml.DocType = ?
+                AND ml.EmployeeId = e.EmployeeId
+            """
+        else:
+            last_mail = """
+            OUTER APPLY (
+                SELECT TOP 1 Status, ErrorMessage, SentAt
+                FROM dbo.PayrollMailLog m
+                WHERE m.EmployeeId = e.EmployeeId
+                  AND m.ClientId   = e.ClientId
+                  AND m.Ym         = ?
+                  AND m.DocType    = ?
+                ORDER BY m.SentAt DESC, m.Id DESC
+            ) ml
+            """
+
         rows = fetch_all(
             conn,
-            r"""
+            f"""
             SELECT
                 e.EmployeeId AS employeeId,
                 e.Name AS name,
@@ -2013,15 +4175,7 @@ def clients_send_status(client_id: int, ym: str, docType: Literal["slip", "regis
                 AND pr.Year = ?
                 AND pr.Month = ?
                 AND ISNULL(pr.IsConfirmed, 0) = 1
-            OUTER APPLY (
-                SELECT TOP 1 Status, ErrorMessage, SentAt
-                FROM dbo.PayrollMailLog m
-                WHERE m.EmployeeId = e.EmployeeId
-                  AND m.ClientId   = e.ClientId
-                  AND m.Ym         = ?
-                  AND m.DocType    = ?
-                ORDER BY m.SentAt DESC, m.Id DESC
-            ) ml
+            {last_mail}
             WHERE e.ClientId = ?
             ORDER BY e.Name
             """,
@@ -2075,6 +4229,143 @@ def clients_send_status(client_id: int, ym: str, docType: Literal["slip", "regis
         conn.close()
 
 
+# =========================
+# 거래처 월 작업공간 (한 번의 요청으로 화면 로딩)
+# =========================
+@app.get("/clients/{client_id}/workspace", dependencies=[Depends(require_api_key)])
+def client_workspace(client_id: int, ym: str):
+    """
+    거래처 월 작업공간 조회
+    - 직원/월별 입력/급여 결과/발송 상태/수당·공제 항목을 집합 쿼리 몇 번으로 조회
+    - 직원 수와 무관하게 왕복 1회 (직원별 /payroll/monthly, /payroll/results 호출 대체)
+    """
+    if not re.match(r"^\d{4}-\d{2}$", ym):
+        raise HTTPException(status_code=400, detail="ym must be YYYY-MM")
+    year, month = (int(x) for x in ym.split("-"))
+
+    conn = get_conn()
+    try:
+        if not table_exists(conn, "dbo.거래처"):
+            raise HTTPException(status_code=500, detail="dbo.거래처 테이블이 없습니다.")
+
+        client_parts, client_shape = _client_select(conn)
+        client = fetch_one(conn, f"SELECT {', '.join(client_parts)} FROM 거래처 WHERE ID=?", (client_id,))
+        if not client:
+            raise HTTPException(status_code=404, detail="Client not found")
+        client = client_shape(client)
+
+        employees: List[Dict[str, Any]] = []
+        if table_exists(conn, "dbo.Employees"):
+            stmt = STATEMENTS.get(conn, "employees.by_client", compile_employee_select("employees.by_client", "ClientId=? ORDER BY Name"))
+            employees = [stmt.shape(r) for r in fetch_all(conn, stmt.sql, (client_id,))]
+
+        monthly: Dict[int, Dict[str, Any]] = {}
+        if employees and table_exists(conn, "dbo.PayrollMonthlyInput"):
+            parts, shape = _monthly_select(conn, "m")
+            sql = (
+                f"SELECT {', '.join(parts)} FROM dbo.PayrollMonthlyInput m "
+                "JOIN dbo.Employees e ON e.EmployeeId = m.EmployeeId "
+                "WHERE e.ClientId=? AND m.Ym=?"
+            )
+            monthly = {int(r["employeeId"]): shape(r) for r in fetch_all(conn, sql, (client_id, ym))}
+
+        results: Dict[int, Dict[str, Any]] = {}
+        has_confirmed = False
+        if employees and table_exists(conn, "dbo.PayrollResults"):
+            parts, shape = _payroll_result_select(conn)
+            has_confirmed = column_exists(conn, "dbo.PayrollResults", "IsConfirmed")
+            if has_confirmed:
+                parts = parts + ["ISNULL(IsConfirmed, 0) AS isConfirmed"]
+            sql = f"SELECT {', '.join(parts)} FROM dbo.PayrollResults WHERE ClientId=? AND Year=? AND Month=?"
+            for r in fetch_all(conn, sql, (client_id, year, month)):
+                r = shape(r)
+                r["isConfirmed"] = bool(r.get("isConfirmed"))
+                results[int(r["employeeId"])] = r
+
+        # 직원 x 문서 종류별 최근 발송 1건
+        mail: Dict[tuple, Dict[str, Any]] = {}
+        if employees and table_exists(conn, MAIL_STATUS_TABLE):
+            rows = fetch_all(
+                conn,
+                "SELECT EmployeeId AS employeeId, DocType AS docType, Status AS lastStatus, "
+                "ErrorMessage AS lastError, CONVERT(NVARCHAR(19), SentAt, 126) AS lastSentAt "
+                "FROM dbo.PayrollMailStatus WHERE ClientId = ? AND Ym = ?",
+                (client_id, ym),
+            )
+            mail = {(int(r["employeeId"]), r["docType"]): r for r in rows}
+        elif employees and table_exists(conn, "dbo.PayrollMailLog"):
+            rows = fetch_all(
+                conn,
+                """
+                SELECT employeeId, docType, lastStatus, lastError, lastSentAt
+                FROM (
+                    SELECT
+                        m.EmployeeId AS employeeId,
+                        m.DocType AS docType,
+                        m.Status AS lastStatus,
+                        m.ErrorMessage AS lastError,
+                        CONVERT(NVARCHAR(19), m.SentAt, 126) AS lastSentAt,
+                        ROW_NUMBER() OVER (PARTITION BY m.EmployeeId, m.DocType ORDER BY m.SentAt DESC, m.Id DESC) AS rn
+                    FROM dbo.PayrollMailLog m
+                    WHERE m.ClientId = ? AND m.Ym = ? AND m.EmployeeId IS NOT NULL
+                ) x
+                WHERE rn = 1
+                """,
+                (client_id, ym),
+            )
+            mail = {(int(r["employeeId"]), r["docType"]): r for r in rows}
+
+        # 발송 대상 = 확정된 결과 + 이메일 사용 + 수신 주소 (send-status와 동일 기준)
+        send_summary = {dt: {"totalTargets": 0, "sentTargets": 0, "isDone": False} for dt in ("slip", "register")}
+        for emp in employees:
+            emp_id = int(emp["employeeId"])
+            emp["monthly"] = monthly.get(emp_id)
+            emp["result"] = results.get(emp_id)
+
+            email_to = emp.get("emailTo")
+            is_target = bool(
+                emp["result"] and emp["result"]["isConfirmed"]
+                and emp.get("useEmail") and email_to and str(email_to).strip() != ""
+            )
+            emp["send"] = {}
+            for dt, summary in send_summary.items():
+                m = mail.get((emp_id, dt)) or {}
+                is_sent = is_target and m.get("lastStatus") == "sent"
+                if is_target:
+                    summary["totalTargets"] += 1
+                if is_sent:
+                    summary["sentTargets"] += 1
+                emp["send"][dt] = {
+                    "isTarget": is_target,
+                    "lastStatus": m.get("lastStatus"),
+                    "lastSentAt": m.get("lastSentAt"),
+                    "lastError": m.get("lastError"),
+                    "isSent": is_sent,
+                }
+        for summary in send_summary.values():
+            summary["isDone"] = summary["totalTargets"] > 0 and summary["sentTargets"] >= summary["totalTargets"]
+
+        return {
+            "clientId": client_id,
+            "ym": ym,
+            "year": year,
+            "month": month,
+            "client": client,
+            "allowanceMasters": _load_allowance_masters(conn, client_id),
+            "deductionMasters": _load_deduction_masters(conn, client_id),
+            "employees": employees,
+            "summary": {
+                "employeeCount": len(employees),
+                "monthlyInputs": len(monthly),
+                "results": len(results),
+                "confirmed": sum(1 for r in results.values() if r["isConfirmed"]),
+                "send": send_summary,
+            },
+        }
+    finally:
+        conn.close()
+
+
 # =========================
 # 파일 로그
 # =========================
@@ -2126,36 +4417,108 @@ def log_mail(body: MailLogIn):
         if not table_exists(conn, "dbo.PayrollMailLog"):
             raise HTTPException(status_code=500, detail="dbo.PayrollMailLog 테이블이 없습니다.")
 
-        exec_sql(
-            conn,
-            "INSERT INTO dbo.PayrollMailLog (ClientId, EmployeeId, Ym, DocType, ToEmail, CcEmail, Subject, Status, ErrorMessage, PcId) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        write_mail_logs(conn, [
             (body.clientId, body.employeeId, body.ym, body.docType, body.toEmail, body.ccEmail, body.subject, body.status, body.errorMessage, body.pcId),
-        )
+        ])
         return {"ok": True}
     finally:
         conn.close()
 
 
-@app.post("/logs/mail/bulk", dependencies=[Depends(require_api_key)])
-def log_mail_bulk(body: MailLogBulkIn):
+MAIL_LOG_BULK_CHUNK = int(os.getenv("MAIL_LOG_BULK_CHUNK", "1000"))  # 스테이징 적재 1회당 행 수
+_NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+def _mail_log_row(it: MailLogIn) -> tuple:
+    return (it.clientId, it.employeeId, it.ym, it.docType, it.toEmail, it.ccEmail, it.subject, it.status, it.errorMessage, it.pcId)
+
+
+async def _iter_ndjson(request: Request):
+    """요청 본문을 줄 단위로 읽어 (줄 번호, dict) 생성 (본문 전체를 메모리에 올리지 않음)"""
+    pending: List[bytes] = []  # 아직 줄바꿈이 오지 않은 조각 (긴 줄도 조각마다 이어 붙이지 않음)
+    line_no = 0
+    async for chunk in request.stream():
+        if b"\n" not in chunk:
+            if chunk:
+                pending.append(chunk)
+            continue
+        pending.append(chunk)
+        *lines, tail = b"".join(pending).split(b"\n")
+        pending = [tail] if tail else []
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+    tail = b"".join(pending)
+    if tail.strip():
+        yield line_no + 1, tail
+
+
+def _parse_mail_log_line(line_no: int, line: bytes) -> tuple:
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"line {line_no}: {e}")
+    try:
+        return _mail_log_row(MailLogIn.model_validate(data))
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", line_no) + tuple(err["loc"])} for err in e.errors()])
+
+
+async def _read_mail_log_rows(request: Request, content_type: str) -> List[tuple]:
+    """본문 전체를 읽고 검증해 로그 행 목록으로 (DB 연결 없이, 오류 시 422)"""
+    if content_type in _NDJSON_TYPES:
+        return [_parse_mail_log_line(line_no, line) async for line_no, line in _iter_ndjson(request)]
+
+    try:
+        data = await request.json()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"invalid JSON body: {e}")
+    try:
+        body = MailLogBulkIn.model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body",) + tuple(err["loc"])} for err in e.errors()])
+    return [_mail_log_row(it) for it in body.items]
+
+
+def _write_mail_log_bulk(rows: List[tuple]) -> int:
+    """연결 확보 → MAIL_LOG_BULK_CHUNK 행씩 적재 → 커밋 1회 (DB 실행기 스레드 안에서 한 번에 실행)"""
     conn = get_conn()
     try:
         if not table_exists(conn, "dbo.PayrollMailLog"):
             raise HTTPException(status_code=500, detail="dbo.PayrollMailLog 테이블이 없습니다.")
 
-        for it in body.items:
-            exec_sql(
-                conn,
-                "INSERT INTO dbo.PayrollMailLog (ClientId, EmployeeId, Ym, DocType, ToEmail, CcEmail, Subject, Status, ErrorMessage, PcId) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (it.clientId, it.employeeId, it.ym, it.docType, it.toEmail, it.ccEmail, it.subject, it.status, it.errorMessage, it.pcId),
-            )
-        return {"ok": True, "count": len(body.items)}
+        step = max(1, MAIL_LOG_BULK_CHUNK)
+        count = 0
+        try:
+            for i in range(0, len(rows), step):
+                count += insert_mail_logs(conn, rows[i:i + step])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return count
     finally:
         conn.close()
 
 
+@app.post("/logs/mail/bulk", dependencies=[Depends(require_api_key)])
+async def log_mail_bulk(request: Request):
+    """
+    메일 로그 일괄 저장 (전체가 한 트랜잭션, 오류 시 아무 것도 저장하지 않음)
+    - application/json: {"items": [MailLogIn, ...]}
+    - application/x-ndjson: 한 줄에 MailLogIn 하나 (줄 단위로 읽으며 검증)
+    본문을 다 받고 검증한 뒤에 DB 연결을 잡음 → 느린 업로드가 연결/잠금을 붙잡지 않음
+    DB 작업은 DB 실행기 스레드에서 한 번에 실행 (대기열/라우트 상한 적용)
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    rows = await _read_mail_log_rows(request, content_type)
+
+    async with DB_EXECUTOR.admit("POST /logs/mail/bulk"):
+        count = await DB_EXECUTOR.call(_write_mail_log_bulk, rows)
+    return {"ok": True, "count": count}
+
+
 @app.get("/logs/mail", dependencies=[Depends(require_api_key)])
 def get_mail_logs(clientId: int, ym: str, docType: Optional[str] = None):
     conn = get_conn()
@@ -2268,76 +4631,75 @@ def payroll_today_clients(
 
     conn = get_conn()
     try:
-        has_5workers = column_exists(conn, "dbo.거래처", "Has5OrMoreWorkers")
-
-        select_parts = [
-            "ID AS id", "고객명 AS name", "사업자등록번호 AS bizId",
-            "급여명세서발송일 AS slipSendDay", "급여대장일 AS registerSendDay",
-        ]
-        if has_5workers:
-            select_parts.append("Has5OrMoreWorkers AS has5OrMoreWorkers")
-
-        sql = f"SELECT {', '.join(select_parts)} FROM 거래처 WHERE 원천세='O' AND 사용여부=1"
-        rows = fetch_all(conn, sql)
-
-        out: List[TodayClientOut] = []
-
-        import calendar
-        last_day = calendar.monthrange(today.year, today.month)[1]
+        rows = fetch_all(
+            conn,
+            "SELECT ID AS id, 고객명 AS name, 사업자등록번호 AS bizId, "
+            "급여명세서발송일 AS slipSendDay, 급여대장일 AS registerSendDay "
+            "FROM 거래처 WHERE 원천세='O' AND 사용여부=1",
+        )
 
+        # 이번 달 발송일 → 발송 기한 표로 오늘 발송할 거래처만 추림
+        due_by_day = month_due_dates(today.year, today.month)
+        due_clients = []
         for r in rows:
-            cid = int(r["id"])
-            name = str(r["name"] or "")
-            biz = str(r["bizId"] or "")
-
-            slip_day = safe_int(r.get("slipSendDay"))
-            reg_day = safe_int(r.get("registerSendDay"))
-
-            day = slip_day if docType == "slip" else reg_day
-            if not day:
+            day = safe_int(r.get("slipSendDay") if docType == "slip" else r.get("registerSendDay"))
+            if not day or due_by_day.get(day) != today:
                 continue
+            due_clients.append(r)
 
-            due_raw = date(today.year, today.month, min(day, last_day))
-            due = adjust_to_workday(due_raw)
-
-            if due != today:
-                continue
+        if not due_clients:
+            return []
 
-            total_targets = 0
-            sent_targets = 0
-
-            if table_exists(conn, "dbo.Employees"):
-                target_row = fetch_one(
-                    conn,
-                    "SELECT COUNT(1) AS cnt "
-                    "FROM dbo.Employees "
-                    "WHERE ClientId=? AND UseEmail=1 AND EmailTo IS NOT NULL AND LTRIM(RTRIM(EmailTo))<>''",
-                    (cid,),
-                )
-                total_targets = int((target_row or {}).get("cnt") or 0)
-
-            if table_exists(conn, "dbo.PayrollMailLog"):
-                sent_row = fetch_one(
-                    conn,
-                    "SELECT COUNT(DISTINCT EmployeeId) AS cnt "
-                    "FROM dbo.PayrollMailLog "
-                    "WHERE ClientId=? AND Ym=? AND DocType=? AND Status='sent' AND EmployeeId IS NOT NULL",
-                    (cid, ym, docType),
-                )
-                sent_targets = int((sent_row or {}).get("cnt") or 0)
+        # 대상자/발송완료 인원은 거래처별 GROUP BY 한 번씩 조회 후 메모리에서 결합
+        targets: Dict[int, int] = {}
+        if table_exists(conn, "dbo.Employees"):
+            for t in fetch_all(
+                conn,
+                "SELECT ClientId AS clientId, COUNT(1) AS cnt "
+                "FROM dbo.Employees "
+                "WHERE UseEmail=1 AND EmailTo IS NOT NULL AND LTRIM(RTRIM(EmailTo))<>'' "
+                "GROUP BY ClientId",
+            ):
+                targets[int(t["clientId"])] = int(t["cnt"] or 0)
+
+        sent: Dict[int, int] = {}
+        if table_exists(conn, MAIL_STATUS_TABLE):
+            for t in fetch_all(
+                conn,
+                "SELECT ClientId AS clientId, COUNT(1) AS cnt "
+                "FROM dbo.PayrollMailStatus "
+                "WHERE Ym=? AND DocType=? AND LastSentOkAt IS NOT NULL "
+                "GROUP BY ClientId",
+                (ym, docType),
+            ):
+                sent[int(t["clientId"])] = int(t["cnt"] or 0)
+        elif table_exists(conn, "dbo.PayrollMailLog"):
+            for t in fetch_all(
+                conn,
+                "SELECT ClientId AS clientId, COUNT(DISTINCT EmployeeId) AS cnt "
+                "FROM dbo.PayrollMailLog "
+                "WHERE Ym=? AND DocType=? AND Status='sent' AND EmployeeId IS NOT NULL "
+                "GROUP BY ClientId",
+                (ym, docType),
+            ):
+                sent[int(t["clientId"])] = int(t["cnt"] or 0)
 
-            is_done = (total_targets > 0 and sent_targets >= total_targets)
+        out: List[TodayClientOut] = []
+        for r in due_clients:
+            cid = int(r["id"])
+            total_targets = targets.get(cid, 0)
+            sent_targets = sent.get(cid, 0)
 
             out.append(TodayClientOut(
                 clientId=cid,
-                name=name,
-                bizId=biz,
+                name=str(r["name"] or ""),
+                bizId=str(r["bizId"] or ""),
                 ym=ym,
                 docType=docType,
-                dueDate=str(due),
+                dueDate=str(today),
                 totalTargets=total_targets,
                 sentTargets=sent_targets,
-                isDone=is_done,
+                isDone=(total_targets > 0 and sent_targets >= total_targets),
             ))
 
         out.sort(key=lambda x: (x.isDone, x.name))
@@ -2350,12 +4712,20 @@ def payroll_today_clients(
 # =========================
 # 서버 SMTP 발송
 # =========================
-def send_email_smtp(to_email: str, subject: str, body: str, cc_email: Optional[str] = None):
+def _smtp_settings() -> tuple:
+    """현재 SMTP 설정 (세션 풀 키)"""
+    return (SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, SMTP_SSL, SMTP_STARTTLS)
+
+
+def _smtp_config_error() -> Optional[str]:
     if not SMTP_HOST:
-        raise RuntimeError("SMTP_HOST is not set")
+        return "SMTP_HOST is not set"
     if not MAIL_FROM:
-        raise RuntimeError("MAIL_FROM is not set")
+        return "MAIL_FROM is not set"
+    return None
+
 
+def _build_email(to_email: str, subject: str, body: str, cc_email: Optional[str] = None):
     msg = EmailMessage()
     msg["From"] = MAIL_FROM
     msg["To"] = to_email
@@ -2365,25 +4735,513 @@ def send_email_smtp(to_email: str, subject: str, body: str, cc_email: Optional[s
     msg.set_content(body)
 
     recipients = [to_email] + ([cc_email] if cc_email else [])
+    return msg, recipients
 
-    if SMTP_SSL:
-        with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=10) as s:
-            if SMTP_USER:
-                s.login(SMTP_USER, SMTP_PASS)
-            s.send_message(msg, from_addr=MAIL_FROM, to_addrs=recipients)
-    else:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as s:
-            if SMTP_STARTTLS:
-                s.starttls()
-            if SMTP_USER:
-                s.login(SMTP_USER, SMTP_PASS)
-            s.send_message(msg, from_addr=MAIL_FROM, to_addrs=recipients)
+
+def _smtp_is_permanent(e: Exception) -> bool:
+    """재시도해도 성공할 수 없는 오류 (5xx 응답, 수신자 전원 거부)"""
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        codes = [v[0] for v in (e.recipients or {}).values()]
+        return bool(codes) and all(int(c) >= 500 for c in codes)
+    if isinstance(e, smtplib.SMTPResponseException):
+        return int(e.smtp_code) >= 500
+    return False
+
+
+class SmtpSessionPool:
+    """
+    SMTP 세션 풀
+    - 연결/STARTTLS/로그인까지 끝난 세션을 메시지 간에 재사용
+    - 호스트(설정)별 동시 세션 수 제한 (세마포어)
+    - 오래 쉰 세션은 NOOP으로 확인, 유휴 시간 초과 세션은 종료
+    - 재사용 세션이 끊겨 있으면(서버 타임아웃, 421) 새 세션으로 한 번 더 시도 (새 세션은 재시도 없음)
+    """
+
+    NOOP_AFTER = 10.0  # 이 시간(초) 이상 쉰 세션은 NOOP 확인 후 사용
+
+    def __init__(self, max_per_host: int, idle_timeout: float, timeout: float = 10):
+        self.max_per_host = max(1, max_per_host)
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: Dict[tuple, List[tuple]] = {}  # 설정 -> [(smtp, last_used)]
+        self._slots: Dict[tuple, threading.BoundedSemaphore] = {}
+        self.connects = 0
+        self.reconnects = 0
+        self.sent = 0
+
+    def _slot(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _connect(self, key: tuple):
+        host, port, user, password, use_ssl, starttls = key
+        if use_ssl:
+            smtp = smtplib.SMTP_SSL(host, port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(host, port, timeout=self.timeout)
+            if starttls:
+                smtp.starttls()
+        if user:
+            smtp.login(user, password)
+        self.connects += 1
+        return smtp
+
+    @staticmethod
+    def _quit(smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _checkout(self, key: tuple):
+        """(세션, 재사용 여부)"""
+        while True:
+            with self._lock:
+                bucket = self._idle.get(key)
+                item = bucket.pop() if bucket else None
+            if item is None:
+                return self._connect(key), False
+
+            smtp, last_used = item
+            idle = time.monotonic() - last_used
+            if idle >= self.idle_timeout:
+                self._quit(smtp)
+                continue
+            if idle >= self.NOOP_AFTER:
+                try:
+                    if smtp.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except Exception:
+                    self._quit(smtp)
+                    continue
+            return smtp, True
+
+    def _checkin(self, key: tuple, smtp):
+        with self._lock:
+            self._idle.setdefault(key, []).append((smtp, time.monotonic()))
+
+    def send(self, msg: EmailMessage, from_addr: str, to_addrs: List[str], key: Optional[tuple] = None):
+        key = key or _smtp_settings()
+        slot = self._slot(key)
+        slot.acquire()
+        try:
+            for attempt in (0, 1):
+                smtp, reused = self._checkout(key)
+                try:
+                    smtp.send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                    if isinstance(e, smtplib.SMTPRecipientsRefused):
+                        codes = [code for code, _ in (e.recipients or {}).values()]
+                    else:
+                        codes = [e.smtp_code]
+                    if 421 not in codes:
+                        self._checkin(key, smtp)  # 거부 응답: 세션은 정상 (smtplib이 RSET 처리)
+                        raise
+                    # 421: 서버가 세션을 닫음 (RCPT 단계면 smtplib도 이미 close)
+                    # 새로 연 세션까지 421이면 재시도하지 않음 (거부 중인 서버에 로그인만 늘어남)
+                    self._quit(smtp)
+                    if reused and attempt == 0:
+                        self.reconnects += 1
+                        continue
+                    raise
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    # 응답 코드가 있는 SMTP 오류는 위에서 처리했고 (OSError 하위 클래스), 여기는 연결 끊김/소켓 오류
+                    self._quit(smtp)
+                    if reused and attempt == 0:
+                        self.reconnects += 1
+                        continue
+                    raise
+                except Exception:
+                    self._quit(smtp)
+                    raise
+                self._checkin(key, smtp)
+                self.sent += 1
+                return
+        finally:
+            slot.release()
+
+    def close_idle(self):
+        """유휴 시간 초과 세션 종료"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for key, bucket in self._idle.items():
+                keep = [(s, t) for s, t in bucket if now - t < self.idle_timeout]
+                expired.extend(s for s, t in bucket if now - t >= self.idle_timeout)
+                bucket[:] = keep
+        for smtp in expired:
+            self._quit(smtp)
+
+    def close_all(self):
+        with self._lock:
+            sessions = [s for bucket in self._idle.values() for s, _ in bucket]
+            self._idle.clear()
+        for smtp in sessions:
+            self._quit(smtp)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = sum(len(b) for b in self._idle.values())
+        return {
+            "maxPerHost": self.max_per_host,
+            "idle": idle,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "sent": self.sent,
+        }
+
+
+SMTP_POOL = SmtpSessionPool(SMTP_MAX_PER_HOST, SMTP_IDLE_TIMEOUT)
+
+
+def send_email_smtp(to_email: str, subject: str, body: str, cc_email: Optional[str] = None):
+    err = _smtp_config_error()
+    if err:
+        raise RuntimeError(err)
+
+    msg, recipients = _build_email(to_email, subject, body, cc_email)
+    SMTP_POOL.send(msg, MAIL_FROM, recipients)
+
+
+def _log_mail_result(item: Dict[str, Any], status: str, error: Optional[str]):
+    """발송 결과를 PayrollMailLog(+요약)에 기록"""
+    conn = get_conn()
+    try:
+        if table_exists(conn, "dbo.PayrollMailLog"):
+            write_mail_logs(conn, [(
+                item["clientId"], item.get("employeeId"), item["ym"], item["docType"], item["toEmail"],
+                item.get("ccEmail"), item["subject"], status, error, item.get("pcId"),
+            )])
+    finally:
+        conn.close()
+
+
+class MailOutbox:
+    """
+    메일 발송 대기열 (SQLite, 재시작 후에도 유지)
+    - enqueue()는 저장만 하고 바로 반환, 백그라운드 워커가 SmtpSessionPool로 발송
+    - 일시 오류는 지수 백오프로 재시도, 5xx/수신자 거부/최대 시도 초과는 failed
+    - 최종 결과는 on_result(item, status, error)로 기록 (기본: PayrollMailLog),
+      기록 실패 시 logged=0으로 남겨 두고 워커가 다시 시도
+    """
+
+    def __init__(self, db_path: str, smtp: SmtpSessionPool, workers: int = 4, max_attempts: int = 5,
+                 backoff: float = 30, backoff_max: float = 1800, on_result=_log_mail_result):
+        self.db_path = db_path
+        self.smtp = smtp
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.on_result = on_result
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._db_ready = False
+        self._conn = None
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+
+    # ---- SQLite ----
+    @contextmanager
+    def _db(self):
+        """연결 하나를 잠금 아래에서 공유 (워커/요청 스레드 모두)"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._open()
+            yield self._conn
+
+    def _open(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 프로세스 비정상 종료에도 커밋 유지
+        if not self._db_ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " client_id INTEGER NOT NULL, employee_id INTEGER, ym TEXT NOT NULL, doc_type TEXT NOT NULL,"
+                " to_email TEXT NOT NULL, cc_email TEXT, subject TEXT NOT NULL, body_text TEXT NOT NULL, pc_id TEXT,"
+                " status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL, last_error TEXT, logged INTEGER NOT NULL DEFAULT 1,"
+                " created_at TEXT NOT NULL, updated_at TEXT NOT NULL, sent_at TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_outbox_due ON outbox (status, next_attempt_at)")
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    @staticmethod
+    def _item(row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "clientId": row["client_id"],
+            "employeeId": row["employee_id"],
+            "ym": row["ym"],
+            "docType": row["doc_type"],
+            "toEmail": row["to_email"],
+            "ccEmail": row["cc_email"],
+            "subject": row["subject"],
+            "bodyText": row["body_text"],
+            "pcId": row["pc_id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "nextAttemptAt": row["next_attempt_at"],
+            "lastError": row["last_error"],
+            "logged": bool(row["logged"]),
+            "createdAt": row["created_at"],
+            "updatedAt": row["updated_at"],
+            "sentAt": row["sent_at"],
+        }
+
+    def _update(self, outbox_id: int, **fields):
+        fields["updated_at"] = now_utc()
+        sets = ", ".join(f"{k}=?" for k in fields)
+        with self._db() as conn:
+            conn.execute(f"UPDATE outbox SET {sets} WHERE id=?", tuple(fields.values()) + (outbox_id,))
+            conn.commit()
+
+    # ---- 대기열 ----
+    def enqueue(self, body: "MailSendIn") -> int:
+        now = now_utc()
+        with self._db() as conn:
+            cur = conn.execute(
+                "INSERT INTO outbox (client_id, employee_id, ym, doc_type, to_email, cc_email, subject, body_text, pc_id,"
+                " next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (body.clientId, body.employeeId, body.ym, body.docType, body.toEmail, body.ccEmail,
+                 body.subject, body.bodyText, body.pcId, time.time(), now, now),
+            )
+            conn.commit()
+            outbox_id = int(cur.lastrowid)
+        with self._cond:
+            self._cond.notify()
+        return outbox_id
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """발송 시각이 된 항목 하나를 sending으로 바꾸고 반환"""
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT * FROM outbox WHERE status='queued' AND next_attempt_at<=? ORDER BY next_attempt_at, id LIMIT 1",
+                (time.time(),),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE outbox SET status='sending', attempts=attempts+1, updated_at=? WHERE id=?",
+                (now_utc(), row["id"]),
+            )
+            conn.commit()
+        item = self._item(row)
+        item["status"] = "sending"
+        item["attempts"] += 1
+        return item
+
+    def _next_due_in(self) -> float:
+        with self._db() as conn:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status='queued'").fetchone()
+        if not row or row[0] is None:
+            return 5.0
+        return min(5.0, max(0.05, float(row[0]) - time.time()))
+
+    def _record(self, item: Dict[str, Any], status: str, error: Optional[str]) -> bool:
+        """결과 기록 (성공 여부 반환)"""
+        if self.on_result is None:
+            return True
+        try:
+            self.on_result(item, status, error)
+            return True
+        except Exception as e:
+            log_mail.warning("mail outbox log failed (id=%s): %s", item["id"], e)
+            return False
+
+    def _flush_unlogged(self):
+        """결과 기록에 실패했던 항목 다시 기록"""
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT * FROM outbox WHERE logged=0 AND status IN ('sent', 'failed') ORDER BY id LIMIT 100"
+            ).fetchall()
+        for row in rows:
+            item = self._item(row)
+            if self._record(item, item["status"], item["lastError"]):
+                self._update(item["id"], logged=1)
+
+    def _deliver(self, item: Dict[str, Any]):
+        try:
+            err = _smtp_config_error()
+            if err:
+                raise RuntimeError(err)
+            msg, recipients = _build_email(item["toEmail"], item["subject"], item["bodyText"], item["ccEmail"])
+            self.smtp.send(msg, MAIL_FROM, recipients)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if _smtp_is_permanent(e) or item["attempts"] >= self.max_attempts:
+                self.failed += 1
+                logged = self._record(item, "failed", error)
+                self._update(item["id"], status="failed", last_error=error, logged=int(logged))
+            else:
+                import random
+                delay = min(self.backoff_max, self.backoff * (2 ** (item["attempts"] - 1)))
+                delay *= random.uniform(0.8, 1.2)
+                self.retried += 1
+                self._update(item["id"], status="queued", last_error=error, next_attempt_at=time.time() + delay)
+            return
+
+        self.delivered += 1
+        logged = self._record(item, "sent", None)
+        self._update(item["id"], status="sent", last_error=None, sent_at=now_utc(), logged=int(logged))
+
+    def _run(self, index: int):
+        while not self._stop.is_set():
+            try:
+                item = self._claim()
+                if item is not None:
+                    self._deliver(item)
+                    continue
+                if index == 0:
+                    self._flush_unlogged()
+                    self.smtp.close_idle()
+                wait = self._next_due_in()
+            except Exception as e:
+                log_mail.exception("mail outbox worker error: %s", e)
+                wait = 5.0
+            with self._cond:
+                if not self._stop.is_set():
+                    self._cond.wait(timeout=wait)
+
+    # ---- 수명 ----
+    def start(self):
+        if self._threads:
+            return
+        with self._db() as conn:
+            # 발송 중 종료된 항목은 다시 대기열로
+            conn.execute("UPDATE outbox SET status='queued', updated_at=? WHERE status='sending'", (now_utc(),))
+            conn.commit()
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, args=(i,), name=f"mail-outbox-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+        self.smtp.close_all()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    # ---- 조회 ----
+    def get(self, outbox_id: int) -> Optional[Dict[str, Any]]:
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM outbox WHERE id=?", (outbox_id,)).fetchone()
+        return self._item(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM outbox"
+        params: tuple = ()
+        if status:
+            sql += " WHERE status=?"
+            params = (status,)
+        sql += " ORDER BY id DESC LIMIT ?"
+        with self._db() as conn:
+            rows = conn.execute(sql, params + (limit,)).fetchall()
+        items = []
+        for r in rows:
+            item = self._item(r)
+            item.pop("bodyText", None)
+            items.append(item)
+        return items
+
+    def retry(self, outbox_id: int) -> bool:
+        """failed 항목을 다시 대기열로 (시도 횟수 초기화)"""
+        with self._db() as conn:
+            cur = conn.execute(
+                "UPDATE outbox SET status='queued', attempts=0, next_attempt_at=?, updated_at=? "
+                "WHERE id=? AND status='failed'",
+                (time.time(), now_utc(), outbox_id),
+            )
+            conn.commit()
+            ok = cur.rowcount > 0
+        if ok:
+            self.wake()
+        return ok
+
+    def stats(self) -> Dict[str, Any]:
+        with self._db() as conn:
+            counts = {r[0]: r[1] for r in conn.execute("SELECT status, COUNT(1) FROM outbox GROUP BY status")}
+            unlogged = conn.execute("SELECT COUNT(1) FROM outbox WHERE logged=0").fetchone()[0]
+        return {
+            "enabled": MAIL_OUTBOX_ENABLED,
+            "dbPath": self.db_path,
+            "workers": len(self._threads),
+            "counts": counts,
+            "unlogged": unlogged,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retried": self.retried,
+            "smtp": self.smtp.stats(),
+        }
+
+
+MAIL_OUTBOX = MailOutbox(
+    MAIL_OUTBOX_PATH,
+    SMTP_POOL,
+    workers=MAIL_OUTBOX_WORKERS,
+    max_attempts=MAIL_OUTBOX_MAX_ATTEMPTS,
+    backoff=MAIL_OUTBOX_BACKOFF,
+    backoff_max=MAIL_OUTBOX_BACKOFF_MAX,
+)
 
 
 @app.post("/mail/send", dependencies=[Depends(require_api_key)])
 def mail_send(body: MailSendIn):
+    """
+    메일 발송
+    - MAIL_OUTBOX=1(기본): 대기열에 저장 후 바로 반환 (queued 로그 기록), 결과는 sent/failed 로그로 추가
+    - MAIL_OUTBOX=0: 요청 안에서 바로 발송 (SMTP 세션은 재사용)
+    """
     conn = get_conn()
     try:
+        has_log = table_exists(conn, "dbo.PayrollMailLog")
+        config_err = _smtp_config_error()
+
+        if MAIL_OUTBOX_ENABLED and not config_err:
+            # queued 로그를 먼저 커밋한 뒤 대기열에 넣음
+            # (워커의 sent/failed 로그가 queued보다 늦게 기록되어 요약이 queued로 남지 않도록,
+            #  로그 저장 실패 시에는 발송 자체를 하지 않도록)
+            if has_log:
+                write_mail_logs(conn, [
+                    (body.clientId, body.employeeId, body.ym, body.docType, body.toEmail, body.ccEmail, body.subject, "queued", None, body.pcId),
+                ])
+            try:
+                outbox_id = MAIL_OUTBOX.enqueue(body)
+            except Exception as e:
+                if has_log:
+                    write_mail_logs(conn, [
+                        (body.clientId, body.employeeId, body.ym, body.docType, body.toEmail, body.ccEmail, body.subject, "failed", f"outbox enqueue failed: {e}", body.pcId),
+                    ])
+                raise HTTPException(status_code=500, detail=f"Mail outbox enqueue failed: {e}")
+            return {"ok": True, "queued": True, "outboxId": outbox_id}
+
         try:
             send_email_smtp(body.toEmail, body.subject, body.bodyText, body.ccEmail)
             status = "sent"
@@ -2392,13 +5250,10 @@ def mail_send(body: MailSendIn):
             status = "failed"
             err = str(e)
 
-        if table_exists(conn, "dbo.PayrollMailLog"):
-            exec_sql(
-                conn,
-                "INSERT INTO dbo.PayrollMailLog (ClientId, EmployeeId, Ym, DocType, ToEmail, CcEmail, Subject, Status, ErrorMessage, PcId) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        if has_log:
+            write_mail_logs(conn, [
                 (body.clientId, body.employeeId, body.ym, body.docType, body.toEmail, body.ccEmail, body.subject, status, err, body.pcId),
-            )
+            ])
 
         if status == "failed":
             raise HTTPException(status_code=500, detail=f"SMTP send failed: {err}")
@@ -2408,56 +5263,97 @@ def mail_send(body: MailSendIn):
         conn.close()
 
 
+@app.get("/mail/outbox", dependencies=[Depends(require_api_key)])
+def mail_outbox_list(
+    status: Optional[Literal["queued", "sending", "sent", "failed"]] = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """발송 대기열 상태 + 최근 항목 (본문 제외)"""
+    return {"stats": MAIL_OUTBOX.stats(), "items": MAIL_OUTBOX.list(status, limit)}
+
+
+@app.get("/mail/outbox/{outbox_id}", dependencies=[Depends(require_api_key)])
+def mail_outbox_get(outbox_id: int):
+    item = MAIL_OUTBOX.get(outbox_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="outbox item not found")
+    return item
+
+
+@app.post("/mail/outbox/{outbox_id}/retry", dependencies=[Depends(require_api_key)])
+def mail_outbox_retry(outbox_id: int):
+    """failed 항목 다시 발송"""
+    if not MAIL_OUTBOX.retry(outbox_id):
+        raise HTTPException(status_code=409, detail="only failed items can be retried")
+    return {"ok": True, "id": outbox_id}
+
+
 # =========================
 # ✅ 거래처별 수당/공제 항목 관리 (신규)
 # =========================
-@app.get("/clients/{client_id}/allowance-masters", response_model=List[AllowanceMasterOut], dependencies=[Depends(require_api_key)])
-def get_allowance_masters(client_id: int):
-    """거래처별 수당 항목 조회"""
-    conn = get_conn()
-    try:
-        if not table_exists(conn, "dbo.AllowanceMasters"):
-            return []
-
-        # 동적 컬럼 체크
-        has_tax_free = column_exists(conn, "dbo.AllowanceMasters", "IsTaxFree")
-        has_default_amount = column_exists(conn, "dbo.AllowanceMasters", "DefaultAmount")
+def _allowance_master_select(conn: pyodbc.Connection) -> List[str]:
+    """수당 항목 SELECT 컬럼 (선택 컬럼은 존재할 때만)"""
+    select_parts = [
+        "AllowanceId AS allowanceId",
+        "ClientId AS clientId",
+        "AllowanceName AS allowanceName",
+        "IsActive AS isActive",
+    ]
+
+    if column_exists(conn, "dbo.AllowanceMasters", "IsTaxFree"):
+        select_parts.append("IsTaxFree AS isTaxFree")
+    if column_exists(conn, "dbo.AllowanceMasters", "DefaultAmount"):
+        select_parts.append("DefaultAmount AS defaultAmount")
+
+    select_parts.append("CONVERT(NVARCHAR(19), CreatedAt, 126) AS createdAt")
+    return select_parts
+
+
+def _load_allowance_masters(conn: pyodbc.Connection, client_id: int) -> List[Dict[str, Any]]:
+    """거래처별 수당 항목 (테이블 없으면 빈 목록)"""
+    if not table_exists(conn, "dbo.AllowanceMasters"):
+        return []
+
+    # 동적 컬럼 체크
+    has_tax_free = column_exists(conn, "dbo.AllowanceMasters", "IsTaxFree")
+    has_default_amount = column_exists(conn, "dbo.AllowanceMasters", "DefaultAmount")
+
+    select_parts = _allowance_master_select(conn)
+
+    sql = f"""
+        SELECT {', '.join(select_parts)}
+        FROM dbo.AllowanceMasters WHERE ClientId=? ORDER BY AllowanceId
+    """
 
-        select_parts = [
-            "AllowanceId AS allowanceId",
-            "ClientId AS clientId",
-            "AllowanceName AS allowanceName",
-            "IsActive AS isActive",
-        ]
+    rows = fetch_all(conn, sql, (client_id,))
 
-        if has_tax_free:
-            select_parts.append("IsTaxFree AS isTaxFree")
-        if has_default_amount:
-            select_parts.append("DefaultAmount AS defaultAmount")
+    for r in rows:
+        r["isActive"] = bool(r.get("isActive"))
 
-        select_parts.append("CONVERT(NVARCHAR(19), CreatedAt, 126) AS createdAt")
+        if not has_tax_free:
+            r["isTaxFree"] = False
+        else:
+            r["isTaxFree"] = bool(r.get("isTaxFree"))
 
-        sql = f"""
-            SELECT {', '.join(select_parts)}
-            FROM dbo.AllowanceMasters WHERE ClientId=? ORDER BY AllowanceId
-        """
+        if not has_default_amount:
+            r["defaultAmount"] = 0
+        else:
+            r["defaultAmount"] = int(r.get("defaultAmount") or 0)
 
-        rows = fetch_all(conn, sql, (client_id,))
+    return rows
 
-        for r in rows:
-            r["isActive"] = bool(r.get("isActive"))
-            
-            if not has_tax_free:
-                r["isTaxFree"] = False
-            else:
-                r["isTaxFree"] = bool(r.get("isTaxFree"))
-            
-            if not has_default_amount:
-                r["defaultAmount"] = 0
-            else:
-                r["defaultAmount"] = int(r.get("defaultAmount") or 0)
 
-        return rows
+@app.get("/clients/{client_id}/allowance-masters", response_model=List[AllowanceMasterOut], dependencies=[Depends(require_api_key)])
+def get_allowance_masters(client_id: int, request: Request, response: Response):
+    """거래처별 수당 항목 조회"""
+    conn = get_conn()
+    try:
+        version = resource_version(conn, f"allowance-masters:{client_id}", "dbo.AllowanceMasters", "ClientId=?",
+                                   (client_id,), updated_col=None, content=_allowance_master_select(conn))
+        not_modified = conditional_get(request, response, version)
+        if not_modified is not None:
+            return not_modified
+        return _load_allowance_masters(conn, client_id)
     finally:
         conn.close()
 
@@ -2512,45 +5408,61 @@ def delete_allowance_master(allowance_id: int):
         conn.close()
 
 
-@app.get("/clients/{client_id}/deduction-masters", response_model=List[DeductionMasterOut], dependencies=[Depends(require_api_key)])
-def get_deduction_masters(client_id: int):
-    """거래처별 공제 항목 조회"""
-    conn = get_conn()
-    try:
-        if not table_exists(conn, "dbo.DeductionMasters"):
-            return []
+def _deduction_master_select(conn: pyodbc.Connection) -> List[str]:
+    """공제 항목 SELECT 컬럼 (선택 컬럼은 존재할 때만)"""
+    select_parts = [
+        "DeductionId AS deductionId",
+        "ClientId AS clientId",
+        "DeductionName AS deductionName",
+        "IsActive AS isActive",
+    ]
 
-        # 동적 컬럼 체크
-        has_default_amount = column_exists(conn, "dbo.DeductionMasters", "DefaultAmount")
+    if column_exists(conn, "dbo.DeductionMasters", "DefaultAmount"):
+        select_parts.append("DefaultAmount AS defaultAmount")
 
-        select_parts = [
-            "DeductionId AS deductionId",
-            "ClientId AS clientId",
-            "DeductionName AS deductionName",
-            "IsActive AS isActive",
-        ]
+    select_parts.append("CONVERT(NVARCHAR(19), CreatedAt, 126) AS createdAt")
+    return select_parts
 
-        if has_default_amount:
-            select_parts.append("DefaultAmount AS defaultAmount")
 
-        select_parts.append("CONVERT(NVARCHAR(19), CreatedAt, 126) AS createdAt")
+def _load_deduction_masters(conn: pyodbc.Connection, client_id: int) -> List[Dict[str, Any]]:
+    """거래처별 공제 항목 (테이블 없으면 빈 목록)"""
+    if not table_exists(conn, "dbo.DeductionMasters"):
+        return []
 
-        sql = f"""
-            SELECT {', '.join(select_parts)}
-            FROM dbo.DeductionMasters WHERE ClientId=? ORDER BY DeductionId
-        """
+    # 동적 컬럼 체크
+    has_default_amount = column_exists(conn, "dbo.DeductionMasters", "DefaultAmount")
 
-        rows = fetch_all(conn, sql, (client_id,))
+    select_parts = _deduction_master_select(conn)
 
-        for r in rows:
-            r["isActive"] = bool(r.get("isActive"))
-            
-            if not has_default_amount:
-                r["defaultAmount"] = 0
-            else:
-                r["defaultAmount"] = int(r.get("defaultAmount") or 0)
+    sql = f"""
+        SELECT {', '.join(select_parts)}
+        FROM dbo.DeductionMasters WHERE ClientId=? ORDER BY DeductionId
+    """
 
-        return rows
+    rows = fetch_all(conn, sql, (client_id,))
+
+    for r in rows:
+        r["isActive"] = bool(r.get("isActive"))
+
+        if not has_default_amount:
+            r["defaultAmount"] = 0
+        else:
+            r["defaultAmount"] = int(r.get("defaultAmount") or 0)
+
+    return rows
+
+
+@app.get("/clients/{client_id}/deduction-masters", response_model=List[DeductionMasterOut], dependencies=[Depends(require_api_key)])
+def get_deduction_masters(client_id: int, request: Request, response: Response):
+    """거래처별 공제 항목 조회"""
+    conn = get_conn()
+    try:
+        version = resource_version(conn, f"deduction-masters:{client_id}", "dbo.DeductionMasters", "ClientId=?",
+                                   (client_id,), updated_col=None, content=_deduction_master_select(conn))
+        not_modified = conditional_get(request, response, version)
+        if not_modified is not None:
+            return not_modified
+        return _load_deduction_masters(conn, client_id)
     finally:
         conn.close()
 
@@ -2616,9 +5528,8 @@ def save_payroll_result(body: PayrollResultSaveIn):
     """
     conn = get_conn()
     try:
-        print(f"[API] 급여 결과 저장: EmployeeId={body.employeeId}, Year={body.year}, Month={body.month}")
-        print(f"[API] 계산 방식: {body.calculatedBy}")
-        print(f"[API] 국민연금: {body.nationalPension}, 건강보험: {body.healthInsurance}")
+        log.debug("급여 결과 저장: EmployeeId=%s, Year=%s, Month=%s, calculatedBy=%s",
+                  body.employeeId, body.year, body.month, body.calculatedBy)
         
         # 급여 결과를 JSON으로 변환
         result_json = json.dumps({
@@ -2645,14 +5556,15 @@ def save_payroll_result(body: PayrollResultSaveIn):
         
         # MonthlyData 테이블 확인 및 컬럼 추가
         if not table_exists(conn, "dbo.MonthlyData"):
-            print("[API ERROR] MonthlyData 테이블이 없습니다")
+            log.error("MonthlyData 테이블이 없습니다")
             raise HTTPException(status_code=500, detail="MonthlyData 테이블이 없습니다")
         
         # PayrollResultOverride 컬럼 확인 및 추가
         if not column_exists(conn, "dbo.MonthlyData", "PayrollResultOverride"):
-            print("[API] PayrollResultOverride 컬럼 추가 중...")
+            log.warning("PayrollResultOverride 컬럼 추가 중...")
             exec_sql(conn, "ALTER TABLE dbo.MonthlyData ADD PayrollResultOverride NVARCHAR(MAX) NULL")
-            print("[API] ✅ PayrollResultOverride 컬럼 추가 완료")
+            SCHEMA.invalidate("MonthlyData.PayrollResultOverride added")
+            log.warning("PayrollResultOverride 컬럼 추가 완료")
         
         # 기존 MonthlyData 레코드 확인
         existing = fetch_one(
@@ -2663,7 +5575,7 @@ def save_payroll_result(body: PayrollResultSaveIn):
         
         if existing:
             # UPDATE
-            print(f"[API] MonthlyData 업데이트: EmployeeId={body.employeeId}, Ym={ym}")
+            log.debug("MonthlyData 업데이트: EmployeeId=%s, Ym=%s", body.employeeId, ym)
             exec_sql(
                 conn,
                 "UPDATE dbo.MonthlyData SET PayrollResultOverride=? WHERE EmployeeId=? AND Ym=?",
@@ -2671,19 +5583,18 @@ def save_payroll_result(body: PayrollResultSaveIn):
             )
         else:
             # INSERT (기본 MonthlyData 없으면 생성)
-            print(f"[API] MonthlyData 생성: EmployeeId={body.employeeId}, Ym={ym}")
+            log.debug("MonthlyData 생성: EmployeeId=%s, Ym=%s", body.employeeId, ym)
             exec_sql(
                 conn,
                 "INSERT INTO dbo.MonthlyData (EmployeeId, Ym, PayrollResultOverride) VALUES (?, ?, ?)",
                 (body.employeeId, ym, result_json)
             )
         
-        print(f"[API] ✅ 급여 결과 저장 완료")
         return {"ok": True, "message": "급여 결과 저장 완료"}
     except Exception as e:
-        print(f"[API ERROR] 급여 결과 저장 실패: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("급여 결과 저장 실패: %s", e, extra={"ctx": {
+            "employeeId": body.employeeId, "year": body.year, "month": body.month,
+        }})
         raise HTTPException(status_code=500, detail=f"급여 결과 저장 실패: {str(e)}")
     finally:
         conn.close()
@@ -2700,7 +5611,7 @@ def get_payroll_result(employeeId: int, year: int, month: int):
     try:
         ym = f"{year:04d}{month:02d}"
         
-        print(f"[API] 급여 결과 조회: EmployeeId={employeeId}, Ym={ym}")
+        log.debug("급여 결과 조회: EmployeeId=%s, Ym=%s", employeeId, ym)
         
         # MonthlyData 테이블 확인
         if not table_exists(conn, "dbo.MonthlyData"):
@@ -2719,16 +5630,12 @@ def get_payroll_result(employeeId: int, year: int, month: int):
         
         if row and row[0]:
             result_json = row[0]
-            print(f"[API] ✅ 저장된 급여 결과 있음")
             return {"result": json.loads(result_json)}
         else:
-            print(f"[API] 저장된 급여 결과 없음 - Flutter에서 계산 필요")
             return {"result": None}
             
     except Exception as e:
-        print(f"[API ERROR] 급여 결과 조회 실패: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("급여 결과 조회 실패: %s", e, extra={"ctx": {"employeeId": employeeId, "year": year, "month": month}})
         return {"result": None}
     finally:
         conn.close()
@@ -2738,7 +5645,26 @@ def get_payroll_result(employeeId: int, year: int, month: int):
 # 서버 시작
 # =========================
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Durantax Payroll API")
+    parser.add_argument("--rebuild-mail-status", action="store_true",
+                        help="PayrollMailLog로 dbo.PayrollMailStatus를 다시 채우고 종료")
+    parser.add_argument("--client-id", type=int, default=None, help="--rebuild-mail-status 범위: 거래처 ID")
+    parser.add_argument("--ym", default=None, help="--rebuild-mail-status 범위: YYYY-MM")
+    args = parser.parse_args()
+
+    if args.rebuild_mail_status:
+        conn = get_conn()
+        try:
+            count = rebuild_mail_status(conn, args.client_id, args.ym)
+            log_boot.info("mail status rebuilt %s rows (clientId=%s, ym=%s)", count, args.client_id, args.ym)
+        finally:
+            conn.close()
+            DB_POOL.close_all()
+        sys.exit(0)
+
     import uvicorn
-    print(f"[BOOT] Starting Durantax Payroll API v3.0.0 on {DB_SERVER}:{DB_PORT}")
-    print(f"[BOOT] Listening on http://0.0.0.0:8000")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    log_boot.info("Starting Durantax Payroll API v3.0.0 on %s:%s", DB_SERVER, DB_PORT)
+    log_boot.info("Listening on http://0.0.0.0:8000")
+    uvicorn.run(app, host="0.0.0.0", port=8000, access_log=False)  # 접근 로그는 RequestContextMiddleware가 기록
@@ -5,6 +5,7 @@ Flutter 앱의 모든 기능을 Streamlit으로 구현
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+import io
 import os
 import subprocess
 import platform
@@ -19,10 +20,17 @@ st.set_page_config(
 )
 
 # 모듈 임포트
-from database import get_db_connection, fetch_all, fetch_one, execute_query
+from database import (
+    check_db_connection, fetch_one, execute_query, query_all,
+    get_query_cache, DbConnectionError
+)
 from payroll_calculator import PayrollCalculator
-from pdf_generator import generate_payslip_pdf, generate_batch_pdfs
+from pdf_generator import (
+    generate_payslip_pdf, generate_batch_pdfs, iter_payslip_pdfs,
+    write_payslips_zip, write_payslips_merged_pdf
+)
 from email_service import EmailService
+from payslip_cache import get_payslip_cache
 
 # CSS 스타일 (Flutter UI 스타일)
 st.markdown("""
@@ -214,7 +222,8 @@ if 'smtp_settings' not in st.session_state:
         'user': '',
         'password': '',
         'use_tls': True,
-        'use_ssl': False
+        'use_ssl': False,
+        'parallel': 4
     }
 if 'email_templates' not in st.session_state:
     st.session_state.email_templates = {
@@ -237,8 +246,19 @@ def format_money(amount):
     return f"{int(amount):,}"
 
 
+def invalidate_workers(client_id=None, ym=None):
+    """저장 후 직원 목록 캐시 무효화 (해당 거래처/연월만, client_id가 없으면 전체)"""
+    cache = get_query_cache()
+    if client_id is None:
+        cache.invalidate('workers')
+    elif ym is None:
+        cache.invalidate('workers', client_id)
+    else:
+        cache.invalidate('workers', client_id, ym)
+
+
 def load_clients():
-    """거래처 목록 로드"""
+    """거래처 목록 로드 (조회 결과는 DB_CACHE_TTL 동안 캐시)"""
     try:
         sql = """
             SELECT 
@@ -250,7 +270,8 @@ def load_clients():
             WHERE 사용여부 IN ('O', 1)
             ORDER BY 고객명
         """
-        clients = fetch_all(sql)
+        # 캐시된 목록은 세션 간 공유되므로 복사해서 사용
+        clients = [dict(c) for c in get_query_cache().get_or_load(('clients',), lambda: query_all(sql))]
         
         if not clients:
             st.warning("⚠️ 등록된 거래처가 없습니다.")
@@ -275,8 +296,20 @@ def load_clients():
 
 
 def load_workers(client_id, year, month):
-    """직원 목록 로드 (실제 DB 스키마 완전 반영)"""
+    """직원 목록 로드 (거래처/연월별 캐시, 직원/월별 데이터 저장 시 해당 키만 무효화)"""
     ym = f"{year:04d}-{month:02d}"
+    try:
+        workers = get_query_cache().get_or_load(('workers', client_id, ym), lambda: _query_workers(client_id, ym))
+    except DbConnectionError as e:
+        st.error(f"❌ DB 연결 실패: {e}")
+        return []
+    
+    # 화면에서 값을 바꿔도 캐시에는 영향이 없도록 복사
+    return [dict(w) for w in workers]
+
+
+def _query_workers(client_id, ym):
+    """직원 목록 조회 (실제 DB 스키마 완전 반영)"""
     sql = """
         SELECT 
             e.EmployeeId as Id,
@@ -318,7 +351,7 @@ def load_workers(client_id, year, month):
         WHERE e.ClientId = ?
         ORDER BY e.Name
     """
-    workers = fetch_all(sql, (ym, client_id))
+    workers = query_all(sql, (ym, client_id))
     
     # None 값을 0으로 변환 및 기본값 설정
     for worker in workers:
@@ -414,9 +447,8 @@ def main():
     # 타이틀
     st.markdown('<div class="main-header">💰 급여관리 프로그램</div>', unsafe_allow_html=True)
     
-    # DB 연결 확인
-    conn = get_db_connection()
-    if not conn:
+    # DB 연결 확인 (연결 풀 사용, 확인용 연결을 남기지 않음)
+    if not check_db_connection():
         st.error("❌ 데이터베이스에 연결할 수 없습니다. 서버 설정을 확인하세요.")
         st.info("💡 설정 탭에서 '데이터베이스 연결 진단' 기능을 사용하세요.")
         return
@@ -470,8 +502,9 @@ def main():
         
         st.divider()
         
-        # 새로고침 버튼
+        # 새로고침 버튼 (다른 PC/프로그램에서 바꾼 내용도 다시 조회)
         if st.button("🔄 새로고침", use_container_width=True):
+            get_query_cache().invalidate()
             st.rerun()
     
     # 메인 영역
@@ -682,7 +715,7 @@ def show_monthly_data_input(workers, selected_client):
     if st.button("💾 전체 저장", type="primary", use_container_width=True):
         saved_count = 0
         for worker in workers:
-            if save_monthly_data_from_session(worker['Id'], ym):
+            if save_monthly_data_from_session(worker['Id'], ym, selected_client['Id']):
                 saved_count += 1
         st.success(f"✅ {saved_count}명의 데이터가 저장되었습니다!")
         st.rerun()
@@ -864,15 +897,15 @@ def show_monthly_data_input(workers, selected_client):
             
             # 개별 저장 버튼
             if st.button(f"💾 {worker['Name']} 저장", key=f"save_{worker['Id']}", use_container_width=True):
-                if save_monthly_data_from_session(worker['Id'], ym):
+                if save_monthly_data_from_session(worker['Id'], ym, selected_client['Id']):
                     st.success(f"✅ {worker['Name']}님의 데이터가 저장되었습니다!")
                     st.rerun()
                 else:
                     st.error("❌ 저장 실패")
 
 
-def save_monthly_data_from_session(employee_id, ym):
-    """세션 상태에서 월별 데이터 저장 (실제 DB 스키마)"""
+def save_monthly_data_from_session(employee_id, ym, client_id=None):
+    """세션 상태에서 월별 데이터 저장 (실제 DB 스키마, 저장 후 해당 거래처/연월 캐시 무효화)"""
     try:
         key_prefix = f"monthly_{employee_id}_"
         
@@ -926,6 +959,7 @@ def save_monthly_data_from_session(employee_id, ym):
                 extra_allowance, extra_deduction, memo
             ))
         
+        invalidate_workers(client_id, ym)
         return True
     except Exception as e:
         st.error(f"데이터베이스 오류: {e}")
@@ -1010,7 +1044,7 @@ def show_employee_edit_form(selected_client, worker):
         st.subheader(f"✏️ {worker['Name']} 님")
     with col2:
         if st.button("🗑️ 삭제", type="secondary", use_container_width=True):
-            if delete_employee(worker['Id']):
+            if delete_employee(worker['Id'], selected_client['Id']):
                 st.success(f"✅ {worker['Name']}님이 삭제되었습니다.")
                 st.session_state.selected_employee_id = None
                 st.rerun()
@@ -1478,6 +1512,7 @@ def add_employee(client_id, name, birth_date, employment_type, salary_type,
             tax_free_meal, tax_free_car, other_tax_free,
             use_email, email_to, email_cc
         ))
+        invalidate_workers(client_id)
         return True
     except Exception as e:
         st.error(f"데이터베이스 오류: {e}")
@@ -1511,17 +1546,19 @@ def update_employee(employee_id, client_id, name, birth_date, employment_type, s
             use_email, email_to, email_cc,
             employee_id
         ))
+        invalidate_workers(client_id)
         return True
     except Exception as e:
         st.error(f"데이터베이스 오류: {e}")
         return False
 
 
-def delete_employee(employee_id):
+def delete_employee(employee_id, client_id=None):
     """직원 삭제 (실제 DB 스키마)"""
     try:
         sql = "DELETE FROM dbo.Employees WHERE EmployeeId = ?"
         execute_query(sql, (employee_id,))
+        invalidate_workers(client_id)
         return True
     except Exception as e:
         st.error(f"데이터베이스 오류: {e}")
@@ -1566,6 +1603,7 @@ def show_document_generation(workers, selected_client):
                 status_text.text(f"생성 중... ({current}/{total})")
             
             try:
+                pdf_stats = {}
                 pdf_files = generate_batch_pdfs(
                     workers=workers,
                     salary_results=salary_results,
@@ -1575,12 +1613,16 @@ def show_document_generation(workers, selected_client):
                     month=st.session_state.selected_month,
                     base_path=base_path,
                     use_subfolders=use_subfolders,
-                    progress_callback=update_progress
+                    progress_callback=update_progress,
+                    stats=pdf_stats
                 )
                 
                 progress_bar.empty()
                 status_text.empty()
-                st.success(f"✅ {len(pdf_files)}개의 명세서가 생성되었습니다!")
+                st.success(f"✅ {len(pdf_files)}개의 명세서가 생성되었습니다! "
+                           f"({pdf_stats['seconds']:.1f}초, {pdf_stats['pdfs_per_sec']:.1f}개/초, "
+                           f"프로세스 {pdf_stats['processes']}개, "
+                           f"변경 없음(캐시) {pdf_stats['cache_hits']}개 / 새로 생성 {pdf_stats['rendered']}개)")
                 
                 # 생성된 파일 목록
                 with st.expander("생성된 파일 목록"):
@@ -1634,6 +1676,46 @@ def show_document_generation(workers, selected_client):
                 mime="text/csv",
                 use_container_width=True
             )
+    
+    # 파일로 저장하지 않고 바로 내려받기 (메모리에서 생성)
+    export_name = f"{selected_client['Name']}_{st.session_state.selected_year}년{st.session_state.selected_month}월_급여명세서"
+    export_args = dict(
+        workers=workers,
+        salary_results=salary_results,
+        client_name=selected_client['Name'],
+        client_biz_id=selected_client['BizId'],
+        year=st.session_state.selected_year,
+        month=st.session_state.selected_month
+    )
+    
+    col4, col5 = st.columns(2)
+    
+    for column, label, writer, extension, mime in (
+        (col4, "📦 ZIP으로 받기", write_payslips_zip, "zip", "application/zip"),
+        (col5, "📑 한 파일(PDF)로 받기", write_payslips_merged_pdf, "pdf", "application/pdf"),
+    ):
+        with column:
+            if st.button(label, use_container_width=True):
+                progress_bar = st.progress(0)
+                
+                def update_progress(current, total):
+                    progress_bar.progress(current / total)
+                
+                try:
+                    buffer = io.BytesIO()
+                    count = writer(buffer, progress_callback=update_progress, **export_args)
+                    progress_bar.empty()
+                    
+                    st.download_button(
+                        label=f"💾 {extension.upper()} 다운로드 ({count}명)",
+                        data=buffer.getvalue(),
+                        file_name=f"{export_name}.{extension}",
+                        mime=mime,
+                        use_container_width=True
+                    )
+                except Exception as e:
+                    progress_bar.empty()
+                    st.error(f"❌ 문서 생성 실패: {e}")
 
 
 def show_email_sending(workers, selected_client):
@@ -1675,21 +1757,15 @@ def show_email_sending(workers, selected_client):
             st.warning("⚠️ 이메일 발송 대상이 없습니다.")
             return
         
-        # PDF 먼저 생성
-        with st.spinner("PDF 생성 중..."):
-            base_path = st.session_state.download_base_path
-            use_subfolders = st.session_state.use_client_subfolders
-            
-            pdf_files = generate_batch_pdfs(
-                workers=workers,
-                salary_results=salary_results,
-                client_name=selected_client['Name'],
-                client_biz_id=selected_client['BizId'],
-                year=st.session_state.selected_year,
-                month=st.session_state.selected_month,
-                base_path=base_path,
-                use_subfolders=use_subfolders
-            )
+        # PDF는 발송하면서 메모리에서 생성 (파일 저장/재읽기 없음)
+        pdf_files = iter_payslip_pdfs(
+            workers=email_workers,
+            salary_results=salary_results,
+            client_name=selected_client['Name'],
+            client_biz_id=selected_client['BizId'],
+            year=st.session_state.selected_year,
+            month=st.session_state.selected_month
+        )
         
         # 이메일 발송
         progress_bar = st.progress(0)
@@ -1709,7 +1785,8 @@ def show_email_sending(workers, selected_client):
             client_name=selected_client['Name'],
             subject_template=st.session_state.email_templates['subject'],
             body_template=st.session_state.email_templates['body'],
-            progress_callback=update_progress
+            progress_callback=update_progress,
+            max_workers=smtp.get('parallel', 4)
         )
         
         progress_bar.empty()
@@ -1782,6 +1859,34 @@ def show_settings():
     
     st.divider()
     
+    # 명세서 캐시
+    st.subheader("🗂️ 명세서 캐시")
+    
+    payslip_cache = get_payslip_cache()
+    if payslip_cache is None:
+        st.info("명세서 캐시를 사용하지 않습니다. (PAYSLIP_CACHE=0 또는 캐시 폴더 생성 실패)")
+    else:
+        cache_stats = payslip_cache.stats()
+        st.caption(f"급여 내용이 바뀌지 않은 명세서는 다시 만들지 않고 재사용합니다. 위치: `{cache_stats['directory']}`")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("저장된 명세서", f"{cache_stats['entries']:,}개")
+        with col2:
+            st.metric("사용량", f"{cache_stats['bytes'] / 1024 / 1024:.1f} / {cache_stats['max_bytes'] / 1024 / 1024:.0f} MB")
+        with col3:
+            st.metric("재사용률", f"{cache_stats['hit_rate'] * 100:.0f}%",
+                      help=f"재사용 {cache_stats['hits']:,} / 새로 생성 {cache_stats['misses']:,}")
+        with col4:
+            st.metric("정리된 명세서", f"{cache_stats['evictions']:,}개", help="용량 초과로 오래된 것부터 삭제")
+        
+        if st.button("🗑️ 캐시 비우기"):
+            payslip_cache.clear()
+            st.success("✅ 명세서 캐시를 비웠습니다.")
+            st.rerun()
+    
+    st.divider()
+    
     # SMTP 설정
     st.subheader("📧 SMTP 설정")
     
@@ -1804,6 +1909,10 @@ def show_settings():
     with col2:
         smtp_ssl = st.checkbox("SSL 사용", value=smtp['use_ssl'])
     
+    smtp_parallel = st.number_input("동시 발송 수 (SMTP 연결 수)", value=smtp.get('parallel', 4),
+                                    min_value=1, max_value=10,
+                                    help="일괄 발송 시 동시에 유지할 SMTP 연결 수 (메일 서버 제한에 맞게 조정)")
+    
     if st.button("💾 SMTP 설정 저장"):
         st.session_state.smtp_settings = {
             'host': smtp_host,
@@ -1811,7 +1920,8 @@ def show_settings():
             'user': smtp_user,
             'password': smtp_pass,
             'use_tls': smtp_tls,
-            'use_ssl': smtp_ssl
+            'use_ssl': smtp_ssl,
+            'parallel': int(smtp_parallel)
         }
         st.success("✅ SMTP 설정이 저장되었습니다!")
         st.rerun()
@@ -0,0 +1,200 @@
+"""
+급여명세서 렌더러 검증/벤치마크
+캔버스 템플릿(generate_payslip_pdf)이 platypus 레이아웃(generate_payslip_pdf_platypus)과
+같은 위치/글꼴/색으로 그리는지 PDF 명령을 해석해 비교하고, 명세서 1장당 CPU 시간을 잰다
+
+실행:
+    python compare_payslip_pdf.py            # 무작위 명세서 300장 비교 + 200장 벤치마크
+    python compare_payslip_pdf.py 1000 7     # 비교 장수, 시드
+"""
+import random
+import re
+import sys
+import tempfile
+import time
+
+from reportlab import rl_config
+from reportlab.pdfbase import pdfmetrics
+
+import pdf_generator
+from pdf_generator import generate_payslip_pdf, generate_payslip_pdf_platypus
+
+rl_config.pageCompression = 0
+
+NAMES = ['홍길동', '김철수', 'Kim (Jr.)', '이영희', 'O\'Brien', '박민수']
+TYPES = ['REGULAR', 'PART_TIME', '정규직', '일용직']
+
+
+def _salary_result(rng: random.Random, worker_id: int) -> dict:
+    """무작위 급여 계산 결과 (수당/공제는 가끔 0이라 행 수가 달라짐)"""
+    def amount(zero_rate=0.4):
+        return 0 if rng.random() < zero_rate else rng.randrange(1000, 5000000, 10)
+
+    result = {
+        'worker_id': worker_id,
+        'worker_name': rng.choice(NAMES),
+        'birth_date': rng.choice(['-', '1990-01-01', '850315']),
+        'employment_type': rng.choice(TYPES),
+        'hourly_rate': rng.randrange(9860, 30000, 10),
+        'base_salary': amount(0),
+        'total_payment': amount(0),
+        'total_deduction': amount(0),
+        'net_payment': amount(0),
+    }
+    for key, _ in pdf_generator._PAY_ALLOWANCES + pdf_generator._DEDUCTIONS:
+        result[key] = amount()
+    for i in range(1, 4):
+        result[f'additional_pay{i}'] = amount(0.8)
+        result[f'additional_deduct{i}'] = amount(0.8)
+    return result
+
+
+# ---- PDF 명령 해석 ----
+
+_TOKEN = re.compile(rb'\((?:\\.|[^\\)])*\)|/[^\s/\[\]()<>]+|[^\s/\[\]()<>]+')
+
+
+def _pdf_string(token: bytes) -> bytes:
+    body = token[1:-1]
+    return re.sub(rb'\\(.)', rb'\1', body)
+
+
+def _drawing(pdf: bytes) -> dict:
+    """페이지 내용 → 글자 조각/사각형/선분 목록 (위치는 0.1pt 단위로 반올림)"""
+    fonts = {name.decode(): base.decode() for base, name in
+             re.findall(rb'/BaseFont /(\S+) /Encoding /\S+ /Name /(F\d+)', pdf)
+             + re.findall(rb'/BaseFont /(\S+) /Name /(F\d+)', pdf)}
+    start = pdf.index(b'stream', pdf.index(b'/Contents')) if b'/Contents' in pdf else pdf.index(b'stream')
+    stream = pdf[pdf.index(b'\n', start) + 1:pdf.index(b'endstream', start)]
+
+    texts, rects, lines = [], [], []
+    stack = []
+    origin = [0.0, 0.0]
+    fill = stroke = None
+    line_width = 1.0
+    font = size = None
+    x = y = 0.0
+    path = []
+    args = []
+
+    def r(v):
+        return round(v + 0.0, 1) + 0.0
+
+    for token in _TOKEN.findall(stream):
+        if token.startswith(b'(') or token.startswith(b'/') or re.fullmatch(rb'[-+.\d]+', token):
+            args.append(token)
+            continue
+        op = token.decode()
+        nums = [float(a) for a in args if not a.startswith((b'(', b'/'))]
+        if op == 'q':
+            stack.append((origin[:], fill, stroke, line_width, font, size))
+        elif op == 'Q':
+            origin, fill, stroke, line_width, font, size = stack.pop()
+        elif op == 'cm':
+            origin = [origin[0] + nums[4], origin[1] + nums[5]]
+        elif op == 'rg':
+            fill = tuple(round(v, 3) for v in nums)
+        elif op == 'RG':
+            stroke = tuple(round(v, 3) for v in nums)
+        elif op == 'w':
+            line_width = nums[0]
+        elif op == 'Tf':
+            font, size = fonts[args[0][1:].decode()], nums[0]
+        elif op == 'Tm':
+            x, y = origin[0] + nums[4], origin[1] + nums[5]
+        elif op == 'Td':
+            x, y = x + nums[0], y + nums[1]
+        elif op == 'Tj':
+            raw = _pdf_string(args[0])
+            texts.append((raw.decode('latin-1'), font, size, r(x), r(y), fill))
+            face = pdfmetrics.getFont(font)
+            x += sum(face.widths[b] for b in raw) * size / 1000
+        elif op == 're':
+            path = [('re', origin[0] + nums[0], origin[1] + nums[1], nums[2], nums[3])]
+        elif op == 'n':
+            path = []
+        elif op == 'm':
+            path.append([(origin[0] + nums[0], origin[1] + nums[1])])
+        elif op == 'l':
+            path[-1].append((origin[0] + nums[0], origin[1] + nums[1]))
+        elif op in ('f', 'f*'):
+            _, rx, ry, rw, rh = path[0]
+            # 높이가 음수인 사각형(platypus)도 같은 영역으로 정규화
+            if rh < 0:
+                ry, rh = ry + rh, -rh
+            rects.append((r(rx), r(ry), r(rw), r(rh), fill))
+        elif op == 'S':
+            # 선분 여러 개를 한 경로로 그려도(canvas.lines) 선분 단위로 비교
+            for points in path:
+                for (x1, y1), (x2, y2) in zip(points, points[1:]):
+                    lines.append((r(x1), r(y1), r(x2), r(y2), stroke, line_width))
+            path = []
+        args = []
+
+    return {'texts': sorted(texts, key=repr), 'rects': sorted(rects, key=repr), 'lines': sorted(lines, key=repr)}
+
+
+def _xref_ok(pdf: bytes) -> bool:
+    """startxref/xref 오프셋이 실제 객체 위치를 가리키는지"""
+    start = int(re.search(rb'startxref\s+(\d+)', pdf).group(1))
+    if not pdf.startswith(b'xref', start):
+        return False
+    lines = pdf[start:].split(b'\n')
+    first, count = map(int, lines[1].split())
+    for number, entry in enumerate(lines[2:2 + count], first):
+        offset, _, kind = entry.split()[:3]
+        if kind == b'n' and not pdf.startswith(b'%d 0 obj' % number, int(offset)):
+            return False
+    return True
+
+
+def _render(func, result) -> bytes:
+    path = tempfile.mktemp(suffix='.pdf')
+    func({}, result, '두란세무', '123-45-67890', 2026, 1, path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    rng = random.Random(seed)
+    results = [_salary_result(rng, i) for i in range(count)]
+
+    # 1) 그리기 결과 비교
+    mismatches = 0
+    for result in results:
+        expected = _drawing(_render(generate_payslip_pdf_platypus, result))
+        pdf = _render(generate_payslip_pdf, result)
+        actual = _drawing(pdf)
+        if expected != actual or not _xref_ok(pdf):
+            mismatches += 1
+            if mismatches <= 3:
+                for part in ('texts', 'rects', 'lines'):
+                    missing = [v for v in expected[part] if v not in actual[part]]
+                    extra = [v for v in actual[part] if v not in expected[part]]
+                    if missing or extra:
+                        print(f"  worker {result['worker_id']} {part}: 누락 {missing[:3]} / 추가 {extra[:3]}")
+    print(f"비교 {count}장: 불일치 {mismatches}장")
+
+    # 2) 1장당 CPU 시간 (같은 거래처/연월, 템플릿은 이미 만들어진 상태)
+    sample = results[:200]
+    path = tempfile.mktemp(suffix='.pdf')
+    timings = {}
+    for name, func in (('platypus', generate_payslip_pdf_platypus), ('template', generate_payslip_pdf)):
+        func({}, sample[0], '두란세무', '123-45-67890', 2026, 1, path)
+        started = time.process_time()
+        for result in sample:
+            func({}, result, '두란세무', '123-45-67890', 2026, 1, path)
+        timings[name] = (time.process_time() - started) / len(sample) * 1000
+
+    print(f"platypus {timings['platypus']:.2f}ms/장, 템플릿 {timings['template']:.2f}ms/장 "
+          f"({timings['platypus'] / timings['template']:.1f}배)")
+
+    ok = mismatches == 0
+    print("✅ 정상" if ok else "❌ 확인 필요")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,11 @@
 """
 import pyodbc
 import streamlit as st
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Hashable
+from contextlib import contextmanager
 import os
+import threading
+import time
 
 # DB 연결 설정
 DB_SERVER = os.getenv("DB_SERVER", "25.2.89.129")
@@ -13,6 +16,11 @@ DB_NAME = os.getenv("DB_NAME", "기본정보")
 DB_USER = os.getenv("DB_USER", "user1")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "1536")
 
+# 연결 풀 / 조회 캐시
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))               # 보관할 유휴 연결 수
+DB_POOL_PING_SEC = float(os.getenv("DB_POOL_PING_SEC", "60"))    # 이보다 오래 쉰 연결은 SELECT 1로 확인 후 사용
+DB_CACHE_TTL = float(os.getenv("DB_CACHE_TTL", "300"))           # 조회 캐시 유지 시간(초), 저장 시에는 즉시 무효화
+
 # ODBC 드라이버 자동 감지
 def get_odbc_driver():
     """사용 가능한 ODBC 드라이버 찾기"""
@@ -61,8 +69,137 @@ else:
     )
 
 
+class DbConnectionError(Exception):
+    """DB 서버에 연결할 수 없음"""
+
+
+class ConnectionPool:
+    """
+    pyodbc 연결 풀 (Streamlit 재실행/세션 간 공유)
+    - 쓰고 난 연결은 최대 max_idle개까지 보관해 재사용
+    - 오래 쉰 연결은 꺼내기 전에 SELECT 1로 확인, 반납 시 롤백에 실패한 연결은 버림
+    """
+    
+    def __init__(self, conn_str: str, max_idle: int = DB_POOL_SIZE, ping_after: float = DB_POOL_PING_SEC):
+        self.conn_str = conn_str
+        self.max_idle = max(0, max_idle)
+        self.ping_after = ping_after
+        self._idle = []  # (연결, 반납 시각)
+        self._lock = threading.Lock()
+        self.connects = 0
+    
+    def _take(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, returned_at = self._idle.pop()
+            if time.monotonic() - returned_at < self.ping_after:
+                return conn
+            try:
+                conn.cursor().execute("SELECT 1").fetchall()
+                return conn
+            except pyodbc.Error:
+                self._discard(conn)
+    
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: ... (끝나면 커밋 안 된 트랜잭션은 롤백 후 반납)"""
+        conn = self._take()
+        if conn is None:
+            try:
+                conn = pyodbc.connect(self.conn_str)
+            except Exception as e:
+                raise DbConnectionError(str(e)) from e
+            with self._lock:
+                self.connects += 1
+        
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+    
+    def _release(self, conn):
+        # 롤백에 실패하면(연결 끊김 등) 버림
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        self._discard(conn)
+    
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+class QueryCache:
+    """
+    조회 결과 TTL 캐시 (키는 튜플, 예: ('workers', client_id, ym))
+    저장 경로에서는 invalidate(키 접두사)로 해당 거래처/연월만 무효화
+    """
+    
+    def __init__(self, ttl: float = DB_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[tuple, tuple] = {}  # 키 → (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """캐시된 값 또는 loader() 결과 (loader가 예외를 던지면 캐시하지 않음)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        value = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+    
+    def invalidate(self, *prefix: Hashable):
+        """키가 prefix로 시작하는 항목 삭제 (인자가 없으면 전체)"""
+        n = len(prefix)
+        with self._lock:
+            for key in [k for k in self._entries if k[:n] == prefix]:
+                del self._entries[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'ttl': self.ttl}
+
+
+@st.cache_resource
+def get_connection_pool() -> ConnectionPool:
+    """프로세스 공용 연결 풀"""
+    return ConnectionPool(CONN_STR)
+
+
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """프로세스 공용 조회 캐시 (모든 세션이 공유하므로 저장하면 다른 사용자 화면에도 바로 반영)"""
+    return QueryCache()
+
+
 def get_db_connection():
-    """DB 연결 (매번 새로운 연결 생성)"""
+    """DB 연결 (매번 새로운 연결 생성, 사용 후 close 필요 — 일반 조회/저장은 연결 풀 사용)"""
     try:
         conn = pyodbc.connect(CONN_STR)
         return conn
@@ -71,41 +208,46 @@ def get_db_connection():
         return None
 
 
+def check_db_connection() -> bool:
+    """DB 연결 가능 여부 (풀의 연결로 확인, 연결을 남기지 않음)"""
+    try:
+        with get_connection_pool().connection():
+            return True
+    except DbConnectionError as e:
+        st.error(f"❌ DB 연결 실패: {e}")
+        return False
+
+
 def execute_query(sql: str, params: tuple = ()) -> int:
     """SQL 실행 (INSERT, UPDATE, DELETE)"""
-    conn = get_db_connection()
-    if not conn:
-        raise Exception("DB 연결 없음")
-    
     try:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        rowcount = cursor.rowcount
-        conn.commit()
-        return rowcount
-    finally:
-        conn.close()
+        with get_connection_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rowcount = cursor.rowcount
+            conn.commit()
+            return rowcount
+    except DbConnectionError:
+        raise Exception("DB 연결 없음")
 
 
-def fetch_all(sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
-    """SQL 조회 (SELECT)"""
-    conn = get_db_connection()
-    if not conn:
-        return []
-    
-    try:
+def query_all(sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+    """SQL 조회 (SELECT), 연결 실패 시 DbConnectionError"""
+    with get_connection_pool().connection() as conn:
         cursor = conn.cursor()
         cursor.execute(sql, params)
         
         columns = [column[0] for column in cursor.description]
-        results = []
-        
-        for row in cursor.fetchall():
-            results.append(dict(zip(columns, row)))
-        
-        return results
-    finally:
-        conn.close()
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def fetch_all(sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+    """SQL 조회 (SELECT), 연결 실패 시 오류 표시 후 빈 목록"""
+    try:
+        return query_all(sql, params)
+    except DbConnectionError as e:
+        st.error(f"❌ DB 연결 실패: {e}")
+        return []
 
 
 def fetch_one(sql: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
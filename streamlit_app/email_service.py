@@ -2,14 +2,101 @@
 이메일 발송 서비스
 """
 import smtplib
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
 import os
-from typing import Optional, List
+from typing import Optional, List, Dict, Union, Iterable, Tuple
 from pathlib import Path
 
+from pdf_generator import payslip_filename
+
+
+class SmtpSessionPool:
+    """
+    로그인까지 끝난 SMTP 세션 풀 (일괄 발송 동안 재사용)
+    - 최대 max_sessions개까지 연결, 쓰고 나면 반납해 다음 메일에 재사용
+    - 재사용한 세션이 끊겼거나(서버 타임아웃) 421 응답이면 새 연결로 한 번 더 시도
+      (방금 연 세션이 실패하면 재시도하지 않음: 서버가 거부 중이면 로그인만 늘어남)
+    """
+
+    def __init__(self, connect, max_sessions: int = 4):
+        self._connect = connect
+        self.max_sessions = max(1, max_sessions)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_sessions)
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reconnects = 0
+
+    def _new_session(self):
+        server = self._connect()
+        with self._lock:
+            self.connects += 1
+        return server
+
+    @staticmethod
+    def _quit(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def send(self, msg, recipients: List[str]):
+        with self._slots:
+            for attempt in (0, 1):
+                try:
+                    server, reused = self._idle.get_nowait(), True
+                except queue.Empty:
+                    server, reused = self._new_session(), False
+
+                try:
+                    server.send_message(msg, to_addrs=recipients)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                    if isinstance(e, smtplib.SMTPRecipientsRefused):
+                        codes = [code for code, _ in e.recipients.values()]
+                    else:
+                        codes = [e.smtp_code]
+                    if 421 not in codes:
+                        self._idle.put(server)  # 거부 응답: 세션은 그대로 사용 가능
+                        raise
+                    # 421: 서버가 연결을 닫음 (smtplib도 이미 close 처리)
+                    self._quit(server)
+                    if reused and attempt == 0:
+                        with self._lock:
+                            self.reconnects += 1
+                        continue
+                    raise
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    # 연결 끊김/네트워크 오류 (거부/421 응답은 바로 위 except에서 먼저 걸러짐)
+                    self._quit(server)
+                    if reused and attempt == 0:
+                        with self._lock:
+                            self.reconnects += 1
+                        continue
+                    raise
+                except Exception:
+                    self._quit(server)
+                    raise
+
+                self._idle.put(server)
+                return
+
+    def close(self):
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
 
 class EmailService:
     """이메일 발송 서비스"""
@@ -33,6 +120,41 @@ class EmailService:
         self.smtp_pass = smtp_pass
         self.use_tls = use_tls
         self.use_ssl = use_ssl
+        self._pool: Optional[SmtpSessionPool] = None
+    
+    def _connect(self, timeout: float = 30):
+        """SMTP 연결 + STARTTLS + 로그인"""
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=timeout)
+        else:
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=timeout)
+            if self.use_tls:
+                server.starttls()
+        
+        server.login(self.smtp_user, self.smtp_pass)
+        return server
+    
+    @contextmanager
+    def session_pool(self, max_sessions: int = 4):
+        """이 블록 안의 send_payslip_email 호출은 세션을 재사용 (블록 종료 시 모두 종료)"""
+        pool = SmtpSessionPool(self._connect, max_sessions)
+        self._pool = pool
+        try:
+            yield pool
+        finally:
+            self._pool = None
+            pool.close()
+    
+    def _send(self, msg, recipients: List[str]):
+        if self._pool is not None:
+            self._pool.send(msg, recipients)
+            return
+        
+        server = self._connect()
+        try:
+            server.send_message(msg, to_addrs=recipients)
+        finally:
+            SmtpSessionPool._quit(server)
     
     def send_payslip_email(
         self,
@@ -44,7 +166,9 @@ class EmailService:
         pdf_path: Optional[str] = None,
         subject_template: Optional[str] = None,
         body_template: Optional[str] = None,
-        cc_email: Optional[str] = None
+        cc_email: Optional[str] = None,
+        pdf_data: Optional[bytes] = None,
+        pdf_filename: Optional[str] = None
     ) -> tuple[bool, str]:
         """
         급여명세서 이메일 발송
@@ -59,6 +183,8 @@ class EmailService:
             subject_template: 제목 템플릿
             body_template: 본문 템플릿
             cc_email: 참조 이메일
+            pdf_data: 첨부할 PDF 바이트 (있으면 pdf_path 대신 사용, 디스크를 거치지 않음)
+            pdf_filename: pdf_data의 첨부 파일명
         
         Returns:
             (성공 여부, 메시지)
@@ -102,34 +228,27 @@ class EmailService:
             msg.attach(MIMEText(body, 'plain', 'utf-8'))
             
             # PDF 첨부
-            if pdf_path and os.path.exists(pdf_path):
-                filename = os.path.basename(pdf_path)
-                
+            if pdf_data is None and pdf_path and os.path.exists(pdf_path):
                 with open(pdf_path, 'rb') as f:
-                    part = MIMEBase('application', 'pdf')
-                    part.set_payload(f.read())
-                    encoders.encode_base64(part)
-                    part.add_header('Content-Disposition', 
-                                  f'attachment; filename={filename}')
-                    msg.attach(part)
+                    pdf_data = f.read()
+                pdf_filename = os.path.basename(pdf_path)
             
-            # SMTP 연결 및 발송
-            if self.use_ssl:
-                server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port)
-            else:
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-                if self.use_tls:
-                    server.starttls()
-            
-            server.login(self.smtp_user, self.smtp_pass)
+            if pdf_data is not None:
+                filename = pdf_filename or f"{worker_name}_{year}년{month}월_급여명세서.pdf"
+                part = MIMEBase('application', 'pdf')
+                part.set_payload(pdf_data)
+                encoders.encode_base64(part)
+                part.add_header('Content-Disposition', 
+                              f'attachment; filename={filename}')
+                msg.attach(part)
             
             # 수신자 리스트 (CC 포함)
             recipients = [to_email]
             if cc_email:
                 recipients.append(cc_email)
             
-            server.send_message(msg)
-            server.quit()
+            # 발송 (세션 풀 사용 중이면 기존 연결 재사용)
+            self._send(msg, recipients)
             
             return True, f"✅ {worker_name}님께 이메일 발송 완료"
         
@@ -140,13 +259,14 @@ class EmailService:
         self,
         workers: list,
         salary_results: list,
-        pdf_files: list,
+        pdf_files: Union[Dict[int, Union[str, Tuple[str, bytes]]], List[str], Iterable[Tuple[int, str, bytes]]],
         year: int,
         month: int,
         client_name: str,
         subject_template: Optional[str] = None,
         body_template: Optional[str] = None,
-        progress_callback=None
+        progress_callback=None,
+        max_workers: int = 4
     ) -> tuple[int, int, List[str]]:
         """
         일괄 이메일 발송
@@ -154,87 +274,130 @@ class EmailService:
         Args:
             workers: 직원 목록
             salary_results: 급여 계산 결과
-            pdf_files: PDF 파일 경로 리스트
+            pdf_files: 첨부할 PDF, 다음 중 하나
+                       - {worker_id: PDF 경로 또는 (파일명, PDF 바이트)}
+                       - PDF 경로 리스트 (표준 파일명으로 직원과 연결)
+                       - (worker_id, 파일명, PDF 바이트) 스트림 (iter_payslip_pdfs 결과):
+                         만들어지는 대로 발송하고 발송 대기 중인 문서는 max_workers x 2개까지만 보관
             year: 연도
             month: 월
             client_name: 거래처명
             subject_template: 제목 템플릿
             body_template: 본문 템플릿
-            progress_callback: 진행 상황 콜백 (current, total)
+            progress_callback: 진행 상황 콜백 (current, total), 호출한 스레드에서 실행
+            max_workers: 동시 발송 수 (= 재사용할 SMTP 세션 수)
         
         Returns:
             (성공 개수, 실패 개수, 오류 메시지 리스트)
         """
         
-        success_count = 0
-        fail_count = 0
-        error_messages = []
+        results_by_id = {r['worker_id']: r for r in salary_results}
         
-        # PDF 파일을 worker_id로 매핑
-        pdf_map = {}
-        for pdf_path in pdf_files:
-            filename = os.path.basename(pdf_path)
-            # 파일명에서 직원명 추출 시도
-            for result in salary_results:
-                if result['worker_name'] in filename:
-                    pdf_map[result['worker_id']] = pdf_path
-                    break
-        
-        # 이메일 발송 대상 필터링
+        # 이메일 발송 대상 필터링 (worker_id → 발송 순번)
         email_targets = []
+        order = {}
         for worker in workers:
             # 이메일 사용 여부 확인
             if not worker.get('UseEmail', False):
                 continue
             
             # 이메일 주소 확인
-            to_email = worker.get('EmailTo', '').strip()
+            to_email = (worker.get('EmailTo') or '').strip()
             if not to_email:
                 continue
             
             # 급여 계산 결과 찾기
-            result = next((r for r in salary_results if r['worker_id'] == worker['Id']), None)
+            result = results_by_id.get(worker['Id'])
             if not result:
                 continue
             
-            email_targets.append({
-                'worker': worker,
-                'result': result,
-                'pdf_path': pdf_map.get(worker['Id'])
-            })
+            order[worker['Id']] = len(email_targets)
+            email_targets.append({'worker': worker, 'result': result})
         
         total = len(email_targets)
+        if total == 0:
+            return 0, 0, []
         
-        for idx, target in enumerate(email_targets, 1):
-            worker = target['worker']
-            result = target['result']
-            pdf_path = target['pdf_path']
+        # 발송할 순서대로 (worker_id, 첨부) — 첨부는 PDF 경로, (파일명, 바이트) 또는 None
+        if isinstance(pdf_files, dict):
+            attachments = ((t['worker']['Id'], pdf_files.get(t['worker']['Id'])) for t in email_targets)
+        elif isinstance(pdf_files, (list, tuple)):
+            by_name = {os.path.basename(p): p for p in pdf_files}
             
-            # 이메일 발송
-            success, message = self.send_payslip_email(
-                to_email=worker['EmailTo'],
-                worker_name=result['worker_name'],
+            def find_path(result):
+                # 동명이인은 파일명에 worker_id가 붙음
+                for filename in (payslip_filename(client_name, result['worker_name'], year, month, result['worker_id']),
+                                 payslip_filename(client_name, result['worker_name'], year, month)):
+                    if filename in by_name:
+                        return by_name[filename]
+                return None
+            
+            attachments = ((t['worker']['Id'], find_path(t['result'])) for t in email_targets)
+        else:
+            attachments = self._stream_attachments(pdf_files, order)
+        
+        def send_one(target, attachment):
+            worker = target['worker']
+            pdf_path = pdf_data = pdf_filename = None
+            if isinstance(attachment, tuple):
+                pdf_filename, pdf_data = attachment
+            else:
+                pdf_path = attachment
+            return self.send_payslip_email(
+                to_email=worker['EmailTo'].strip(),
+                worker_name=target['result']['worker_name'],
                 year=year,
                 month=month,
                 client_name=client_name,
                 pdf_path=pdf_path,
                 subject_template=subject_template,
                 body_template=body_template,
-                cc_email=worker.get('EmailCc')
+                cc_email=worker.get('EmailCc'),
+                pdf_data=pdf_data,
+                pdf_filename=pdf_filename
             )
-            
-            if success:
-                success_count += 1
-            else:
-                fail_count += 1
-                error_messages.append(message)
-            
-            # 진행 상황 콜백
-            if progress_callback:
-                progress_callback(idx, total)
+        
+        outcomes: List[Optional[tuple]] = [None] * total
+        parallel = max(1, min(max_workers, total))
+        done = 0
+        
+        with self.session_pool(parallel):
+            with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="mail") as executor:
+                in_flight = {}
+                
+                def collect(finished):
+                    # 완료되는 순서대로 진행 상황 보고 (콜백은 이 스레드에서 호출)
+                    nonlocal done
+                    for future in finished:
+                        outcomes[in_flight.pop(future)] = future.result()
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, total)
+                
+                for worker_id, attachment in attachments:
+                    index = order[worker_id]
+                    in_flight[executor.submit(send_one, email_targets[index], attachment)] = index
+                    # 첨부를 든 채 대기하는 메일 수 제한 (메모리 상한)
+                    if len(in_flight) >= parallel * 2:
+                        collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                collect(wait(in_flight).done)
+        
+        success_count = sum(1 for ok, _ in outcomes if ok)
+        fail_count = total - success_count
+        error_messages = [message for ok, message in outcomes if not ok]
         
         return success_count, fail_count, error_messages
     
+    @staticmethod
+    def _stream_attachments(pdf_stream, order: Dict[int, int]):
+        """(worker_id, 파일명, 바이트) 스트림 중 발송 대상만 (worker_id, (파일명, 바이트))로, PDF가 없던 대상은 마지막에 첨부 없이"""
+        remaining = dict(order)
+        for worker_id, filename, data in pdf_stream:
+            if remaining.pop(worker_id, None) is not None:
+                yield worker_id, (filename, data)
+        for worker_id in remaining:
+            yield worker_id, None
+    
     def test_connection(self) -> tuple[bool, str]:
         """
         SMTP 연결 테스트
@@ -243,14 +406,7 @@ class EmailService:
             (성공 여부, 메시지)
         """
         try:
-            if self.use_ssl:
-                server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=10)
-            else:
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=10)
-                if self.use_tls:
-                    server.starttls()
-            
-            server.login(self.smtp_user, self.smtp_pass)
+            server = self._connect(timeout=10)
             server.quit()
             
             return True, "✅ SMTP 연결 성공"
@@ -0,0 +1,160 @@
+"""
+명세서 PDF 렌더링 캐시
+같은 내용(템플릿 버전 + 거래처 정보 + 급여 계산 결과)의 명세서는 다시 그리지 않고 로컬 폴더에 저장해 둔 PDF를 재사용
+- 키: 내용 해시(SHA-256, 64자) → 폴더/키 앞 2자리/키.pdf
+- 전체 크기가 max_bytes를 넘으면 가장 오래 안 쓴 파일부터 삭제 (LRU, 파일 수정 시각으로 순서 유지)
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+# 기본 캐시 위치/크기 (환경변수로 변경, PAYSLIP_CACHE=0이면 사용 안 함)
+PAYSLIP_CACHE_ENABLED = os.getenv("PAYSLIP_CACHE", "1") != "0"
+PAYSLIP_CACHE_DIR = os.getenv("PAYSLIP_CACHE_DIR") or os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache'),
+    '급여관리프로그램', 'payslip_cache'
+)
+PAYSLIP_CACHE_MAX_MB = int(os.getenv("PAYSLIP_CACHE_MAX_MB", "256"))
+
+_DEFAULT_CACHE: Optional["PayslipCache"] = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+class PayslipCache:
+    """내용 해시 → PDF 바이트 (크기 제한 LRU 폴더 캐시, 스레드 안전)"""
+
+    def __init__(self, directory: str, max_bytes: int = PAYSLIP_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # 키 → 파일 크기 (오래 안 쓴 순)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        for path in self.directory.glob('*/*.pdf'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            found.append((st.st_mtime, path.stem, st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pdf"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """캐시된 PDF (없으면 None)"""
+        path = self._path(key)
+        with self._lock:
+            known = key in self._entries
+        if known:
+            try:
+                data = path.read_bytes()
+            except OSError:
+                data = None
+            if data is not None:
+                try:
+                    os.utime(path)  # 재시작 후에도 최근 사용 순서 유지
+                except OSError:
+                    pass
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self.hits += 1
+                return data
+            # 다른 프로세스가 지웠으면 목록에서도 제거
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        """PDF 저장 (임시 파일에 쓴 뒤 교체, 실패해도 렌더링 결과에는 영향 없음)"""
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ 명세서 캐시 저장 실패: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self.stores += 1
+            self._evict()
+
+    def _evict(self):
+        # 호출 측에서 self._lock 보유
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        """캐시 파일 전체 삭제 (통계는 유지)"""
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'directory': str(self.directory),
+            }
+
+
+def get_payslip_cache() -> Optional[PayslipCache]:
+    """기본 캐시 (PAYSLIP_CACHE_DIR, 프로세스당 하나, 폴더를 만들 수 없으면 None)"""
+    global _DEFAULT_CACHE
+    if not PAYSLIP_CACHE_ENABLED:
+        return None
+    with _DEFAULT_CACHE_LOCK:
+        if _DEFAULT_CACHE is None:
+            try:
+                _DEFAULT_CACHE = PayslipCache(PAYSLIP_CACHE_DIR)
+            except OSError as e:
+                print(f"⚠️ 명세서 캐시 폴더를 만들 수 없어 캐시 없이 생성: {e}")
+                return None
+        return _DEFAULT_CACHE
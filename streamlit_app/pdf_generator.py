@@ -1,18 +1,81 @@
 """
 PDF 급여명세서 생성
 """
+from reportlab import rl_config, Version as reportlab_version
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.rl_accel import fp_str
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+import io
 import os
+import re
+import time
+import zlib
+import hashlib
+import json
+import atexit
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, date
+from typing import Dict, Any, Optional, List, Tuple
+
+from payslip_cache import PayslipCache, get_payslip_cache
+
+# 이보다 적은 인원은 현재 프로세스에서 생성 (템플릿 렌더링은 1장 1ms 미만이라 프로세스 기동 비용이 더 큼)
+PDF_PARALLEL_MIN = 200
+
+# 명세서 모양(PayslipTemplate)을 바꾸면 올릴 것 → 이전 버전으로 캐시된 PDF는 더 이상 쓰이지 않음
+PAYSLIP_TEMPLATE_VERSION = 1
+
+_STYLES: Optional[Dict[str, Any]] = None
+
+_TEMPLATES: Dict[tuple, "PayslipTemplate"] = {}
+_TEMPLATES_LOCK = threading.Lock()
+
+# 명세서 색상 (platypus/캔버스 렌더러 공용)
+_COLORS = {
+    'title': colors.HexColor('#1f77b4'),
+    'label_bg': colors.HexColor('#e8f4f8'),
+    'pay_header': colors.HexColor('#4a90e2'),
+    'pay_total': colors.HexColor('#e8f4f8'),
+    'deduct_header': colors.HexColor('#e74c3c'),
+    'deduct_total': colors.HexColor('#fce8e6'),
+    'net': colors.HexColor('#28a745'),
+}
+
+# 지급/공제 항목 (금액이 0보다 클 때만 표시)
+_PAY_ALLOWANCES = [
+    ('overtime_pay', '연장수당'),
+    ('night_pay', '야간수당'),
+    ('holiday_pay', '휴일수당'),
+    ('weekly_holiday_pay', '주휴수당'),
+    ('bonus', '상여금'),
+    ('food_allowance', '식대'),
+    ('car_allowance', '차량유지비'),
+]
+_DEDUCTIONS = [
+    ('national_pension', '국민연금'),
+    ('health_insurance', '건강보험'),
+    ('long_term_care', '장기요양'),
+    ('employment_insurance', '고용보험'),
+    ('income_tax', '소득세'),
+    ('local_income_tax', '지방소득세'),
+]
+
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_SIZE = 0
+_PDF_POOL_LOCK = threading.Lock()
 
 
 def format_money(amount):
@@ -22,6 +85,131 @@ def format_money(amount):
     return f"{int(amount):,}"
 
 
+def _pay_items(salary_result: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """지급 내역 행 (기본급 + 금액이 있는 수당/추가지급)"""
+    items = [('기본급', salary_result['base_salary'])]
+    for key, label in _PAY_ALLOWANCES:
+        if salary_result.get(key, 0) > 0:
+            items.append((label, salary_result[key]))
+    for i in range(1, 4):
+        key = f'additional_pay{i}'
+        if salary_result.get(key, 0) > 0:
+            items.append((f'추가지급{i}', salary_result[key]))
+    return items
+
+
+def _deduct_items(salary_result: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """공제 내역 행 (금액이 있는 공제/추가공제)"""
+    items = []
+    for key, label in _DEDUCTIONS:
+        if salary_result.get(key, 0) > 0:
+            items.append((label, salary_result[key]))
+    for i in range(1, 4):
+        key = f'additional_deduct{i}'
+        if salary_result.get(key, 0) > 0:
+            items.append((f'추가공제{i}', salary_result[key]))
+    return items
+
+
+def _payslip_styles() -> Dict[str, Any]:
+    """
+    문단/표 스타일 (프로세스당 한 번만 생성해 재사용)
+    병렬 생성 시에는 워커 프로세스마다 initializer에서 한 번씩 생성
+    """
+    global _STYLES
+    if _STYLES is not None:
+        return _STYLES
+    
+    styles = getSampleStyleSheet()
+    
+    # 기본 폰트 메트릭 미리 로드 (첫 문서 생성 시 지연 방지)
+    for font_name in ('Helvetica', 'Helvetica-Bold'):
+        pdfmetrics.getFont(font_name)
+    
+    amount_table = [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWHEIGHTS', (0, 0), (-1, -1), 7*mm),
+    ]
+    
+    _STYLES = {
+        'heading2': styles['Heading2'],
+        # 타이틀 스타일
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            textColor=_COLORS['title'],
+            spaceAfter=12,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        # 서브타이틀 스타일
+        'subtitle': ParagraphStyle(
+            'CustomSubtitle',
+            parent=styles['Normal'],
+            fontSize=11,
+            alignment=TA_CENTER,
+            spaceAfter=20
+        ),
+        'info_table': TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), _COLORS['label_bg']),
+            ('BACKGROUND', (2, 0), (2, -1), _COLORS['label_bg']),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWHEIGHTS', (0, 0), (-1, -1), 8*mm),
+        ]),
+        'pay_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), _COLORS['pay_header']),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('BACKGROUND', (-1, -1), (-1, -1), _COLORS['pay_total']),
+        ] + amount_table),
+        'deduct_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), _COLORS['deduct_header']),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('BACKGROUND', (-1, -1), (-1, -1), _COLORS['deduct_total']),
+        ] + amount_table),
+        'net_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), _COLORS['net']),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.darkgreen),
+            ('ROWHEIGHTS', (0, 0), (-1, -1), 12*mm),
+        ]),
+    }
+    return _STYLES
+
+
+def payslip_filename(client_name: str, worker_name: str, year: int, month: int, worker_id=None) -> str:
+    """급여명세서 파일명 (동명이인이 있으면 worker_id를 붙여 구분)"""
+    suffix = f"_{worker_id}" if worker_id is not None else ""
+    return f"{client_name}_{worker_name}{suffix}_{year}년{month}월_급여명세서.pdf"
+
+
+def _resolve_output_path(output_path: str, client_name: str, worker_name: str, year: int, month: int) -> str:
+    """저장 경로 (디렉토리면 표준 파일명 추가) + 상위 디렉토리 생성"""
+    if os.path.isdir(output_path):
+        # 디렉토리인 경우 파일명 자동 생성
+        full_path = os.path.join(output_path, payslip_filename(client_name, worker_name, year, month))
+    else:
+        # 전체 경로가 주어진 경우
+        full_path = output_path
+    
+    # 디렉토리 생성
+    Path(full_path).parent.mkdir(parents=True, exist_ok=True)
+    return full_path
+
+
 def generate_payslip_pdf(
     worker_data: Dict[str, Any],
     salary_result: Dict[str, Any],
@@ -32,7 +220,36 @@ def generate_payslip_pdf(
     output_path: str
 ) -> str:
     """
-    급여명세서 PDF 생성
+    급여명세서 PDF 생성 (거래처/연월별 캔버스 템플릿 재사용)
+    
+    Args:
+        worker_data: 직원 정보
+        salary_result: 급여 계산 결과
+        client_name: 거래처명
+        client_biz_id: 사업자번호
+        year: 연도
+        month: 월
+        output_path: 저장 경로 (디렉토리 또는 전체 경로)
+    
+    Returns:
+        생성된 PDF 파일의 전체 경로
+    """
+    full_path = _resolve_output_path(output_path, client_name, salary_result['worker_name'], year, month)
+    template = get_payslip_template(client_name, client_biz_id, year, month)
+    return template.render(salary_result, full_path)
+
+
+def generate_payslip_pdf_platypus(
+    worker_data: Dict[str, Any],
+    salary_result: Dict[str, Any],
+    client_name: str,
+    client_biz_id: str,
+    year: int,
+    month: int,
+    output_path: str
+) -> str:
+    """
+    급여명세서 PDF 생성 (platypus 레이아웃, 캔버스 템플릿의 기준 배치)
     
     Args:
         worker_data: 직원 정보
@@ -48,52 +265,35 @@ def generate_payslip_pdf(
     """
     
     # 출력 경로 설정
-    if os.path.isdir(output_path):
-        # 디렉토리인 경우 파일명 자동 생성
-        filename = f"{client_name}_{salary_result['worker_name']}_{year}년{month}월_급여명세서.pdf"
-        full_path = os.path.join(output_path, filename)
-    else:
-        # 전체 경로가 주어진 경우
-        full_path = output_path
+    full_path = _resolve_output_path(output_path, client_name, salary_result['worker_name'], year, month)
     
-    # 디렉토리 생성
-    Path(full_path).parent.mkdir(parents=True, exist_ok=True)
+    # PDF 생성
+    _platypus_doc(full_path).build(_platypus_story(salary_result, client_name, client_biz_id, year, month))
     
-    # PDF 문서 생성
-    doc = SimpleDocTemplate(
-        full_path,
+    return full_path
+
+
+def _platypus_doc(target) -> SimpleDocTemplate:
+    """platypus 문서 (target: 파일 경로 또는 바이너리 파일 객체)"""
+    return SimpleDocTemplate(
+        target,
         pagesize=A4,
         rightMargin=15*mm,
         leftMargin=15*mm,
         topMargin=15*mm,
         bottomMargin=15*mm
     )
-    
-    # 스토리 (내용) 구성
+
+
+def _platypus_story(salary_result: Dict[str, Any], client_name: str, client_biz_id: str,
+                    year: int, month: int, issue_date: Optional[date] = None) -> list:
+    """명세서 한 장의 platypus 스토리 (내용)"""
     story = []
     
-    # 스타일
-    styles = getSampleStyleSheet()
-    
-    # 타이틀 스타일
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=12,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    # 서브타이틀 스타일
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=11,
-        alignment=TA_CENTER,
-        spaceAfter=20
-    )
+    # 스타일 (프로세스 내 캐시)
+    styles = _payslip_styles()
+    title_style = styles['title']
+    subtitle_style = styles['subtitle']
     
     # 1. 제목
     story.append(Paragraph(f"{year}년 {month}월 급여명세서", title_style))
@@ -107,115 +307,39 @@ def generate_payslip_pdf(
     ]
     
     info_table = Table(info_data, colWidths=[30*mm, 60*mm, 30*mm, 60*mm])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f4f8')),
-        ('BACKGROUND', (2, 0), (2, -1), colors.HexColor('#e8f4f8')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ROWHEIGHTS', (0, 0), (-1, -1), 8*mm),
-    ]))
+    info_table.setStyle(styles['info_table'])
     
     story.append(info_table)
     story.append(Spacer(1, 8*mm))
     
     # 3. 지급 내역
-    story.append(Paragraph("<b>지급 내역</b>", styles['Heading2']))
+    story.append(Paragraph("<b>지급 내역</b>", styles['heading2']))
     story.append(Spacer(1, 3*mm))
     
-    pay_items = [
-        ['항목', '금액'],
-        ['기본급', f"{format_money(salary_result['base_salary'])}원"],
-    ]
-    
-    # 수당이 있는 경우만 추가
-    if salary_result.get('overtime_pay', 0) > 0:
-        pay_items.append(['연장수당', f"{format_money(salary_result['overtime_pay'])}원"])
-    if salary_result.get('night_pay', 0) > 0:
-        pay_items.append(['야간수당', f"{format_money(salary_result['night_pay'])}원"])
-    if salary_result.get('holiday_pay', 0) > 0:
-        pay_items.append(['휴일수당', f"{format_money(salary_result['holiday_pay'])}원"])
-    if salary_result.get('weekly_holiday_pay', 0) > 0:
-        pay_items.append(['주휴수당', f"{format_money(salary_result['weekly_holiday_pay'])}원"])
-    if salary_result.get('bonus', 0) > 0:
-        pay_items.append(['상여금', f"{format_money(salary_result['bonus'])}원"])
-    if salary_result.get('food_allowance', 0) > 0:
-        pay_items.append(['식대', f"{format_money(salary_result['food_allowance'])}원"])
-    if salary_result.get('car_allowance', 0) > 0:
-        pay_items.append(['차량유지비', f"{format_money(salary_result['car_allowance'])}원"])
-    
-    # 추가 지급 항목
-    for i in range(1, 4):
-        key = f'additional_pay{i}'
-        if salary_result.get(key, 0) > 0:
-            pay_items.append([f'추가지급{i}', f"{format_money(salary_result[key])}원"])
+    pay_items = [['항목', '금액']]
+    pay_items += [[label, f"{format_money(amount)}원"] for label, amount in _pay_items(salary_result)]
     
     # 총액
     pay_items.append(['지급총액', f"{format_money(salary_result['total_payment'])}원"])
     
     pay_table = Table(pay_items, colWidths=[60*mm, 60*mm])
-    pay_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a90e2')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('BACKGROUND', (-1, -1), (-1, -1), colors.HexColor('#e8f4f8')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ROWHEIGHTS', (0, 0), (-1, -1), 7*mm),
-    ]))
+    pay_table.setStyle(styles['pay_table'])
     
     story.append(pay_table)
     story.append(Spacer(1, 8*mm))
     
     # 4. 공제 내역
-    story.append(Paragraph("<b>공제 내역</b>", styles['Heading2']))
+    story.append(Paragraph("<b>공제 내역</b>", styles['heading2']))
     story.append(Spacer(1, 3*mm))
     
-    deduct_items = [
-        ['항목', '금액'],
-    ]
-    
-    # 공제 항목
-    if salary_result.get('national_pension', 0) > 0:
-        deduct_items.append(['국민연금', f"{format_money(salary_result['national_pension'])}원"])
-    if salary_result.get('health_insurance', 0) > 0:
-        deduct_items.append(['건강보험', f"{format_money(salary_result['health_insurance'])}원"])
-    if salary_result.get('long_term_care', 0) > 0:
-        deduct_items.append(['장기요양', f"{format_money(salary_result['long_term_care'])}원"])
-    if salary_result.get('employment_insurance', 0) > 0:
-        deduct_items.append(['고용보험', f"{format_money(salary_result['employment_insurance'])}원"])
-    if salary_result.get('income_tax', 0) > 0:
-        deduct_items.append(['소득세', f"{format_money(salary_result['income_tax'])}원"])
-    if salary_result.get('local_income_tax', 0) > 0:
-        deduct_items.append(['지방소득세', f"{format_money(salary_result['local_income_tax'])}원"])
-    
-    # 추가 공제 항목
-    for i in range(1, 4):
-        key = f'additional_deduct{i}'
-        if salary_result.get(key, 0) > 0:
-            deduct_items.append([f'추가공제{i}', f"{format_money(salary_result[key])}원"])
+    deduct_items = [['항목', '금액']]
+    deduct_items += [[label, f"{format_money(amount)}원"] for label, amount in _deduct_items(salary_result)]
     
     # 총액
     deduct_items.append(['공제총액', f"{format_money(salary_result['total_deduction'])}원"])
     
     deduct_table = Table(deduct_items, colWidths=[60*mm, 60*mm])
-    deduct_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('BACKGROUND', (-1, -1), (-1, -1), colors.HexColor('#fce8e6')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ROWHEIGHTS', (0, 0), (-1, -1), 7*mm),
-    ]))
+    deduct_table.setStyle(styles['deduct_table'])
     
     story.append(deduct_table)
     story.append(Spacer(1, 10*mm))
@@ -226,28 +350,703 @@ def generate_payslip_pdf(
     ]
     
     net_table = Table(net_data, colWidths=[60*mm, 60*mm])
-    net_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#28a745')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.darkgreen),
-        ('ROWHEIGHTS', (0, 0), (-1, -1), 12*mm),
-    ]))
+    net_table.setStyle(styles['net_table'])
     
     story.append(net_table)
     
     # 6. 발행 정보
     story.append(Spacer(1, 10*mm))
-    issue_date = datetime.now().strftime("%Y년 %m월 %d일")
-    story.append(Paragraph(f"발행일: {issue_date}", subtitle_style))
+    issued = (issue_date or datetime.now()).strftime("%Y년 %m월 %d일")
+    story.append(Paragraph(f"발행일: {issued}", subtitle_style))
     
-    # PDF 생성
-    doc.build(story)
+    return story
+
+
+# =========================
+# 캔버스 템플릿 렌더러
+# =========================
+# 배치는 platypus SimpleDocTemplate 기준 (A4, 여백 15mm + 프레임 안쪽 여백 6pt)
+_FRAME_LEFT = 15*mm + 6
+_FRAME_WIDTH = A4[0] - 30*mm - 12
+_FRAME_TOP = A4[1] - 15*mm - 6
+_ROW_HEIGHT = 18            # 표 한 행 (leading 12 + 위아래 여백 3)
+_CELL_LEADING = 12
+_SECTION_HEAD = 12 + 18 + 6 + 3*mm      # 소제목 위 여백 + 높이 + 아래 여백 + 표까지 간격
+_INFO_COLS = [30*mm, 60*mm, 30*mm, 60*mm]
+_AMOUNT_COLS = [60*mm, 60*mm]
+
+# 캔버스마다 같은 순서로 등록해 미리 만든 PDF 명령의 글꼴 이름(/F1, /F2...)이 항상 일치하도록 함
+_TEMPLATE_FONTS = ('Helvetica', 'Helvetica-Bold', 'Symbol', 'ZapfDingbats')
+
+
+def _register_fonts(c):
+    for font_name in _TEMPLATE_FONTS:
+        c._doc.getInternalFontName(font_name)
+
+
+def _canvas_internals_ok(c) -> bool:
+    """
+    PayslipTemplate이 쓰는 reportlab 내부 속성(Canvas._code, _doc.getInternalFontName)이 있는지
+    (requirements.txt에 고정한 버전 기준, 없으면 platypus 레이아웃으로 생성)
+    """
+    doc = getattr(c, '_doc', None)
+    return isinstance(getattr(c, '_code', None), list) and callable(getattr(doc, 'getInternalFontName', None))
+
+
+def _num(value: float) -> str:
+    """PDF 좌표 숫자 (소수 셋째 자리)"""
+    return ('%.3f' % value).rstrip('0').rstrip('.')
+
+
+def _translate(code: str, dx: float, dy: float) -> str:
+    """미리 만든 PDF 명령을 (dx, dy)만큼 옮겨 그리기"""
+    return f"q 1 0 0 1 {_num(dx)} {_num(dy)} cm\n{code}\nQ"
+
+
+def _cell_baseline(bottom: float, size: float) -> float:
+    """표 칸 세로 가운데 정렬 글자 기준선 (platypus Table VALIGN=MIDDLE과 동일)"""
+    return bottom + (_ROW_HEIGHT - _CELL_LEADING) / 2 + _CELL_LEADING - size
+
+
+def _draw_cell(c, text, left, width, bottom, font='Helvetica', size=9, color=colors.black):
+    c.setFillColor(color)
+    c.setFont(font, size, _CELL_LEADING)
+    c.drawCentredString(left + width / 2, _cell_baseline(bottom, size), text)
+
+
+def _draw_grid(c, left, bottom, col_widths, rows, color=colors.grey, width=0.5):
+    top = bottom + rows * _ROW_HEIGHT
+    right = left + sum(col_widths)
+    lines = [(left, top - i * _ROW_HEIGHT, right, top - i * _ROW_HEIGHT) for i in range(rows + 1)]
+    x = left
+    lines.append((x, bottom, x, top))
+    for col_width in col_widths:
+        x += col_width
+        lines.append((x, bottom, x, top))
+    c.setLineCap(1)
+    c.setLineJoin(1)
+    c.setStrokeColor(color)
+    c.setLineWidth(width)
+    c.lines(lines)
+
+
+class PayslipTemplate:
+    """
+    급여명세서 캔버스 템플릿 (거래처/연월마다 한 번 만들어 직원별로 재사용)
+    - 제목, 기본정보 표의 고정 칸과 괘선, 표 머리글, 항목명, 실수령액/발행일 틀은 PDF 명령으로 미리 만들어 둠
+    - 직원별로는 이름/금액 등 바뀌는 칸만 그려 붙임 (platypus 레이아웃/스타일 계산 없음)
+    - 배치/색/글꼴은 generate_payslip_pdf_platypus와 동일
+    - reportlab 내부 속성이 없는 버전이면(fallback) 직원마다 platypus 레이아웃으로 생성
+    """
     
-    return full_path
+    def __init__(self, client_name: str, client_biz_id: str, year: int, month: int, issue_date: Optional[date] = None):
+        self.client_name = client_name
+        self.client_biz_id = client_biz_id
+        self.year = year
+        self.month = month
+        self.issue_date = issue_date or date.today()
+        
+        # 미리 만드는 PDF 명령은 이 캔버스에 그려서 뽑아냄
+        self._lock = threading.Lock()
+        self._scratch = canvas.Canvas(io.BytesIO(), pagesize=A4)
+        _register_fonts(self._scratch)
+        self.fallback = not _canvas_internals_ok(self._scratch)
+        if self.fallback:
+            print(f"⚠️ reportlab {reportlab_version}: 캔버스 템플릿을 쓸 수 없어 platypus로 생성합니다")
+            self._skeleton = None
+            return
+        self._font_ids = {name: self._scratch._doc.getInternalFontName(name) for name in _TEMPLATE_FONTS}
+        self._fills: Dict[Any, str] = {}
+        self._labels: Dict[Tuple[str, bool], str] = {}
+        self._grids: Dict[Tuple[str, int], str] = {}
+        self._won: Dict[Tuple[str, float, Any], Tuple[str, float]] = {}
+        
+        self._info_left = _FRAME_LEFT + (_FRAME_WIDTH - sum(_INFO_COLS)) / 2
+        self._amount_left = _FRAME_LEFT + (_FRAME_WIDTH - sum(_AMOUNT_COLS)) / 2
+        self._value_left = self._amount_left + _AMOUNT_COLS[0]
+        
+        # 세로 위치 (제목 → 기본정보 표 → 지급 내역)
+        title_top = _FRAME_TOP
+        self._info_bottom = title_top - (22 + 12 + 5*mm) - 3 * _ROW_HEIGHT
+        self._pay_top = self._info_bottom - 8*mm
+        
+        self._head = self._capture(lambda c: self._draw_head(c, title_top))
+        self._sections = {
+            'pay': self._capture(lambda c: self._draw_section(c, '지급 내역', _COLORS['pay_header'])),
+            'deduct': self._capture(lambda c: self._draw_section(c, '공제 내역', _COLORS['deduct_header'])),
+        }
+        self._totals = {
+            'pay': self._capture(lambda c: self._draw_total(c, '지급총액', _COLORS['pay_total'])),
+            'deduct': self._capture(lambda c: self._draw_total(c, '공제총액', _COLORS['deduct_total'])),
+        }
+        self._net = self._capture(self._draw_net)
+        issued = f"발행일: {self.issue_date.strftime('%Y년 %m월 %d일')}"
+        self._issued = self._capture(lambda c: self._draw_issued(c, issued))
+        self._skeleton = self._build_skeleton()
+    
+    # ---- 미리 만드는 부분 ----
+    
+    def _capture(self, draw) -> str:
+        """draw(canvas)가 만든 PDF 명령 문자열"""
+        c = self._scratch
+        with self._lock:
+            start = len(c._code)
+            c.saveState()
+            draw(c)
+            c.restoreState()
+            code = '\n'.join(c._code[start:])
+            del c._code[start:]
+        return code
+    
+    def _draw_head(self, c, top):
+        # 제목
+        c.setFillColor(_COLORS['title'])
+        c.setFont('Helvetica-Bold', 18, 22)
+        c.drawCentredString(_FRAME_LEFT + _FRAME_WIDTH / 2, top - 18, f"{self.year}년 {self.month}월 급여명세서")
+        
+        # 기본 정보 (거래처 행 + 항목명, 직원별 값은 render에서)
+        left, bottom = self._info_left, self._info_bottom
+        c.setFillColor(_COLORS['label_bg'])
+        c.rect(left, bottom, _INFO_COLS[0], 3 * _ROW_HEIGHT, stroke=0, fill=1)
+        c.rect(left + sum(_INFO_COLS[:2]), bottom, _INFO_COLS[2], 3 * _ROW_HEIGHT, stroke=0, fill=1)
+        rows = [
+            ['거래처', self.client_name, '사업자번호', self.client_biz_id],
+            ['성명', None, '생년월일', None],
+            ['통상시급', None, '고용형태', None],
+        ]
+        for r, row in enumerate(rows):
+            x = left
+            for col_width, text in zip(_INFO_COLS, row):
+                if text is not None:
+                    _draw_cell(c, str(text), x, col_width, bottom + (2 - r) * _ROW_HEIGHT)
+                x += col_width
+        _draw_grid(c, left, bottom, _INFO_COLS, 3)
+    
+    def _draw_section(self, c, title, header_color):
+        """소제목 + 표 머리글 (소제목 위쪽 y=0 기준)"""
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica-Bold', 14, 18)
+        c.drawString(_FRAME_LEFT, -12 - 14, title)
+        
+        header_bottom = -_SECTION_HEAD - _ROW_HEIGHT
+        c.setFillColor(header_color)
+        c.rect(self._amount_left, header_bottom, sum(_AMOUNT_COLS), _ROW_HEIGHT, stroke=0, fill=1)
+        _draw_cell(c, '항목', self._amount_left, _AMOUNT_COLS[0], header_bottom, 'Helvetica-Bold', 9, colors.whitesmoke)
+        _draw_cell(c, '금액', self._value_left, _AMOUNT_COLS[1], header_bottom, 'Helvetica-Bold', 9, colors.whitesmoke)
+    
+    def _draw_total(self, c, label, background):
+        """총액 행 (행 아래쪽 y=0 기준, 금액은 render에서)"""
+        c.setFillColor(background)
+        c.rect(self._value_left, 0, _AMOUNT_COLS[1], _ROW_HEIGHT, stroke=0, fill=1)
+        _draw_cell(c, label, self._amount_left, _AMOUNT_COLS[0], 0, 'Helvetica-Bold')
+    
+    def _draw_net(self, c):
+        """실수령액 표 (아래쪽 y=0 기준)"""
+        c.setFillColor(_COLORS['net'])
+        c.rect(self._amount_left, 0, sum(_AMOUNT_COLS), _ROW_HEIGHT, stroke=0, fill=1)
+        _draw_cell(c, '실수령액', self._amount_left, _AMOUNT_COLS[0], 0, 'Helvetica-Bold', 12, colors.whitesmoke)
+        _draw_grid(c, self._amount_left, 0, _AMOUNT_COLS, 1, colors.darkgreen, 1)
+    
+    def _draw_issued(self, c, text):
+        """발행일 (기준선 y=0)"""
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica', 11, 12)
+        c.drawCentredString(_FRAME_LEFT + _FRAME_WIDTH / 2, 0, text)
+    
+    def _label(self, label: str) -> str:
+        """항목명 칸 (행 아래쪽 y=0 기준)"""
+        code = self._labels.get(label)
+        if code is None:
+            code = self._capture(lambda c: _draw_cell(c, label, self._amount_left, _AMOUNT_COLS[0], 0))
+            self._labels[label] = code
+        return code
+    
+    def _grid(self, kind: str, rows: int) -> str:
+        """금액 표 괘선 (표 아래쪽 y=0 기준)"""
+        code = self._grids.get((kind, rows))
+        if code is None:
+            code = self._capture(lambda c: _draw_grid(c, self._amount_left, 0, _AMOUNT_COLS, rows))
+            self._grids[(kind, rows)] = code
+        return code
+    
+    def _build_skeleton(self) -> Optional[dict]:
+        """
+        빈 명세서를 한 번 저장해 내용 스트림을 뺀 나머지 PDF 바이트(글꼴/페이지/문서정보 객체, xref)를 잘라 둠
+        내용 스트림이 마지막 객체라 앞부분과 xref는 직원마다 그대로이고 startxref/ID만 바뀜
+        (구조가 예상과 다르면 None → 매번 캔버스로 저장)
+        """
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pagesize=A4, pageCompression=0)
+        _register_fonts(c)
+        c.showPage()
+        c.save()
+        data = buf.getvalue()
+        
+        found = re.search(rb'/Contents (\d+) 0 R', data)
+        trailer_id = re.search(rb'/ID \s*\[<[0-9a-f]+><[0-9a-f]+>\]', data)
+        root = re.search(rb'/Root (\d+) 0 R', data)
+        info = re.search(rb'/Info (\d+) 0 R', data)
+        if not (found and trailer_id and root and info):
+            return None
+        number = int(found.group(1))
+        start = data.find(b'\n%d 0 obj' % number) + 1
+        xref = data.find(b'\nxref\n', start) + 1
+        startxref = data.find(b'startxref', xref)
+        if start <= 0 or xref <= 0 or startxref < 0 or data.find(b' 0 obj', start + len(b'%d 0 obj' % number), xref) != -1:
+            return None
+        
+        # 여러 쪽을 한 파일로 쓸 때(write_merged) 재사용할 객체들
+        prefix = data[:start]
+        found_objects = list(re.finditer(rb'(\d+) 0 obj\n(.*?)\nendobj\n', prefix, re.S))
+        objects = {int(m.group(1)): m.group(2) for m in found_objects}
+        pages = [n for n, body in objects.items() if b'/Type /Pages' in body]
+        page = [n for n, body in objects.items() if b'/Contents %d 0 R' % number in body]
+        if not found_objects or set(objects) != set(range(1, len(objects) + 1)) or len(pages) != 1 or len(page) != 1:
+            return None
+        
+        return {
+            'prefix': prefix,
+            'number': number,
+            'xref': data[xref:trailer_id.start()],
+            'trailer': data[trailer_id.end():startxref],
+            'header': prefix[:found_objects[0].start()],
+            'objects': objects,
+            'page': objects[page[0]],
+            'page_number': page[0],
+            'pages': pages[0],
+            'root': int(root.group(1)),
+            'info': int(info.group(1)),
+            'shared': [n for n in sorted(objects) if n not in (page[0], pages[0], int(root.group(1)), int(info.group(1)))],
+        }
+    
+    @staticmethod
+    def _stream_object(number: int, content: str) -> bytes:
+        """내용 스트림 객체 (rl_config.pageCompression이면 Flate 압축)"""
+        body = content.encode('latin-1')
+        if rl_config.pageCompression:
+            body = zlib.compress(body)
+            head = b'<<\n/Filter [ /FlateDecode ] /Length %d\n>>' % len(body)
+        else:
+            head = b'<<\n/Length %d\n>>' % len(body)
+        return b'%d 0 obj\n%s\nstream\n%s\nendstream\nendobj\n' % (number, head, body)
+    
+    def _pdf_bytes(self, content: str) -> bytes:
+        """미리 잘라 둔 PDF 앞/뒤에 이 직원의 내용 스트림만 끼워 넣음"""
+        skeleton = self._skeleton
+        digest = hashlib.md5(content.encode('latin-1')).hexdigest().encode()
+        stream = self._stream_object(skeleton['number'], content)
+        return b''.join([
+            skeleton['prefix'], stream, skeleton['xref'],
+            b'/ID \n[<%s><%s>]' % (digest, digest), skeleton['trailer'],
+            b'startxref\n%d\n%%%%EOF\n' % (len(skeleton['prefix']) + len(stream)),
+        ])
+    
+    # ---- 직원별 칸 ----
+    
+    def _fill(self, color) -> str:
+        code = self._fills.get(color)
+        if code is None:
+            code = f"{fp_str(color.red, color.green, color.blue)} rg"
+            self._fills[color] = code
+        return code
+    
+    def _text(self, text: str, x: float, y: float, font: str, size: float, color) -> str:
+        """글자 PDF 명령 (ASCII는 직접 만들고, 한글 등은 대체 글꼴 처리를 위해 캔버스로 그림)"""
+        if text.isascii():
+            text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            return f"q {self._fill(color)} BT {self._font_ids[font]} {_num(size)} Tf 1 0 0 1 {_num(x)} {_num(y)} Tm ({text}) Tj ET Q"
+        
+        def draw(c):
+            c.setFillColor(color)
+            c.setFont(font, size, _CELL_LEADING)
+            c.drawString(x, y, text)
+        return self._capture(draw)
+    
+    def _cell(self, text: str, left: float, width: float, bottom: float,
+              font: str = 'Helvetica', size: float = 9, color=colors.black) -> str:
+        x = left + (width - stringWidth(text, font, size)) / 2
+        return self._text(text, x, _cell_baseline(bottom, size), font, size, color)
+    
+    def _amount(self, amount, left: float, width: float, bottom: float,
+                font: str = 'Helvetica', size: float = 9, color=colors.black) -> str:
+        """금액 칸 ('1,234원' - 숫자는 직접, '원'은 미리 만든 명령을 옮겨 붙임)"""
+        won = self._won.get((font, size, color))
+        if won is None:
+            won = (self._text('원', 0, 0, font, size, color), stringWidth('원', font, size))
+            self._won[(font, size, color)] = won
+        won_code, won_width = won
+        
+        digits = format_money(amount)
+        digits_width = stringWidth(digits, font, size)
+        x = left + (width - digits_width - won_width) / 2
+        y = _cell_baseline(bottom, size)
+        return self._text(digits, x, y, font, size, color) + '\n' + _translate(won_code, x + digits_width, y)
+    
+    def _amount_table(self, parts: list, kind: str, top: float, items, total) -> float:
+        """지급/공제 표 (소제목 위쪽 top부터), 표 아래쪽 y 반환"""
+        parts.append(_translate(self._sections[kind], 0, top))
+        bottom = top - _SECTION_HEAD - _ROW_HEIGHT
+        for label, amount in items:
+            bottom -= _ROW_HEIGHT
+            parts.append(_translate(self._label(label), 0, bottom))
+            parts.append(self._amount(amount, self._value_left, _AMOUNT_COLS[1], bottom))
+        
+        bottom -= _ROW_HEIGHT
+        parts.append(_translate(self._totals[kind], 0, bottom))
+        parts.append(self._amount(total, self._value_left, _AMOUNT_COLS[1], bottom, 'Helvetica-Bold'))
+        parts.append(_translate(self._grid(kind, len(items) + 2), 0, bottom))
+        return bottom
+    
+    def content(self, salary_result: Dict[str, Any]) -> str:
+        """직원 한 명의 페이지 내용 (PDF 명령)"""
+        parts = [self._head]
+        
+        # 기본 정보 (직원별 칸)
+        left, bottom = self._info_left, self._info_bottom
+        value_left = left + _INFO_COLS[0]
+        extra_left = left + sum(_INFO_COLS[:3])
+        parts.append(self._cell(str(salary_result['worker_name']), value_left, _INFO_COLS[1], bottom + _ROW_HEIGHT))
+        parts.append(self._cell(str(salary_result.get('birth_date', '-')), extra_left, _INFO_COLS[3], bottom + _ROW_HEIGHT))
+        parts.append(self._amount(salary_result['hourly_rate'], value_left, _INFO_COLS[1], bottom))
+        parts.append(self._cell(str(salary_result.get('employment_type', 'REGULAR')), extra_left, _INFO_COLS[3], bottom))
+        
+        # 지급 / 공제 내역
+        bottom = self._amount_table(parts, 'pay', self._pay_top, _pay_items(salary_result),
+                                    salary_result['total_payment'])
+        bottom = self._amount_table(parts, 'deduct', bottom - 8*mm, _deduct_items(salary_result),
+                                    salary_result['total_deduction'])
+        
+        # 실수령액
+        bottom -= 10*mm + _ROW_HEIGHT
+        parts.append(_translate(self._net, 0, bottom))
+        parts.append(self._amount(salary_result['net_payment'], self._value_left, _AMOUNT_COLS[1], bottom,
+                                  'Helvetica-Bold', 12, colors.whitesmoke))
+        
+        # 발행일
+        parts.append(_translate(self._issued, 0, bottom - 10*mm - 11))
+        return '\n'.join(parts)
+    
+    def _story(self, salary_result: Dict[str, Any]) -> list:
+        """fallback용 platypus 스토리 (발행일은 템플릿 기준)"""
+        return _platypus_story(salary_result, self.client_name, self.client_biz_id,
+                               self.year, self.month, self.issue_date)
+    
+    def pdf_bytes(self, salary_result: Dict[str, Any]) -> bytes:
+        """직원 한 명의 명세서 PDF (메모리)"""
+        if self.fallback:
+            buf = io.BytesIO()
+            _platypus_doc(buf).build(self._story(salary_result))
+            return buf.getvalue()
+        
+        content = self.content(salary_result)
+        if self._skeleton is not None:
+            return self._pdf_bytes(content)
+        
+        buf = io.BytesIO()
+        c = canvas.Canvas(buf, pagesize=A4)
+        _register_fonts(c)
+        c.addLiteral(content)
+        c.showPage()
+        c.save()
+        return buf.getvalue()
+    
+    def render(self, salary_result: Dict[str, Any], output) -> Any:
+        """
+        직원 한 명의 명세서 저장
+        
+        Args:
+            salary_result: 급여 계산 결과
+            output: 파일 경로 또는 바이너리 파일 객체
+        
+        Returns:
+            output
+        """
+        data = self.pdf_bytes(salary_result)
+        if hasattr(output, 'write'):
+            output.write(data)
+        else:
+            with open(output, 'wb') as f:
+                f.write(data)
+        return output
+    
+    def write_merged(self, salary_results, out, progress_callback=None, total: Optional[int] = None) -> int:
+        """
+        여러 직원 명세서를 한 PDF로 저장 (직원당 1쪽)
+        글꼴/문서정보 객체는 한 번만 쓰고 쪽(내용 스트림 + 페이지 객체)은 만드는 즉시 out에 써서
+        메모리에는 한 쪽 분량만 남음 (out은 바이너리 파일 객체, seek 불필요)
+        
+        Returns:
+            쪽 수
+        """
+        if self.fallback:
+            story = []
+            count = 0
+            for count, result in enumerate(salary_results, 1):
+                if story:
+                    story.append(PageBreak())
+                story += self._story(result)
+                if progress_callback:
+                    progress_callback(count, total or count)
+            _platypus_doc(out).build(story)
+            return count
+        
+        skeleton = self._skeleton
+        if skeleton is None:
+            c = canvas.Canvas(out, pagesize=A4)
+            _register_fonts(c)
+            count = 0
+            for count, result in enumerate(salary_results, 1):
+                c.addLiteral(self.content(result))
+                c.showPage()
+                if progress_callback:
+                    progress_callback(count, total or count)
+            c.save()
+            return count
+        
+        offsets = {}
+        position = 0
+        
+        def write(data: bytes):
+            nonlocal position
+            out.write(data)
+            position += len(data)
+        
+        def write_object(number: int, body: bytes):
+            offsets[number] = position
+            write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+        
+        write(skeleton['header'])
+        for number in skeleton['shared']:
+            write_object(number, skeleton['objects'][number])
+        
+        kids = []
+        digest = hashlib.md5()
+        number = len(skeleton['objects']) + 1
+        page_contents = b'/Contents %d 0 R' % skeleton['number']
+        for result in salary_results:
+            content = self.content(result)
+            digest.update(content.encode('latin-1'))
+            offsets[number] = position
+            write(self._stream_object(number, content))
+            # 첫 쪽은 빈 명세서의 페이지 객체 번호를 그대로 써서 번호가 비지 않게
+            page_number = skeleton['page_number'] if not kids else number + 1
+            write_object(page_number, skeleton['page'].replace(page_contents, b'/Contents %d 0 R' % number))
+            kids.append(page_number)
+            number = max(number, page_number) + 1
+            if progress_callback:
+                progress_callback(len(kids), total or len(kids))
+        
+        write_object(skeleton['pages'], b'<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>'
+                     % (len(kids), b' '.join(b'%d 0 R' % kid for kid in kids)))
+        write_object(skeleton['root'], skeleton['objects'][skeleton['root']])
+        write_object(skeleton['info'], skeleton['objects'][skeleton['info']])
+        
+        xref = position
+        write(b'xref\n0 %d\n0000000000 65535 f \n' % number)
+        write(b''.join(b'%010d 00000 n \n' % offsets[n] if n in offsets else b'0000000000 00001 f \n'
+                       for n in range(1, number)))
+        digest = digest.hexdigest().encode()
+        write(b'trailer\n<<\n/ID \n[<%s><%s>]\n/Info %d 0 R\n/Root %d 0 R\n/Size %d\n>>\nstartxref\n%d\n%%%%EOF\n'
+              % (digest, digest, skeleton['info'], skeleton['root'], number, xref))
+        return len(kids)
+
+
+def get_payslip_template(client_name: str, client_biz_id: str, year: int, month: int) -> PayslipTemplate:
+    """거래처/연월(+발행일)별 템플릿 (프로세스 내 캐시)"""
+    key = (client_name, client_biz_id, year, month, date.today())
+    template = _TEMPLATES.get(key)
+    if template is None:
+        with _TEMPLATES_LOCK:
+            template = _TEMPLATES.get(key)
+            if template is None:
+                if len(_TEMPLATES) >= 32:
+                    _TEMPLATES.clear()
+                template = PayslipTemplate(client_name, client_biz_id, year, month, issue_date=key[-1])
+                _TEMPLATES[key] = template
+    return template
+
+
+def _init_pdf_worker():
+    """PDF 워커 프로세스 초기화: 스타일/폰트를 한 번 만들어 프로세스 수명 동안 재사용 (명세서 템플릿도 프로세스별 캐시)"""
+    _payslip_styles()
+
+
+def _get_pdf_pool(processes: int) -> ProcessPoolExecutor:
+    """PDF 생성용 프로세스 풀 (배치마다 새로 띄우지 않고 재사용)"""
+    global _PDF_POOL, _PDF_POOL_SIZE
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None or _PDF_POOL_SIZE != processes:
+            if _PDF_POOL is not None:
+                _PDF_POOL.shutdown(wait=False)
+            _PDF_POOL = ProcessPoolExecutor(max_workers=processes, initializer=_init_pdf_worker)
+            _PDF_POOL_SIZE = processes
+        return _PDF_POOL
+
+
+def shutdown_pdf_pool():
+    """PDF 프로세스 풀 종료"""
+    global _PDF_POOL, _PDF_POOL_SIZE
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is not None:
+            _PDF_POOL.shutdown(wait=False, cancel_futures=True)
+        _PDF_POOL = None
+        _PDF_POOL_SIZE = 0
+
+
+atexit.register(shutdown_pdf_pool)
+
+
+def _payslip_jobs(workers: list, salary_results: list, client_name: str, year: int, month: int) -> list:
+    """
+    명세서를 만들 (직원, 급여 계산 결과, 파일명) 목록 (salary_results 순서, 직원 정보가 없으면 제외)
+    동명이인은 같은 파일명이 되지 않도록 worker_id를 붙임
+    """
+    workers_by_id = {w['Id']: w for w in workers}
+    
+    name_counts = {}
+    for result in salary_results:
+        name_counts[result['worker_name']] = name_counts.get(result['worker_name'], 0) + 1
+    
+    jobs = []
+    for result in salary_results:
+        worker = workers_by_id.get(result['worker_id'])
+        if not worker:
+            continue
+        
+        filename = payslip_filename(
+            client_name, result['worker_name'], year, month,
+            result['worker_id'] if name_counts[result['worker_name']] > 1 else None
+        )
+        jobs.append((worker, result, filename))
+    return jobs
+
+
+def _pdf_processes(processes: Optional[int], count: int) -> int:
+    """PDF 생성 프로세스 수 (기본: CPU 수, PDF_PARALLEL_MIN건 미만이면 1)"""
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if count < PDF_PARALLEL_MIN:
+        return 1
+    return max(1, min(processes, count))
+
+
+def payslip_cache_key(
+    salary_result: Dict[str, Any],
+    client_name: str,
+    client_biz_id: str,
+    year: int,
+    month: int
+) -> str:
+    """
+    명세서 내용 해시 (SHA-256 hex, PayrollDocLog.FileHash와 같은 64자)
+    템플릿 버전/압축 설정/거래처/연월/발행일(오늘)/급여 계산 결과가 같으면 같은 PDF
+    """
+    payload = json.dumps(
+        [PAYSLIP_TEMPLATE_VERSION, bool(rl_config.pageCompression), client_name, client_biz_id,
+         year, month, date.today().isoformat(), salary_result],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_payslip_bytes(
+    salary_result: Dict[str, Any],
+    client_name: str,
+    client_biz_id: str,
+    year: int,
+    month: int
+) -> bytes:
+    """명세서 한 장을 메모리에서 생성 (프로세스 풀에서도 호출)"""
+    return get_payslip_template(client_name, client_biz_id, year, month).pdf_bytes(salary_result)
+
+
+def _resolve_cache(cache) -> Optional[PayslipCache]:
+    """cache 인자: None이면 기본 캐시, False면 사용 안 함"""
+    if cache is None:
+        return get_payslip_cache()
+    return cache or None
+
+
+def _render_payslips(jobs: list, client_name: str, client_biz_id: str, year: int, month: int,
+                     processes: int, window: Optional[int], cache: Optional[PayslipCache],
+                     on_error, stats: dict):
+    """
+    (직원, 급여 계산 결과, 파일명) 목록을 순서대로 렌더링해 (직원, 급여 계산 결과, 파일명, PDF 바이트)로 내보냄
+    - 캐시에 있는 명세서는 그대로, 나머지만 렌더링해서 캐시에 저장
+    - processes > 1이면 프로세스 풀에서 렌더링하되 미리 만들어 두는 문서는 window개까지만
+    - 실패한 직원은 on_error(급여 계산 결과, 예외) 호출 후 건너뜀
+    """
+    stats.update(processes=processes, cache_hits=0, rendered=0)
+    
+    def render(index, submit):
+        _, result, _ = jobs[index]
+        key = payslip_cache_key(result, client_name, client_biz_id, year, month) if cache else None
+        data = cache.get(key) if cache else None
+        if data is not None:
+            stats['cache_hits'] += 1
+            future = Future()
+            future.set_result(data)
+            return key, future, True
+        return key, submit(result), False
+    
+    def finished(index, key, future, cached):
+        _, result, _ = jobs[index]
+        try:
+            data = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            on_error(result, e)
+            return None
+        if not cached:
+            stats['rendered'] += 1
+            if cache:
+                cache.put(key, data)
+        return data
+    
+    def in_process(result):
+        future = Future()
+        try:
+            future.set_result(render_payslip_bytes(result, client_name, client_biz_id, year, month))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    resume = 0
+    if processes > 1:
+        window = max(1, window or processes * 4)
+        pending = deque()
+        index = 0
+        try:
+            pool = _get_pdf_pool(processes)
+            
+            def submit(result):
+                return pool.submit(render_payslip_bytes, result, client_name, client_biz_id, year, month)
+            
+            while index < len(jobs) or pending:
+                while index < len(jobs) and len(pending) < window:
+                    pending.append((index,) + render(index, submit))
+                    index += 1
+                
+                resume, key, future, cached = pending.popleft()
+                data = finished(resume, key, future, cached)
+                if data is not None:
+                    yield jobs[resume] + (data,)
+            return
+        except BrokenProcessPool:
+            # 워커 프로세스가 죽었으면 풀을 버리고 아직 못 내보낸 것부터 현재 프로세스에서 생성
+            print(f"⚠️ PDF 프로세스 풀 오류, 남은 {len(jobs) - resume}건은 직접 생성")
+            shutdown_pdf_pool()
+            stats['processes'] = 1
+        finally:
+            # 중간에 그만 받으면(제너레이터 종료) 아직 시작 안 한 작업은 취소
+            for _, _, future, _ in pending:
+                future.cancel()
+    
+    for index in range(resume, len(jobs)):
+        data = finished(index, *render(index, in_process))
+        if data is not None:
+            yield jobs[index] + (data,)
 
 
 def generate_batch_pdfs(
@@ -259,10 +1058,14 @@ def generate_batch_pdfs(
     month: int,
     base_path: str,
     use_subfolders: bool = True,
-    progress_callback=None
-) -> list:
+    progress_callback=None,
+    by_worker: bool = False,
+    processes: Optional[int] = None,
+    stats: Optional[dict] = None,
+    cache=None
+):
     """
-    일괄 PDF 생성
+    일괄 PDF 생성 (인원이 많으면 CPU 수만큼 프로세스로 나눠 생성, 내용이 같은 명세서는 캐시에서 재사용)
     
     Args:
         workers: 직원 목록
@@ -273,12 +1076,18 @@ def generate_batch_pdfs(
         month: 월
         base_path: 기본 저장 경로
         use_subfolders: 거래처별 하위 폴더 사용 여부
-        progress_callback: 진행 상황 콜백 함수 (current, total)
+        progress_callback: 진행 상황 콜백 함수 (current, total), 호출한 스레드에서 실행
+        by_worker: True면 {worker_id: PDF 경로} 딕셔너리 반환
+        processes: 프로세스 수 (기본: CPU 수, 1이면 현재 프로세스에서 생성)
+        stats: 넘기면 생성 통계(count, failed, seconds, pdfs_per_sec, processes, cache_hits, rendered)를 채워 줌
+        cache: 렌더링 캐시 (기본: get_payslip_cache(), False면 사용 안 함)
     
     Returns:
-        생성된 PDF 파일 경로 리스트
+        생성된 PDF 파일 경로 리스트 (by_worker=True면 worker_id별 딕셔너리)
     """
     
+    started = time.perf_counter()
+    
     # 저장 경로 결정
     if use_subfolders:
         output_dir = os.path.join(base_path, client_name, str(year))
@@ -288,35 +1097,141 @@ def generate_batch_pdfs(
     # 디렉토리 생성
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
-    generated_files = []
+    jobs = _payslip_jobs(workers, salary_results, client_name, year, month)
+    
     total = len(salary_results)
+    done = total - len(jobs)
+    generated_files = {}
+    failed = 0
     
-    for idx, result in enumerate(salary_results, 1):
-        try:
-            # 해당 직원 데이터 찾기
-            worker = next((w for w in workers if w['Id'] == result['worker_id']), None)
-            if not worker:
-                continue
-            
-            # PDF 생성
-            pdf_path = generate_payslip_pdf(
-                worker_data=worker,
-                salary_result=result,
-                client_name=client_name,
-                client_biz_id=client_biz_id,
-                year=year,
-                month=month,
-                output_path=output_dir
-            )
-            
-            generated_files.append(pdf_path)
-            
-            # 진행 상황 콜백
-            if progress_callback:
-                progress_callback(idx, total)
+    def finish(result, pdf_path=None, error=None):
+        nonlocal done, failed
+        done += 1
+        if error is None:
+            generated_files[result['worker_id']] = pdf_path
+        else:
+            failed += 1
+            print(f"❌ {result.get('worker_name', '알 수 없음')} PDF 생성 실패: {error}")
         
-        except Exception as e:
-            print(f"❌ {result.get('worker_name', '알 수 없음')} PDF 생성 실패: {e}")
+        # 진행 상황 콜백
+        if progress_callback:
+            progress_callback(done, total)
+    
+    render_stats = {}
+    for _, result, filename, data in _render_payslips(
+            jobs, client_name, client_biz_id, year, month,
+            _pdf_processes(processes, len(jobs)), None, _resolve_cache(cache),
+            lambda result, error: finish(result, error=error), render_stats):
+        pdf_path = os.path.join(output_dir, filename)
+        try:
+            with open(pdf_path, 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            finish(result, error=e)
             continue
+        finish(result, pdf_path)
+    
+    elapsed = time.perf_counter() - started
+    if stats is not None:
+        stats.update(
+            count=len(generated_files),
+            failed=failed,
+            seconds=round(elapsed, 3),
+            pdfs_per_sec=round(len(generated_files) / elapsed, 1) if elapsed > 0 else 0.0,
+            processes=render_stats['processes'],
+            cache_hits=render_stats['cache_hits'],
+            rendered=render_stats['rendered']
+        )
+    
+    # 입력 순서대로 (jobs 순서 = salary_results 순서)
+    if by_worker:
+        return generated_files
+    return list(generated_files.values())
+
+
+# =========================
+# 메모리 내보내기 (ZIP / 병합 PDF / 이메일 첨부, 디스크 저장 없음)
+# =========================
+
+def iter_payslip_pdfs(
+    workers: list,
+    salary_results: list,
+    client_name: str,
+    client_biz_id: str,
+    year: int,
+    month: int,
+    processes: Optional[int] = None,
+    window: Optional[int] = None,
+    cache=None,
+    stats: Optional[dict] = None
+):
+    """
+    명세서를 메모리에서 만들어 (worker_id, 파일명, PDF 바이트)를 salary_results 순서대로 내보냄
+    - 인원이 많으면 프로세스 풀에서 생성하되 미리 만들어 두는 문서는 window개까지만 (기본: 프로세스 수 x 4)
+      → 받는 쪽(ZIP/메일)이 느려도 메모리는 window개 분량을 넘지 않음
+    - 내용이 같은 명세서는 캐시에서 재사용 (cache: 기본 get_payslip_cache(), False면 사용 안 함)
+    - 생성에 실패한 직원은 건너뜀
+    - stats: 넘기면 processes, cache_hits, rendered를 채워 줌
+    """
+    jobs = _payslip_jobs(workers, salary_results, client_name, year, month)
+    
+    def failed(result, error):
+        print(f"❌ {result.get('worker_name', '알 수 없음')} PDF 생성 실패: {error}")
+    
+    for _, result, filename, data in _render_payslips(
+            jobs, client_name, client_biz_id, year, month,
+            _pdf_processes(processes, len(jobs)), window, _resolve_cache(cache),
+            failed, stats if stats is not None else {}):
+        yield result['worker_id'], filename, data
+
+
+def write_payslips_zip(
+    out,
+    workers: list,
+    salary_results: list,
+    client_name: str,
+    client_biz_id: str,
+    year: int,
+    month: int,
+    progress_callback=None,
+    processes: Optional[int] = None,
+    cache=None
+) -> int:
+    """
+    명세서 전체를 ZIP으로 저장 (out: 바이너리 파일 객체, seek 불필요)
+    PDF 내용은 이미 압축돼 있어 ZIP은 무압축(STORED)으로 담음, cache는 iter_payslip_pdfs와 같음
     
-    return generated_files
+    Returns:
+        담은 명세서 수
+    """
+    total = len(salary_results)
+    count = 0
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for count, (_, filename, data) in enumerate(
+                iter_payslip_pdfs(workers, salary_results, client_name, client_biz_id, year, month,
+                                  processes=processes, cache=cache), 1):
+            zf.writestr(filename, data)
+            if progress_callback:
+                progress_callback(count, total)
+    return count
+
+
+def write_payslips_merged_pdf(
+    out,
+    workers: list,
+    salary_results: list,
+    client_name: str,
+    client_biz_id: str,
+    year: int,
+    month: int,
+    progress_callback=None
+) -> int:
+    """
+    명세서 전체를 한 PDF로 저장 (직원당 1쪽, out: 바이너리 파일 객체, seek 불필요)
+    
+    Returns:
+        쪽 수
+    """
+    jobs = _payslip_jobs(workers, salary_results, client_name, year, month)
+    template = get_payslip_template(client_name, client_biz_id, year, month)
+    return template.write_merged((result for _, result, _ in jobs), out, progress_callback, total=len(jobs))